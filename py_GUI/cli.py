@@ -0,0 +1,412 @@
+"""
+Headless command-line modes that run without starting the GTK application.
+
+    python3 run_gui.py --build-properties-cache [--engine] [--jobs N] [--timeout S] [--force]
+    python3 run_gui.py --screenshot-library --output DIR [--jobs N] [--delay FRAMES]
+                       [--timeout S] [--type T] [--tag T] [--search TEXT] [--retry-failed] [--force] [ID ...]
+    python3 run_gui.py --benchmark-library [--duration S] [--warmup S] [--resolution WxH] [--fps N]
+                       [--type T] [--tag T] [--search TEXT] [--retry-failed] [--force] [ID ...]
+    python3 run_gui.py --benchmark-library --report [--sort cpu|rss|threads] [--limit N]
+"""
+import os
+import re
+import signal
+import sys
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Optional
+
+from py_GUI.const import WORKSHOP_PATH
+from py_GUI.core.latency import percentile
+
+
+def build_properties_cache(argv: Optional[List[str]] = None) -> int:
+    """Extract properties for every wallpaper in the library into library.db"""
+    parser = argparse.ArgumentParser(
+        prog="run_gui.py --build-properties-cache",
+        description="Warm the persistent wallpaper properties cache.",
+    )
+    parser.add_argument("--build-properties-cache", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--engine", action="store_true",
+                        help="always run linux-wallpaperengine --list-properties instead of parsing project.json")
+    parser.add_argument("--jobs", type=int, default=min(4, os.cpu_count() or 1),
+                        help="parallel extractions (default: %(default)s)")
+    parser.add_argument("--timeout", type=float, default=10.0,
+                        help="seconds per --list-properties call (default: %(default)s)")
+    parser.add_argument("--force", action="store_true",
+                        help="re-extract wallpapers that are already cached")
+    args = parser.parse_args(argv)
+
+    # Imported here so the GUI entry point does not pay for them
+    from py_GUI.core.config import ConfigManager
+    from py_GUI.core.storage import WallpaperStore
+    from py_GUI.core.wallpaper import WallpaperManager
+    from py_GUI.core.properties import PropertiesManager
+
+    config = ConfigManager()
+    store = WallpaperStore()
+    store.migrate_from_config(config)
+    wp_manager = WallpaperManager(config.get("workshopPath", WORKSHOP_PATH))
+    prop_manager = PropertiesManager(config, store)
+    prop_manager.wp_manager = wp_manager
+
+    scan_start = time.monotonic()
+    wallpapers = wp_manager.scan()
+    scan_time = time.monotonic() - scan_start
+    if wp_manager.last_scan_error:
+        print(f"Error: {wp_manager.last_scan_error}", file=sys.stderr)
+        return 1
+
+    ids = sorted(wallpapers.keys())
+    total = len(ids)
+    jobs = max(1, args.jobs)
+    print(f"Scanned {total} wallpapers in {scan_time:.2f}s, extracting with {jobs} workers "
+          f"({'engine' if args.engine else 'native, engine fallback'})")
+
+    def extract(wp_id: str):
+        start = time.monotonic()
+        status, count = prop_manager.build_cache_entry(
+            wp_id, use_engine=args.engine, timeout=args.timeout, force=args.force
+        )
+        return wp_id, status, count, time.monotonic() - start
+
+    counts = {}
+    timings: List[float] = []
+    failed: List[str] = []
+    started = time.monotonic()
+
+    with ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="PropCache") as pool:
+        futures = [pool.submit(extract, wp_id) for wp_id in ids]
+        try:
+            for done, future in enumerate(as_completed(futures), 1):
+                wp_id, status, count, elapsed = future.result()
+                counts[status] = counts.get(status, 0) + 1
+                if status != "skipped":
+                    timings.append(elapsed)
+                if status in ("failed", "missing"):
+                    failed.append(wp_id)
+                print(f"[{done:>{len(str(total))}}/{total}] {wp_id:<12} {status:<8} "
+                      f"{count:>3} props {elapsed * 1000:8.1f} ms")
+        except KeyboardInterrupt:
+            # Finished items are already committed; a rerun resumes from here
+            for f in futures:
+                f.cancel()
+            print("\nInterrupted, rerun to resume.", file=sys.stderr)
+            return 130
+
+    wall = time.monotonic() - started
+    processed = len(timings)
+    print()
+    print("Summary: " + ", ".join(f"{k} {v}" for k, v in sorted(counts.items())))
+    print(f"Wall time {wall:.2f}s, {processed / wall if wall > 0 else 0:.1f} wallpapers/s extracted")
+    if timings:
+        print(f"Per item: avg {sum(timings) / processed * 1000:.1f} ms, "
+              f"p50 {percentile(timings, 50) * 1000:.1f} ms, "
+              f"p95 {percentile(timings, 95) * 1000:.1f} ms, "
+              f"max {max(timings) * 1000:.1f} ms")
+    if failed:
+        print(f"Failed: {' '.join(failed)}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+def _matches(wallpaper: dict, args) -> bool:
+    if args.type and str(wallpaper.get("type", "")).lower() != args.type.lower():
+        return False
+    if args.tag:
+        tags = [str(t).lower() for t in wallpaper.get("tags") or []]
+        if args.tag.lower() not in tags:
+            return False
+    if args.search and args.search.lower() not in str(wallpaper.get("title", "")).lower():
+        return False
+    return True
+
+
+def screenshot_library(argv: Optional[List[str]] = None) -> int:
+    """Capture a screenshot of every (matching) wallpaper into a directory"""
+    parser = argparse.ArgumentParser(
+        prog="run_gui.py --screenshot-library",
+        description="Capture library screenshots headless, each worker on its own Xvfb display.",
+    )
+    parser.add_argument("--screenshot-library", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("ids", nargs="*", metavar="ID", help="only these wallpapers")
+    parser.add_argument("--output", "-o", required=True, help="target directory for <id>.png files")
+    parser.add_argument("--jobs", type=int, default=min(2, os.cpu_count() or 1),
+                        help="parallel captures, one Xvfb each (default: %(default)s)")
+    parser.add_argument("--delay", type=int, default=None,
+                        help="frames rendered before the capture (default: screenshotDelay)")
+    parser.add_argument("--timeout", type=float, default=None,
+                        help="seconds per wallpaper (default: from the delay)")
+    parser.add_argument("--type", help="only wallpapers of this type (scene, video, web, ...)")
+    parser.add_argument("--tag", help="only wallpapers with this tag")
+    parser.add_argument("--search", help="only wallpapers whose title contains this text")
+    parser.add_argument("--retry-failed", action="store_true",
+                        help="capture wallpapers that failed in an earlier run again")
+    parser.add_argument("--force", action="store_true",
+                        help="capture wallpapers that are already done again")
+    args = parser.parse_args(argv)
+
+    from py_GUI.core.xvfb import have_xvfb
+    if not have_xvfb():
+        print("Error: Xvfb is required for batch screenshots", file=sys.stderr)
+        return 1
+
+    # Imported here so the GUI entry point does not pay for them
+    from gi.repository import GLib
+    from py_GUI.core.batch import BatchScreenshots, ScreenshotQueue
+    from py_GUI.core.capture import capture_timeout, screenshot_resolution
+    from py_GUI.core.config import ConfigManager
+    from py_GUI.core.performance import PerformanceMonitor
+    from py_GUI.core.storage import WallpaperStore
+    from py_GUI.core.wallpaper import WallpaperManager
+
+    config = ConfigManager()
+    store = WallpaperStore()
+    store.migrate_from_config(config)
+    wp_manager = WallpaperManager(config.get("workshopPath", WORKSHOP_PATH))
+    perf_monitor = PerformanceMonitor(config=config, store=store)
+
+    wallpapers = wp_manager.scan()
+    if wp_manager.last_scan_error:
+        print(f"Error: {wp_manager.last_scan_error}", file=sys.stderr)
+        return 1
+    unknown = [wp_id for wp_id in args.ids if wp_id not in wallpapers]
+    if unknown:
+        print(f"Error: unknown wallpapers: {' '.join(unknown)}", file=sys.stderr)
+        return 1
+    ids = sorted(wp_id for wp_id, wp in wallpapers.items()
+                 if (not args.ids or wp_id in args.ids) and _matches(wp, args))
+
+    output = os.path.abspath(os.path.expanduser(args.output))
+    os.makedirs(output, exist_ok=True)
+    queue = ScreenshotQueue(output)
+    queue.add(ids, force=args.force, retry_failed=args.retry_failed)
+    # Items queued by an earlier run with other filters are kept for later
+    pending = [wp_id for wp_id in queue.pending() if wp_id in ids]
+    skipped = len(ids) - len(pending)
+    total = len(pending)
+    if not total:
+        print(f"Nothing to capture: {skipped} wallpapers already done or failed (see --force, --retry-failed)")
+        return 0
+
+    delay = args.delay if args.delay is not None else int(config.get("screenshotDelay", 20))
+    timeout = args.timeout if args.timeout is not None else capture_timeout(delay, True)
+    jobs = max(1, min(args.jobs, total))
+    print(f"Capturing {total} wallpapers into {output} with {jobs} workers "
+          f"at {screenshot_resolution(config)}, {delay} frames, {timeout:.0f}s timeout"
+          + (f" ({skipped} skipped)" if skipped else ""))
+
+    loop = GLib.MainLoop()
+    timings: List[float] = []
+    failed: List[str] = []
+    interrupted = []
+
+    def on_item(wp_id: str, result: dict):
+        status = "ok" if result["ok"] else result["error"]
+        if result["ok"]:
+            timings.append(result["seconds"])
+        else:
+            failed.append(wp_id)
+        done = len(timings) + len(failed)
+        print(f"[{done:>{len(str(total))}}/{total}] {wp_id:<12} {status:<8} "
+              f"{result['seconds']:7.1f} s")
+        if not result["ok"] and result["output"]:
+            print("    " + result["output"].splitlines()[-1][:200], file=sys.stderr)
+
+    def on_interrupt():
+        interrupted.append(True)
+        batch.stop()
+        return False
+
+    batch = BatchScreenshots(config, perf_monitor, queue, output, pending, jobs, delay, timeout,
+                             on_item, loop.quit)
+    GLib.unix_signal_add(GLib.PRIORITY_DEFAULT, signal.SIGINT, on_interrupt)
+
+    started = time.monotonic()
+    GLib.idle_add(lambda: batch.start() and False)
+    loop.run()
+    wall = time.monotonic() - started
+
+    if interrupted:
+        # Finished items are recorded in the queue; a rerun resumes from here
+        print("\nInterrupted, rerun to resume.", file=sys.stderr)
+        return 130
+
+    print()
+    print(f"Summary: captured {len(timings)}, failed {len(failed)}, skipped {skipped}")
+    print(f"Wall time {wall:.1f}s, {len(timings) / wall * 60 if wall > 0 else 0:.1f} wallpapers/min captured")
+    if timings:
+        print(f"Per item: avg {sum(timings) / len(timings):.1f} s, "
+              f"p50 {percentile(timings, 50):.1f} s, "
+              f"p95 {percentile(timings, 95):.1f} s, "
+              f"max {max(timings):.1f} s")
+    if failed:
+        print(f"Failed: {' '.join(failed)}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+# --benchmark-library --sort choices and the result field each orders by
+BENCHMARK_SORT_KEYS = {"cpu": "avg_cpu", "rss": "avg_rss_mb", "threads": "avg_threads"}
+
+
+def _print_benchmark_report(results: dict, wallpapers: dict, versions: dict,
+                            sort: str, limit: int = 0):
+    """Measured wallpapers, most expensive first, then crashed and failed ones"""
+    key = BENCHMARK_SORT_KEYS[sort]
+    measured = sorted((r for r in results.values() if r["status"] == "ok"),
+                      key=lambda r: r[key], reverse=True)
+    broken = sorted((r for r in results.values() if r["status"] != "ok"),
+                    key=lambda r: (r["status"], r["wp_id"]))
+    rows = measured[:limit] if limit > 0 else measured
+    print(f"{'ID':<12} {'CPU avg':>8} {'peak':>6} {'RSS avg':>9} {'peak':>8} {'threads':>7}  Title")
+    for r in rows:
+        title = wallpapers.get(r["wp_id"], {}).get("title", "")
+        outdated = " (outdated)" if versions.get(r["wp_id"]) not in (None, r["version"]) else ""
+        print(f"{r['wp_id']:<12} {r['avg_cpu']:7.1f}% {r['peak_cpu']:5.1f}% "
+              f"{r['avg_rss_mb']:6.0f} MB {r['peak_rss_mb']:5.0f} MB {r['avg_threads']:7.0f}  "
+              f"{title[:40]}{outdated}")
+    if limit > 0 and len(measured) > limit:
+        print(f"... {len(measured) - limit} more")
+    for r in broken:
+        title = wallpapers.get(r["wp_id"], {}).get("title", "")
+        print(f"{r['wp_id']:<12} {r['status'].upper():<8} {title[:40]}: {r['error'] or ''}")
+
+
+def benchmark_library(argv: Optional[List[str]] = None) -> int:
+    """Measure the headless CPU, memory and thread cost of every (matching) wallpaper"""
+    from py_GUI.core.benchmark import (BENCHMARK_DURATION, BENCHMARK_RESOLUTION,
+                                       BENCHMARK_WARMUP)
+
+    parser = argparse.ArgumentParser(
+        prog="run_gui.py --benchmark-library",
+        description="Run wallpapers headless one at a time and record what they cost.",
+    )
+    parser.add_argument("--benchmark-library", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("ids", nargs="*", metavar="ID", help="only these wallpapers")
+    parser.add_argument("--duration", type=float, default=BENCHMARK_DURATION,
+                        help="seconds measured per wallpaper (default: %(default)s)")
+    parser.add_argument("--warmup", type=float, default=BENCHMARK_WARMUP,
+                        help="seconds left out after start (default: %(default)s)")
+    parser.add_argument("--resolution", default=BENCHMARK_RESOLUTION,
+                        help="Xvfb screen size (default: %(default)s)")
+    parser.add_argument("--fps", type=int, default=None, help="frame rate cap (default: fps setting)")
+    parser.add_argument("--type", help="only wallpapers of this type (scene, video, web, ...)")
+    parser.add_argument("--tag", help="only wallpapers with this tag")
+    parser.add_argument("--search", help="only wallpapers whose title contains this text")
+    parser.add_argument("--retry-failed", action="store_true",
+                        help="measure wallpapers that crashed or failed before again")
+    parser.add_argument("--force", action="store_true",
+                        help="measure wallpapers that already have a result for their version again")
+    parser.add_argument("--report", action="store_true", help="print stored results and exit")
+    parser.add_argument("--sort", choices=sorted(BENCHMARK_SORT_KEYS), default="cpu",
+                        help="report order (default: %(default)s)")
+    parser.add_argument("--limit", type=int, default=0, help="report only the N most expensive")
+    args = parser.parse_args(argv)
+
+    if not args.report and not re.fullmatch(r"\d+[xX]\d+", args.resolution):
+        print(f"Error: invalid resolution {args.resolution!r}, expected WIDTHxHEIGHT", file=sys.stderr)
+        return 1
+
+    # Imported here so the GUI entry point does not pay for them
+    from py_GUI.core.benchmark import BenchmarkRunner, wallpaper_version
+    from py_GUI.core.config import ConfigManager
+    from py_GUI.core.performance import PerformanceMonitor
+    from py_GUI.core.storage import WallpaperStore
+    from py_GUI.core.wallpaper import WallpaperManager
+    from py_GUI.core.xvfb import have_xvfb
+
+    config = ConfigManager()
+    store = WallpaperStore()
+    store.migrate_from_config(config)
+    workshop_path = config.get("workshopPath", WORKSHOP_PATH)
+    wp_manager = WallpaperManager(workshop_path)
+    wallpapers = wp_manager.scan()
+    if wp_manager.last_scan_error:
+        print(f"Error: {wp_manager.last_scan_error}", file=sys.stderr)
+        return 1
+    unknown = [wp_id for wp_id in args.ids if wp_id not in wallpapers]
+    if unknown:
+        print(f"Error: unknown wallpapers: {' '.join(unknown)}", file=sys.stderr)
+        return 1
+    ids = sorted(wp_id for wp_id, wp in wallpapers.items()
+                 if (not args.ids or wp_id in args.ids) and _matches(wp, args))
+    versions = {wp_id: wallpaper_version(workshop_path, wp_id, wallpapers[wp_id]) for wp_id in ids}
+    stored = store.get_benchmarks()
+
+    if args.report:
+        results = {wp_id: r for wp_id, r in stored.items() if wp_id in versions}
+        if not results:
+            print("No benchmark results yet, run --benchmark-library first")
+            return 0
+        _print_benchmark_report(results, wallpapers, versions, args.sort, args.limit)
+        return 0
+
+    if not have_xvfb():
+        print("Error: Xvfb is required for benchmarks", file=sys.stderr)
+        return 1
+
+    def wanted(wp_id: str) -> bool:
+        result = stored.get(wp_id)
+        if versions[wp_id] is None:
+            return False
+        if args.force or result is None or result["version"] != versions[wp_id]:
+            return True
+        return args.retry_failed and result["status"] != "ok"
+
+    queue = [(wp_id, versions[wp_id]) for wp_id in ids if wanted(wp_id)]
+    skipped = len(ids) - len(queue)
+    total = len(queue)
+    if not total:
+        print(f"Nothing to measure: {skipped} wallpapers already have results "
+              f"(see --force, --retry-failed, --report)")
+        return 0
+
+    estimate = total * (args.warmup + args.duration)
+    estimate_fmt = f"{estimate / 60:.0f} min" if estimate >= 120 else f"{estimate:.0f}s"
+    print(f"Measuring {total} wallpapers at {args.resolution} for {args.duration:.0f}s each "
+          f"after a {args.warmup:.0f}s warm-up, about {estimate_fmt}"
+          + (f" ({skipped} skipped)" if skipped else ""))
+
+    from gi.repository import GLib
+    loop = GLib.MainLoop()
+    perf_monitor = PerformanceMonitor(config=config)
+    results: dict = {}
+    interrupted = []
+
+    def on_item(wp_id: str, record: dict):
+        results[wp_id] = record
+        if record["status"] == "ok":
+            detail = (f"{record['avg_cpu']:5.1f}% CPU {record['avg_rss_mb']:6.0f} MB "
+                      f"{record['avg_threads']:4.0f} threads")
+        else:
+            detail = record["error"] or ""
+        print(f"[{len(results):>{len(str(total))}}/{total}] {wp_id:<12} {record['status']:<8} {detail}")
+
+    def on_interrupt():
+        interrupted.append(True)
+        runner.stop()
+        return False
+
+    runner = BenchmarkRunner(config, perf_monitor, store, queue, on_item, loop.quit,
+                             duration=args.duration, warmup=args.warmup,
+                             resolution=args.resolution.lower(), fps=args.fps)
+    GLib.unix_signal_add(GLib.PRIORITY_DEFAULT, signal.SIGINT, on_interrupt)
+    started = time.monotonic()
+    GLib.idle_add(lambda: runner.start() and False)
+    loop.run()
+    wall = time.monotonic() - started
+
+    if interrupted:
+        # Finished wallpapers are stored; a rerun skips them
+        print("\nInterrupted, rerun to resume.", file=sys.stderr)
+        return 130
+
+    print()
+    counts: dict = {}
+    for record in results.values():
+        counts[record["status"]] = counts.get(record["status"], 0) + 1
+    print("Summary: " + ", ".join(f"{k} {v}" for k, v in sorted(counts.items()))
+          + f", skipped {skipped}, wall time {wall / 60:.1f} min")
+    print()
+    _print_benchmark_report(results, wallpapers, versions, args.sort, args.limit)
+    return 0
@@ -8,6 +8,7 @@ VERSION = "0.11.1"
 PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 CONFIG_DIR = os.path.expanduser("~/.config/linux-wallpaperengine-gui")
 CONFIG_FILE = os.path.join(CONFIG_DIR, "config.json")
+STORE_FILE = os.path.join(CONFIG_DIR, "library.db")
 WORKSHOP_PATH = os.path.expanduser(
     "~/.local/share/Steam/steamapps/workshop/content/431960"
 )
@@ -30,14 +31,36 @@ DEFAULT_CONFIG = {
     "clamping": "clamp",
     "lastWallpaper": None,
     "lastScreen": None,
-    "wallpaperProperties": {},
     "screenshotDelay": 20,
     "screenshotRes": "3840x2160",
     "preferXvfb": True,
+    "processMode": "shared",  # shared: one engine for all screens, per_screen: one per screen
+    "seamlessSwitch": False,  # Start the new engine before stopping the old one
+    "switchTimeout": 5,  # Seconds to wait for the new engine to report ready
+    "engineNice": 0,  # Scheduling priority of the engine (-20..19, 0 = default)
+    "engineIoniceClass": "none",  # none, best-effort, idle
+    "engineCpuAffinity": "",  # CPUs the engine may run on, e.g. "0-3,6" (empty = all)
+    "engineScope": False,  # Run the engine in a systemd --user scope
+    "engineCpuQuota": 0,  # Scope CPU quota in percent of one core (0 = unlimited)
+    "engineMemoryMax": 0,  # Scope memory limit in MB (0 = unlimited)
+    "suspendWhenIdle": False,  # SIGSTOP engines while the session is idle or locked
+    "powerProfilesEnabled": False,  # Override the settings below by power source
+    "lowBatteryThreshold": 20,  # Battery percent at which low_battery replaces battery
+    "powerProfiles": {  # ac / battery / low_battery; keys left out use the global setting
+        "ac": {},
+        "battery": {"fps": 20},
+        "low_battery": {"fps": 10, "disableParticles": True, "disableParallax": True, "cycleInterval": 0},
+    },
+    "staticSnapshotMode": "off",  # off, battery, low_battery, always: show a cached frame instead of the engine
+    "staticSnapshotLoad": 0,  # Also show snapshots above this 1-minute load per CPU (0 = off)
+    "staticBackend": "auto",  # auto, swaybg, xwallpaper
+    "rendererRules": {},  # Wallpaper type -> renderers to try in order, e.g. {"video": ["mpvpaper", "linux-wallpaperengine"]}
+    "rendererPaths": {},  # Renderer name -> executable to run instead (e.g. a stub for testing)
     "active_monitors": {},
     "cycleEnabled": False,
     "cycleInterval": 15,
     "cycleOrder": "random",  # random, title, size, type, id
+    "historyRetentionDays": 0,  # Drop playback history older than this (0 = keep all)
     "assetsPath": None,  # Custom assets directory (None = auto-detect)
     "wayland_only_active": False,
     "wayland_ignore_appids": "",
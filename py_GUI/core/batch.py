@@ -0,0 +1,192 @@
+import json
+import os
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from py_GUI.core.capture import CaptureTracker, screenshot_resolution, start_screenshot
+from py_GUI.core.xvfb import XvfbPool
+
+# Job list of a batch capture, kept in its target directory
+QUEUE_FILE = ".screenshot-queue.json"
+
+
+class ScreenshotQueue:
+    """
+    Resumable job list of a batch capture, stored as JSON in the target directory.
+
+    Each wallpaper is "pending", "done" or "failed". The file is rewritten
+    atomically after every result, so a run that is interrupted at any
+    point resumes with the items that had not finished.
+    """
+
+    def __init__(self, directory: str):
+        self.path = os.path.join(directory, QUEUE_FILE)
+        self.items: Dict[str, Dict[str, Any]] = {}
+        try:
+            with open(self.path, "r") as f:
+                self.items = json.load(f).get("items", {})
+        except (OSError, ValueError, AttributeError):
+            self.items = {}
+
+    def add(self, wp_ids: Iterable[str], force: bool = False, retry_failed: bool = False) -> int:
+        """Queue wallpapers that are new (or done/failed, with force/retry_failed); returns how many"""
+        added = 0
+        for wp_id in wp_ids:
+            item = self.items.get(wp_id)
+            status = item["status"] if item else None
+            if status is None or force or status == "pending" or (status == "failed" and retry_failed):
+                self.items[wp_id] = {"status": "pending"}
+                added += 1
+        self.save()
+        return added
+
+    def pending(self) -> List[str]:
+        return [wp_id for wp_id, item in self.items.items() if item["status"] == "pending"]
+
+    def mark(self, wp_id: str, status: str, **info):
+        self.items[wp_id] = dict(info, status=status)
+        self.save()
+
+    def save(self):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"items": self.items}, f, indent=1)
+        os.replace(tmp, self.path)
+
+
+class _Worker:
+    def __init__(self, index: int):
+        self.index = index
+        self.tracker: Optional[CaptureTracker] = None
+        self.wp_id: Optional[str] = None
+        self.captured = 0
+
+    @property
+    def task(self) -> str:
+        return f"screenshot:{self.index}"
+
+    @property
+    def error_log(self) -> str:
+        return f"/tmp/wallpaper_screenshot-{self.index}_error.log"
+
+
+class BatchScreenshots:
+    """
+    Captures wallpapers of a ScreenshotQueue with a bounded worker pool.
+
+    Each worker runs one capture at a time on a server of the batch's own
+    XvfbPool, so at most `workers` engines and servers run at once, and a
+    server that crashed is replaced before the next item.
+    Results update the queue and the screenshot history, then go to
+    on_item(wp_id, result); on_finished() runs once the queue is drained or
+    after stop().
+    """
+
+    def __init__(self, config, perf_monitor, queue: ScreenshotQueue, directory: str,
+                 wp_ids: List[str], workers: int, delay: int, timeout: float,
+                 on_item: Callable[[str, Dict[str, Any]], None],
+                 on_finished: Callable[[], None]):
+        self.config = config
+        self.perf_monitor = perf_monitor
+        self.queue = queue
+        self.directory = directory
+        self.delay = delay
+        self.timeout = timeout
+        self._on_item = on_item
+        self._on_finished = on_finished
+        self.resolution = screenshot_resolution(config)
+        self.xvfb = XvfbPool()
+        self.workers = [_Worker(i) for i in range(max(1, workers))]
+        self._pending = list(wp_ids)
+        self._stopped = False
+        self._finished = False
+
+    def output_path(self, wp_id: str) -> str:
+        return os.path.join(self.directory, f"{wp_id}.png")
+
+    def start(self):
+        self._fill()
+
+    def stop(self):
+        """Cancel the running captures; their items stay pending for the next run"""
+        self._stopped = True
+        for worker in self.workers:
+            if worker.tracker:
+                worker.tracker.cancel()
+                worker.tracker = None
+                self._remove(self.output_path(worker.wp_id))
+        self._finish()
+
+    def _fill(self):
+        for worker in self.workers:
+            # wp_id is set from launch until the result is recorded
+            if worker.wp_id is None and self._pending and not self._stopped:
+                self._launch(worker, self._pending.pop(0))
+        if not self._pending and all(w.wp_id is None for w in self.workers):
+            self._finish()
+
+    def _launch(self, worker: _Worker, wp_id: str):
+        path = self.output_path(wp_id)
+        self._remove(path)
+        started = time.monotonic()
+        worker.wp_id = wp_id
+        self.xvfb.acquire(self.resolution,
+                          lambda display, error: self._on_display(worker, wp_id, path, started, display, error))
+
+    def _on_display(self, worker: _Worker, wp_id: str, path: str, started: float,
+                    display: Optional[str], error: Optional[str]):
+        if self._stopped:
+            return
+        if display:
+            try:
+                proc, _cmd, _mode = start_screenshot(self.config, wp_id, path, self.delay,
+                                                     worker.error_log, display)
+            except Exception as e:
+                self.xvfb.release(display)
+                error = str(e)
+        if error:
+            # The worker is free again for the next item
+            worker.wp_id = None
+            self._record(worker, wp_id, {"ok": False, "path": path, "error": "start",
+                                         "output": error, "stats": None,
+                                         "seconds": time.monotonic() - started})
+            self._fill()
+            return
+        self.xvfb.attach(display, proc)
+        task = self.perf_monitor.start_task(worker.task, proc.pid)
+        worker.tracker = CaptureTracker(proc, path, self.timeout, self.perf_monitor, task,
+                                        worker.error_log, lambda result: self._on_done(worker, wp_id, result))
+
+    def _on_done(self, worker: _Worker, wp_id: str, result: Dict[str, Any]):
+        worker.tracker = None
+        worker.wp_id = None
+        self._record(worker, wp_id, result)
+        self._fill()
+
+    def _record(self, worker: _Worker, wp_id: str, result: Dict[str, Any]):
+        if result["ok"]:
+            worker.captured += 1
+            stats = result["stats"] or {}
+            self.queue.mark(wp_id, "done", seconds=round(result["seconds"], 2))
+            self.perf_monitor.add_screenshot_history(wp_id, result["path"], stats)
+        else:
+            self._remove(result["path"])
+            self.queue.mark(wp_id, "failed", error=result["error"],
+                            output=(result["output"] or "")[-300:])
+        try:
+            self._on_item(wp_id, result)
+        except Exception as e:
+            print(f"[BATCH] Callback error: {e}")
+
+    def _remove(self, path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _finish(self):
+        if self._finished:
+            return
+        self._finished = True
+        self.xvfb.shutdown()
+        self._on_finished()
@@ -0,0 +1,260 @@
+import os
+import signal
+import subprocess
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from gi.repository import GLib
+
+from py_GUI.core.capture import ERROR_TAIL, x11_env
+from py_GUI.core.renderers import ENGINE
+from py_GUI.core.supervisor import describe_exit
+from py_GUI.core.xvfb import XvfbPool
+
+# PerformanceMonitor category of the engine being measured
+BENCHMARK_TASK = "benchmark"
+# Seconds measured per wallpaper, after the warm-up
+BENCHMARK_DURATION = 30.0
+# Seconds of loading and shader compilation left out of the measurement
+BENCHMARK_WARMUP = 5.0
+BENCHMARK_RESOLUTION = "1920x1080"
+BENCHMARK_ERROR_LOG = "/tmp/wallpaper_benchmark_error.log"
+# Seconds a stopped engine gets to exit before SIGKILL
+STOP_GRACE = 2.0
+# Result statuses: measured, exited during the measurement, never got past the warm-up
+BENCHMARK_STATUSES = ("ok", "crashed", "failed")
+
+
+def wallpaper_version(workshop_path: str, wp_id: str, wallpaper: Dict) -> Optional[str]:
+    """project.json mtime, size and declared version, like the properties cache key"""
+    try:
+        st = os.stat(os.path.join(workshop_path, wp_id, "project.json"))
+    except OSError:
+        return None
+    return f"{st.st_mtime_ns}:{st.st_size}:{wallpaper.get('version', '')}"
+
+
+class BenchmarkRunner:
+    """
+    Measures wallpapers one after another in a headless engine.
+
+    Each engine runs on an Xvfb display of an XvfbPool for warmup + duration
+    seconds. PerformanceMonitor samples it every second; the samples taken
+    after the warm-up give the result's CPU, RSS and thread figures. Runs
+    are sequential so wallpapers do not compete for the CPU. An engine that
+    exits during the measurement is recorded as "crashed"; one that exits
+    during the warm-up or cannot be started is "failed". Each result is
+    stored per wallpaper version and passed to on_item(wp_id, record).
+
+    Xvfb renders in software, so the figures rank wallpapers against each
+    other rather than predict the cost on a GPU.
+    """
+
+    def __init__(self, config, perf_monitor, store, wallpapers: List[Tuple[str, str]],
+                 on_item: Callable[[str, Dict[str, Any]], None],
+                 on_finished: Callable[[], None],
+                 duration: float = BENCHMARK_DURATION, warmup: float = BENCHMARK_WARMUP,
+                 resolution: str = BENCHMARK_RESOLUTION, fps: Optional[int] = None):
+        self.config = config
+        self.perf_monitor = perf_monitor
+        self.store = store
+        self.duration = duration
+        self.warmup = warmup
+        self.resolution = resolution
+        self.fps = fps if fps is not None else int(config.get("fps", 30))
+        self._queue = list(wallpapers)
+        self._on_item = on_item
+        self._on_finished = on_finished
+        self.xvfb = XvfbPool()
+
+        self._lock = threading.Lock()
+        self._samples: List[Tuple[float, float, int]] = []
+        self._current: Optional[Tuple[str, str]] = None
+        self._proc: Optional[subprocess.Popen] = None
+        self._started = 0.0
+        self._measure_from = 0.0
+        self._end_source = 0
+        self._kill_source = 0
+        self._measured = False
+        self._stopped = False
+        self._finished = False
+        perf_monitor.add_callback(self._on_sample)
+
+    def command(self, wp_id: str) -> List[str]:
+        cmd = [ENGINE, "--silent", "-f", str(self.fps), "--window", f"0x0x{self.resolution}"]
+        assets_path = self.config.get("assetsPath")
+        if assets_path:
+            cmd.extend(["--assets-dir", assets_path])
+        cmd.append(str(wp_id))
+        return cmd
+
+    def start(self):
+        self._next()
+
+    def stop(self):
+        """Abandon the running measurement (not recorded) and the rest of the queue"""
+        self._stopped = True
+        self._queue.clear()
+        if self._proc is not None:
+            self._remove_sources()
+            self._measured = True
+            self.perf_monitor.stop_monitoring(BENCHMARK_TASK)
+            self._signal(signal.SIGKILL)
+        self._finish()
+
+    # Runs
+
+    def _next(self) -> bool:
+        if self._stopped or not self._queue:
+            self._finish()
+            return False
+        self._current = self._queue.pop(0)
+        self.xvfb.acquire(self.resolution, self._on_display)
+        return False
+
+    def _on_display(self, display: Optional[str], error: Optional[str]):
+        if self._stopped:
+            return
+        wp_id, _version = self._current
+        self._started = time.monotonic()
+        self._measure_from = self._started + self.warmup
+        self._measured = False
+        with self._lock:
+            self._samples = []
+
+        if display:
+            try:
+                with open(BENCHMARK_ERROR_LOG, "w") as err_log:
+                    proc = subprocess.Popen(self.command(wp_id), stdout=subprocess.DEVNULL,
+                                            stderr=err_log, start_new_session=True,
+                                            env=x11_env(display))
+            except OSError as e:
+                self.xvfb.release(display)
+                error = str(e)
+        if error:
+            self._record("failed", error=error)
+            GLib.idle_add(self._next)
+            return
+
+        self._proc = proc
+        self.xvfb.attach(display, proc)
+        self.perf_monitor.start_monitoring(BENCHMARK_TASK, proc.pid)
+        GLib.child_watch_add(GLib.PRIORITY_DEFAULT, proc.pid, self._on_exit)
+        self._end_source = GLib.timeout_add(int((self.warmup + self.duration) * 1000), self._on_end)
+
+    def _on_sample(self, stats: Dict[str, Any]):
+        # Runs on the PerformanceMonitor thread
+        data = stats.get("details", {}).get(BENCHMARK_TASK)
+        proc = self._proc
+        if not data or proc is None or data.get("pid") != proc.pid:
+            return
+        if time.monotonic() < self._measure_from:
+            return
+        with self._lock:
+            if not self._measured:
+                self._samples.append((data["cpu"], data["memory_mb"], data["threads"]))
+
+    def _on_end(self) -> bool:
+        self._end_source = 0
+        self._finish_measurement()
+        self._record("ok" if self._samples else "failed",
+                     error=None if self._samples else "no samples")
+        # The next run starts once this engine is reaped
+        self._signal(signal.SIGTERM)
+        self._kill_source = GLib.timeout_add(int(STOP_GRACE * 1000), self._kill)
+        return False
+
+    def _kill(self) -> bool:
+        self._kill_source = 0
+        self._signal(signal.SIGKILL)
+        return False
+
+    def _on_exit(self, _pid: int, status: int):
+        proc = self._proc
+        if proc is None:
+            return
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        self._proc = None
+        if not self._measured:
+            # Exited on its own before the measurement ended
+            self._remove_sources()
+            self._finish_measurement()
+            early = time.monotonic() < self._measure_from
+            error = describe_exit(proc.returncode)
+            tail = self._error_tail()
+            if tail:
+                error = f"{error}: {tail}"
+            self._record("failed" if early else "crashed", error=error)
+        else:
+            self._remove_sources()
+        if not self._stopped:
+            self._next()
+
+    def _finish_measurement(self):
+        with self._lock:
+            self._measured = True
+        self.perf_monitor.stop_monitoring(BENCHMARK_TASK)
+
+    # Results
+
+    def _record(self, status: str, error: Optional[str] = None):
+        wp_id, version = self._current
+        with self._lock:
+            samples = list(self._samples)
+        record: Dict[str, Any] = {
+            "wp_id": wp_id,
+            "version": version,
+            "timestamp": time.time(),
+            "status": status,
+            "duration": time.monotonic() - self._started,
+            "samples": len(samples),
+            "avg_cpu": 0.0, "peak_cpu": 0.0,
+            "avg_rss_mb": 0.0, "peak_rss_mb": 0.0,
+            "avg_threads": 0.0, "peak_threads": 0,
+            "error": error,
+        }
+        if samples:
+            cpu, rss, threads = zip(*samples)
+            record.update({
+                "avg_cpu": sum(cpu) / len(cpu), "peak_cpu": max(cpu),
+                "avg_rss_mb": sum(rss) / len(rss), "peak_rss_mb": max(rss),
+                "avg_threads": sum(threads) / len(threads), "peak_threads": max(threads),
+            })
+        try:
+            self.store.add_benchmark(record)
+        except Exception as e:
+            print(f"[BENCHMARK] Failed to save result of {wp_id}: {e}")
+        try:
+            self._on_item(wp_id, record)
+        except Exception as e:
+            print(f"[BENCHMARK] Callback error: {e}")
+
+    def _error_tail(self) -> str:
+        try:
+            with open(BENCHMARK_ERROR_LOG, "r", errors="replace") as f:
+                lines = f.read()[-ERROR_TAIL:].strip().splitlines()
+        except OSError:
+            return ""
+        return lines[-1] if lines else ""
+
+    def _signal(self, sig: int):
+        if self._proc is None:
+            return
+        try:
+            os.killpg(self._proc.pid, sig)
+        except OSError:
+            pass
+
+    def _remove_sources(self):
+        for source in (self._end_source, self._kill_source):
+            if source:
+                GLib.source_remove(source)
+        self._end_source = self._kill_source = 0
+
+    def _finish(self):
+        if self._finished:
+            return
+        self._finished = True
+        self.xvfb.shutdown()
+        self._on_finished()
@@ -0,0 +1,273 @@
+import os
+import re
+import shutil
+import signal
+import subprocess
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from gi.repository import Gio, GLib
+
+from py_GUI.core.xvfb import have_xvfb
+
+DEFAULT_RESOLUTION = "3840x2160"
+# Seconds an interrupted engine gets to save its frame and exit before SIGKILL
+EXIT_GRACE = 2.0
+# Characters of the engine's error output kept in a failed result
+ERROR_TAIL = 2000
+
+
+def screenshot_resolution(config) -> str:
+    """screenshotRes as WIDTHxHEIGHT, DEFAULT_RESOLUTION if it is not one"""
+    res = config.get("screenshotRes", DEFAULT_RESOLUTION)
+    res = res.strip() if isinstance(res, str) else ""
+    if not re.fullmatch(r"\d+[xX]\d+", res):
+        return DEFAULT_RESOLUTION
+    return res.lower()
+
+
+def uses_xvfb(config) -> bool:
+    """Whether screenshots render in Xvfb rather than in a window"""
+    installed = have_xvfb() or shutil.which("xvfb-run") is not None
+    return installed and bool(config.get("preferXvfb", True))
+
+
+def capture_timeout(delay: int, headless: bool) -> float:
+    """Seconds a capture of delay frames may take before the engine is interrupted"""
+    # Xvfb renders in software, at 4K close to one frame per second
+    if headless:
+        return delay / 1.0 + 20.0
+    return delay / 60.0 + 3.0
+
+
+def x11_env(display: Optional[str] = None) -> Dict[str, str]:
+    """Environment that keeps the engine on X11 (and on display, if given)"""
+    env = os.environ.copy()
+    # Aggressively strip Wayland indicators
+    env.pop("WAYLAND_DISPLAY", None)
+    env["XDG_SESSION_TYPE"] = "x11"
+    env["SDL_VIDEODRIVER"] = "x11"
+    env["GDK_BACKEND"] = "x11"
+    # Ensure software rendering fallback if hardware GL fails in Xvfb
+    env["LIBGL_ALWAYS_SOFTWARE"] = "1"
+    if display:
+        env["DISPLAY"] = display
+    return env
+
+
+def start_screenshot(config, wp_id: str, output_path: str, delay: int, error_log: str,
+                     display: Optional[str] = None) -> Tuple[subprocess.Popen, List[str], str]:
+    """
+    Start the engine's screenshot mode: (process, command, description).
+
+    On display if given (a shared XvfbPool server), else wrapped in
+    xvfb-run when available and preferred, else in a window. The process leads a new session so its
+    whole group can be signalled; stderr goes to error_log.
+    """
+    res = screenshot_resolution(config)
+    # Base command for the engine
+    engine_cmd = [
+        "linux-wallpaperengine",
+        "--screenshot", output_path,
+        "--screenshot-delay", str(delay),
+        "--silent",
+        "-f", "60",
+        str(wp_id)
+    ]
+    assets_path = config.get("assetsPath")
+    if assets_path:
+        engine_cmd.extend(["--assets-dir", assets_path])
+    # Even in Xvfb, we MUST force the engine to create a window of the target resolution
+    # Otherwise it might default to 640x480 or 800x600
+    engine_cmd.extend(["--window", f"0x0x{res}"])
+
+    env = None
+    if display:
+        cmd = engine_cmd
+        env = x11_env(display)
+        mode_msg = f"Silent (Xvfb {display}) at {res}"
+    elif shutil.which("xvfb-run") and config.get("preferXvfb", True):
+        # Important: The server args must be a single string for -s
+        xvfb_args = ["-a", "-s", f"-screen 0 {res}x24 +extension GLX"]
+        cmd = [shutil.which("xvfb-run") or "xvfb-run"] + xvfb_args + engine_cmd
+        env = x11_env()
+        mode_msg = f"Silent (Xvfb) at {res}"
+    else:
+        cmd = engine_cmd
+        mode_msg = f"Windowed at {res} (Xvfb not found)"
+
+    with open(error_log, "w") as err_log:
+        proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=err_log,
+                                start_new_session=True, env=env)
+    return proc, cmd, mode_msg
+
+
+def _file_size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+class CaptureTracker:
+    """
+    Follows one screenshot engine until its frame is on disk.
+
+    A Gio.FileMonitor on the output file reports when the engine closes it
+    after writing (CHANGES_DONE_HINT, inotify's close-write). The engine
+    keeps rendering after that, so it is interrupted then. An engine that
+    exits on its own, or is interrupted at the timeout (it saves on exit), is
+    judged by the file it leaves. on_done(result) runs once on the main loop
+    with:
+
+        ok       the frame was written
+        path     output_path
+        error    None, "exited" or "timeout"
+        output   tail of the engine's error log when not ok
+        stats    PerformanceMonitor.stop_task() figures of the capture
+        seconds  time from start to result
+    """
+
+    def __init__(self, proc: subprocess.Popen, output_path: str, timeout: float,
+                 perf_monitor, task: Dict[str, Any], error_log: str,
+                 on_done: Callable[[Dict[str, Any]], None]):
+        self.proc = proc
+        self.output_path = output_path
+        self.timeout = timeout
+        self.perf_monitor = perf_monitor
+        self._task = task
+        self.error_log = error_log
+        self._on_done = on_done
+        self.started = time.monotonic()
+        self.done = False
+        self._stats: Optional[Dict[str, float]] = None
+        self._error: Optional[str] = None
+        self._kill_source = 0
+        self._monitor = Gio.File.new_for_path(output_path).monitor_file(Gio.FileMonitorFlags.NONE, None)
+        self._monitor.connect("changed", self._on_file_changed)
+        # The child watch stays until the engine is reaped, even after cancel()
+        GLib.child_watch_add(GLib.PRIORITY_DEFAULT, proc.pid, self._on_exit)
+        self._timeout_source = GLib.timeout_add(int(timeout * 1000), self._on_timeout)
+
+    def cancel(self):
+        """Stop the engine without reporting a result"""
+        if self.done:
+            return
+        self.done = True
+        self._teardown()
+        self._signal(signal.SIGKILL)
+        self.perf_monitor.stop_monitoring(self._task["category"])
+
+    def _on_file_changed(self, _monitor, _file, _other, event):
+        if self.done or self._stats is not None:
+            return
+        if event == Gio.FileMonitorEvent.CHANGES_DONE_HINT and _file_size(self.output_path) > 0:
+            self._collect_stats()
+            self._interrupt()
+
+    def _on_timeout(self) -> bool:
+        self._timeout_source = 0
+        if not self.done and self._stats is None:
+            self._error = "timeout"
+            self._collect_stats()
+            self._interrupt()
+        return False
+
+    def _interrupt(self):
+        """SIGINT lets the engine save a pending frame; SIGKILL if it lingers"""
+        self._signal(signal.SIGINT)
+        if not self._kill_source:
+            self._kill_source = GLib.timeout_add(int(EXIT_GRACE * 1000), self._kill)
+
+    def _kill(self) -> bool:
+        self._kill_source = 0
+        if not self.done:
+            self._signal(signal.SIGKILL)
+        return False
+
+    def _signal(self, sig: int):
+        try:
+            os.killpg(os.getpgid(self.proc.pid), sig)
+        except OSError:
+            pass
+
+    def _collect_stats(self):
+        # Sampled while the engine still runs, so the figures cover the capture
+        self._stats = self.perf_monitor.stop_task(self._task)
+        self.perf_monitor.stop_monitoring(self._task["category"])
+
+    def _on_exit(self, _pid: int, status: int):
+        # GLib reaped the child; keep the Popen object consistent
+        self.proc.returncode = os.waitstatus_to_exitcode(status)
+        if self.done:
+            return
+        if self._stats is None:
+            self._collect_stats()
+        self.done = True
+        self._teardown()
+
+        ok = _file_size(self.output_path) > 0
+        output = ""
+        if not ok:
+            self._error = self._error or "exited"
+            try:
+                with open(self.error_log, "r", errors="replace") as f:
+                    output = f.read().strip()[-ERROR_TAIL:]
+            except OSError:
+                pass
+        try:
+            self._on_done({
+                "ok": ok,
+                "path": self.output_path,
+                "error": None if ok else self._error,
+                "output": output,
+                "stats": self._stats,
+                "seconds": time.monotonic() - self.started,
+            })
+        except Exception as e:
+            print(f"[CAPTURE] Callback error: {e}")
+
+    def _teardown(self):
+        self._monitor.cancel()
+        for source in (self._timeout_source, self._kill_source):
+            if source:
+                GLib.source_remove(source)
+        self._timeout_source = self._kill_source = 0
+
+
+class PendingCapture:
+    """
+    Stands in for a CaptureTracker while a capture waits for its Xvfb server.
+
+    The owner sets tracker once the engine runs, or calls fail() if it cannot
+    be started; cancel() works in both stages. After a cancel() before the
+    engine started, done is True and the owner should not start it.
+    """
+
+    def __init__(self, output_path: str, timeout: float, on_done: Callable[[Dict[str, Any]], None]):
+        self.output_path = output_path
+        self.timeout = timeout
+        self._on_done = on_done
+        self.started = time.monotonic()
+        self.tracker: Optional[CaptureTracker] = None
+        self.done = False
+
+    def cancel(self):
+        if self.tracker:
+            self.tracker.cancel()
+        self.done = True
+
+    def fail(self, output: str):
+        """Report a capture whose engine could not be started"""
+        self.done = True
+        try:
+            self._on_done({
+                "ok": False,
+                "path": self.output_path,
+                "error": "start",
+                "output": output,
+                "stats": None,
+                "seconds": time.monotonic() - self.started,
+            })
+        except Exception as e:
+            print(f"[CAPTURE] Callback error: {e}")
@@ -1,31 +1,194 @@
 import os
+import copy
 import json
-from typing import Dict
+import atexit
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Tuple
 from py_GUI.const import CONFIG_DIR, CONFIG_FILE, DEFAULT_CONFIG
 
+# Delay before a pending change is written to disk. Bursts of set() calls
+# within this window (settings save, apply, cycling) collapse into one write.
+SAVE_DELAY = 0.5
+
+
 class ConfigManager:
-    def __init__(self):
+    def __init__(self, save_delay: float = SAVE_DELAY):
         os.makedirs(CONFIG_DIR, exist_ok=True)
         self.config = self.load()
+        self._save_delay = save_delay
+        self._lock = threading.RLock()
+        # Serializes writers of the temp file (timer flush vs. quit flush)
+        self._write_lock = threading.Lock()
+        self._dirty = False
+        # Bumped on every change, so a write only clears _dirty if nothing changed meanwhile
+        self._generation = 0
+        self._batch_depth = 0
+        self._timer: threading.Timer | None = None
+        # key -> {handler_id: callback(key, old, new)}
+        self._listeners: Dict[str, Dict[int, Callable[[str, Any, Any], None]]] = {}
+        self._next_handler_id = 1
+        # key -> (old, new) collected while a batch is open
+        self._pending_changes: Dict[str, Tuple[Any, Any]] = {}
+        atexit.register(self.flush)
 
     def load(self) -> Dict:
         if os.path.exists(CONFIG_FILE):
             try:
                 with open(CONFIG_FILE, 'r') as f:
                     cfg = json.load(f)
-                    return {**DEFAULT_CONFIG, **cfg}
+                    # Deep copy: nested defaults such as powerProfiles are edited in place
+                    return {**copy.deepcopy(DEFAULT_CONFIG), **cfg}
             except Exception:
                 pass
-        return DEFAULT_CONFIG.copy()
+        return copy.deepcopy(DEFAULT_CONFIG)
 
     def save(self):
-        with open(CONFIG_FILE, 'w') as f:
-            json.dump(self.config, f, indent=2)
+        """Write config to disk immediately (atomic temp file + rename).
+
+        The config is copied under the lock and the copy is written, so
+        set() calls on other threads never race with json.dump. Raises on
+        failure and leaves the config dirty.
+        """
+        with self._write_lock:
+            with self._lock:
+                self._cancel_timer()
+                snapshot = copy.deepcopy(self.config)
+                generation = self._generation
+            tmp_path = f"{CONFIG_FILE}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(snapshot, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, CONFIG_FILE)
+            with self._lock:
+                if self._generation == generation:
+                    self._dirty = False
+
+    def flush(self):
+        """Write pending changes now, if any. Called on quit.
+
+        A failed write is logged and the changes stay pending, so the next
+        flush tries again.
+        """
+        with self._lock:
+            if not self._dirty:
+                return
+        try:
+            self.save()
+        except Exception as e:
+            print(f"[CONFIG] Failed to save config: {e}")
 
     def get(self, key: str, default=None):
         val = self.config.get(key)
         return val if val is not None else default
 
     def set(self, key: str, value):
-        self.config[key] = value
-        self.save()
+        with self._lock:
+            old = self.config.get(key)
+            self.config[key] = value
+            self._mark_dirty()
+            changes = self._record_change(key, old, value)
+        self._emit(changes)
+
+    def remove(self, key: str):
+        with self._lock:
+            if key not in self.config:
+                return
+            old = self.config.pop(key)
+            self._mark_dirty()
+            changes = self._record_change(key, old, None)
+        self._emit(changes)
+
+    def connect(self, key: str, callback: Callable[[str, Any, Any], None]) -> int:
+        """Call callback(key, old, new) whenever the value of key changes.
+
+        Callbacks run synchronously on the thread that changed the value,
+        after the change is applied. Inside a batch() they are deferred to the
+        end of the outermost batch and fire once per key. Returns a handler id
+        for disconnect().
+        """
+        with self._lock:
+            handler_id = self._next_handler_id
+            self._next_handler_id += 1
+            self._listeners.setdefault(key, {})[handler_id] = callback
+            return handler_id
+
+    def disconnect(self, handler_id: int):
+        with self._lock:
+            for key, handlers in list(self._listeners.items()):
+                if handlers.pop(handler_id, None) is not None:
+                    if not handlers:
+                        del self._listeners[key]
+                    return
+
+    @contextmanager
+    def batch(self):
+        """Group several set() calls into a single deferred write.
+
+        with config.batch():
+            config.set("fps", 30)
+            config.set("scaling", "fit")
+        """
+        with self._lock:
+            self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            changes = []
+            with self._lock:
+                self._batch_depth -= 1
+                if self._batch_depth == 0:
+                    if self._dirty:
+                        self._schedule_save()
+                    changes = [(k, old, new) for k, (old, new) in self._pending_changes.items()
+                               if not self._same(old, new)]
+                    self._pending_changes.clear()
+            self._emit(changes)
+
+    @staticmethod
+    def _same(old, new) -> bool:
+        # The same object passed back in was most likely mutated in place,
+        # so treat it as a change rather than compare it with itself.
+        if old is new:
+            return not isinstance(new, (dict, list))
+        return old == new
+
+    def _record_change(self, key: str, old, new) -> list:
+        """Return changes to emit now, or stash them until the batch closes"""
+        if key not in self._listeners:
+            return []
+        if self._batch_depth > 0:
+            first_old = self._pending_changes.get(key, (old, None))[0]
+            self._pending_changes[key] = (first_old, new)
+            return []
+        if self._same(old, new):
+            return []
+        return [(key, old, new)]
+
+    def _emit(self, changes):
+        for key, old, new in changes:
+            with self._lock:
+                callbacks = list(self._listeners.get(key, {}).values())
+            for callback in callbacks:
+                try:
+                    callback(key, old, new)
+                except Exception as e:
+                    print(f"[CONFIG] Change handler for '{key}' failed: {e}")
+
+    def _mark_dirty(self):
+        self._dirty = True
+        self._generation += 1
+        if self._batch_depth == 0:
+            self._schedule_save()
+
+    def _schedule_save(self):
+        self._cancel_timer()
+        self._timer = threading.Timer(self._save_delay, self.flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _cancel_timer(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
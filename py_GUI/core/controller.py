@@ -2,31 +2,96 @@ import subprocess
 import os
 import shutil
 import re
-from typing import Optional, Callable, List, Tuple, Dict, TextIO
+import time
+from typing import Any, Optional, Callable, List, Dict, Iterable, Set, Union
+from gi.repository import GLib
 from py_GUI.core.config import ConfigManager
 from py_GUI.core.properties import PropertiesManager
 from py_GUI.core.logger import LogManager
+from py_GUI.core.storage import WallpaperStore
 
 from py_GUI.core.screen import ScreenManager
-from py_GUI.core.performance import PerformanceMonitor
+from py_GUI.core.performance import PerformanceMonitor, backend_screen
+from py_GUI.core.supervisor import EngineSupervisor, READY_POLL_WINDOW, STARTUP_WINDOW, describe_exit
+from py_GUI.core.power import PowerMonitor
+from py_GUI.core.suspend import SuspendManager
+from py_GUI.core.limits import LaunchPolicy
+from py_GUI.core.snapshot import StaticSnapshots, CAPTURE_DELAY, CAPTURE_TIMEOUT
+from py_GUI.core.renderers import RendererSelector
+from py_GUI.core.xvfb import XvfbPool, have_xvfb
+from py_GUI.core.capture import (CaptureTracker, PendingCapture, capture_timeout,
+                                 screenshot_resolution, start_screenshot, uses_xvfb)
+
+# Restart requests arriving within this window are merged into one launch
+RESTART_COALESCE_MS = 150
+
+# Seamless switching (seamlessSwitch): the old engine keeps rendering until the
+# new one is ready (see EngineSupervisor), or switchTimeout passes.
+SWITCH_TIMEOUT = 5.0
+# Seconds an apply waits for its engine to be ready before the sample is recorded as timed out
+APPLY_READY_TIMEOUT = READY_POLL_WINDOW
+# Free memory required on top of the new engine's expected RSS to overlap two engines
+SWITCH_HEADROOM_MB = 256
+# Expected engine RSS when neither the ledger nor a running engine can tell
+DEFAULT_ENGINE_MB = 512
 
 class WallpaperController:
     def __init__(self, config: ConfigManager, prop_manager: PropertiesManager, 
-                 log_manager: LogManager, screen_manager: ScreenManager):
+                 log_manager: LogManager, screen_manager: ScreenManager,
+                 store: Optional[WallpaperStore] = None):
         self.config = config
+        self.store = store
         self.prop_manager = prop_manager
         self.log_manager = log_manager
         self.screen_manager = screen_manager
         self.current_proc: Optional[subprocess.Popen[bytes]] = None
         self.show_toast: Callable[[str], None] = lambda msg: None
+        # Called after a scheduled restart ran, e.g. to refresh the copy-command tooltip
+        self.on_engines_changed: Callable[[], None] = lambda: None
         self._last_command: List[str] = []
         self.history_manager = None
         self.wp_manager = None
-        self.engine_log: Optional[TextIO] = None
+        # processMode "per_screen": one engine per output, keyed by screen
+        self._screen_procs: Dict[str, subprocess.Popen] = {}
+        self._screen_commands: Dict[str, List[str]] = {}
+        # schedule_restart() state; None in _pending_screens means all screens
+        self._restart_source = 0
+        self._pending_screens: Optional[Set[str]] = set()
+        self._pending_force = False
+        self._pending_requests = 0
+        # Apply latency: apply() timings per screen wait for the scheduled restart
+        # (_launch_applies while it runs), then per engine pid for its first frame
+        self._pending_applies: Dict[str, Dict] = {}
+        self._launch_applies: Dict[str, Dict] = {}
+        self._ready_waits: Dict[int, List[Dict]] = {}
+        self._history_seconds = 0.0
+        # Set while a restart deferred by _defer_until_loaded() runs
+        self._property_wait_done = False
         
-        self.perf_monitor = PerformanceMonitor(config=config)
+        self.perf_monitor = PerformanceMonitor(config=config, store=store)
+        self.supervisor = EngineSupervisor(log_manager)
+        self.launch_policy = LaunchPolicy(config, log_manager)
+        self.renderers = RendererSelector(config, self.build_command)
+        self.supervisor.on_crashed = self._on_engine_crashed
+        self.supervisor.on_restarted = self._on_engine_restarted
+        self.supervisor.on_first_frame = self._on_first_frame
+        self.config.connect("active_monitors", lambda key, old, new: self.sync_history())
+        self.power = PowerMonitor(config)
+        self.power.connect(self._on_power_profile_changed)
+        self.config.connect("lowBatteryThreshold", lambda key, old, new: self.power.refresh())
+        self.power.start()
+        self.suspend_manager = SuspendManager(config, self.supervisor, self.perf_monitor, log_manager)
+        self.suspend_manager.start()
+        self.xvfb = XvfbPool(log_manager)
+        self.snapshots = StaticSnapshots(
+            config, self.power, log_manager,
+            lambda wp_id, path, on_done: self.capture(
+                wp_id, path, on_done, CAPTURE_DELAY, task="snapshot", timeout=CAPTURE_TIMEOUT),
+            self.workshop_path)
+        self.snapshots.connect(self._on_snapshots_changed)
+        self.snapshots.start()
         
-        if shutil.which("xvfb-run"):
+        if have_xvfb() or shutil.which("xvfb-run"):
             self.log_manager.add_info("Xvfb detected: Silent screenshots enabled", "Controller")
         else:
             self.log_manager.add_info("Xvfb not found: Screenshots will spawn a window", "Controller")
@@ -34,9 +99,14 @@ class WallpaperController:
     def set_toast_callback(self, callback: Callable[[str], None]):
         self.show_toast = callback
 
+    def set_engines_changed_callback(self, callback: Callable[[], None]):
+        self.on_engines_changed = callback
+
     def apply(self, wp_id: str, screen: Optional[str] = None, screens: Optional[List[str]] = None):
         """Apply wallpaper (Multi-monitor support)"""
-        
+        started = time.monotonic()
+        self._history_seconds = 0.0
+
         target_screens = []
         if screens:
             target_screens = screens
@@ -52,27 +122,44 @@ class WallpaperController:
         
         for s in target_screens:
             active_monitors[s] = wp_id
+
+        with self.config.batch():
+            self.config.set("active_monitors", active_monitors)
+            self.config.set("lastWallpaper", wp_id)
             
-        self.config.set("active_monitors", active_monitors)
-        self.config.set("lastWallpaper", wp_id)
-        
-        if len(target_screens) == 1:
-            self.config.set("lastScreen", target_screens[0])
+            if len(target_screens) == 1:
+                self.config.set("lastScreen", target_screens[0])
+
+        # Closing the batch fires active_monitors, which runs sync_history()
+        scheduled = time.monotonic()
+        history = self._history_seconds
+        for s in target_screens:
+            self._pending_applies[s] = {
+                "wp_id": str(wp_id), "started": started, "scheduled": scheduled,
+                "config": scheduled - started - history, "history": history,
+            }
 
         self.log_manager.add_info(f"Applying wallpaper {wp_id} to {target_screens}", "Controller")
         
-        # Record wallpaper in history if HistoryManager is available
-        if self.history_manager:
-            try:
-                wp_details = self.wp_manager.get_wallpaper(wp_id)
+        self.schedule_restart(target_screens)
+
+    def sync_history(self):
+        """Open/close play sessions so history matches active_monitors"""
+        if not self.history_manager:
+            return
+        started = time.monotonic()
+        active_ids = {str(wid) for wid in (self.config.get("active_monitors", {}) or {}).values() if wid}
+        try:
+            self.history_manager.sync_active(active_ids)
+            for wp_id in active_ids - self.history_manager.playing():
+                wp_details = self.wp_manager.get_wallpaper(wp_id) if self.wp_manager else None
                 if wp_details:
                     title = wp_details.get('title', 'Unknown')
                     preview = wp_details.get('preview', '')
                     self.history_manager.add(wp_id, title, preview)
-            except Exception as e:
-                self.log_manager.add_error(f"Failed to record wallpaper in history: {e}", "Controller")
-        
-        self.restart_wallpapers()
+        except Exception as e:
+            self.log_manager.add_error(f"Failed to record wallpaper in history: {e}", "Controller")
+        self._history_seconds += time.monotonic() - started
 
     def stop_screen(self, screen: str):
         """Stop wallpaper on a specific screen"""
@@ -84,13 +171,54 @@ class WallpaperController:
             
             if not active_monitors:
                 self.stop()
+            elif self.is_per_screen() and not self.current_proc:
+                self._stop_screen_process(screen)
             else:
                 self.restart_wallpapers()
 
-    def restart_wallpapers(self):
+    def schedule_restart(self, screens: Optional[Iterable[str]] = None, force: bool = False):
+        """
+        Queue an engine restart; requests within RESTART_COALESCE_MS run as one.
+
+        screens limits the restart to those screens' engines (per-screen mode),
+        None restarts everything. Unless force is set, engines whose command
+        would not change keep running.
+        """
+        if screens is None:
+            self._pending_screens = None
+        elif self._pending_screens is not None:
+            self._pending_screens.update(screens)
+        self._pending_force = self._pending_force or force
+        self._pending_requests += 1
+        if not self._restart_source:
+            self._restart_source = GLib.timeout_add(RESTART_COALESCE_MS, self._run_scheduled_restart)
+
+    def _cancel_scheduled_restart(self):
+        if self._restart_source:
+            GLib.source_remove(self._restart_source)
+            self._restart_source = 0
+        self._pending_screens = set()
+        self._pending_force = False
+        self._pending_requests = 0
+
+    def _run_scheduled_restart(self) -> bool:
+        self._restart_source = 0
+        screens, force, requests = self._pending_screens, self._pending_force, self._pending_requests
+        self._cancel_scheduled_restart()
+        if requests > 1:
+            self.log_manager.add_debug(f"Coalesced {requests} restart requests into one", "Controller")
+        self._launch_applies, self._pending_applies = self._pending_applies, {}
+        if screens is None:
+            self.restart_wallpapers(force=force)
+        else:
+            self.restart_screens(sorted(screens), force=force)
+        # Applies whose engine kept running (unchanged command) have nothing to measure
+        self._launch_applies = {}
+        self.on_engines_changed()
+        return False
+
+    def restart_wallpapers(self, force: bool = False):
         """Restart the engine with current active_monitors configuration"""
-        self.stop()
-        
         # Validate screens
         active_monitors = dict(self.config.get("active_monitors", {}) or {})
         connected_screens = self.screen_manager.get_screens()
@@ -104,24 +232,347 @@ class WallpaperController:
             self.config.set("active_monitors", valid_monitors)
             active_monitors = valid_monitors
 
+        self.sync_history()
+
         if not active_monitors:
+            self.stop()
             self.log_manager.add_info("No active wallpapers for connected screens.", "Controller")
             return
 
+        # Property types decide how --set-property values are formatted;
+        # load them in parallel (usually already prefetched) before building.
+        if self._defer_until_loaded(set(active_monitors.values()),
+                                    lambda: self.restart_wallpapers(force=force)):
+            return
+
+        if self.is_per_screen():
+            if self.current_proc:
+                # Switching from the shared engine
+                self.stop()
+            for scr in [s for s in self._screen_procs if s not in active_monitors]:
+                self._stop_screen_process(scr)
+            restarted = [scr for scr in active_monitors if self.restart_screen(scr, force=force)]
+            if restarted:
+                self._sync_colors()
+            return
+
+        cmd = self._command_for(active_monitors)
+        if (not force and cmd == self._last_command and not self._screen_procs
+                and self.current_proc and self.supervisor.is_alive(self.current_proc.pid)):
+            self.log_manager.add_debug("Engine command unchanged, keeping the running engine", "Controller")
+            return
+
+        old_proc = None if self._screen_procs else self._detach_for_switch(None)
+        self.stop(keep=old_proc)
+        self._last_command = cmd
+        self.log_manager.add_debug(f"Executing: {' '.join(cmd)}", "Controller")
+
+        from py_GUI.const import CONFIG_DIR
+        log_path = os.path.join(CONFIG_DIR, "engine_last.log")
+        if old_proc:
+            proc = self._switch(cmd, log_path, None, list(active_monitors.values()), old_proc)
+        else:
+            proc = self._launch(cmd, log_path, None)
+        if proc:
+            self.current_proc = proc
+            self._sync_colors()
+
+    def _defer_until_loaded(self, wp_ids: Iterable[str], retry: Callable[[], None]) -> bool:
+        """
+        Load properties that are not in memory yet without blocking the main
+        loop: returns True if loads were queued, and retry() then runs on the
+        main loop once they all finished. False means go ahead now.
+        """
+        if self._property_wait_done:
+            # retry() itself: wallpapers whose load failed are built without types
+            return False
+        futures = self.prop_manager.prefetch(wp_ids)
+        if not futures:
+            return False
+        applies = self._launch_applies
+        remaining = [len(futures)]
+
+        def on_loaded() -> bool:
+            remaining[0] -= 1
+            if remaining[0]:
+                return False
+            self._launch_applies = applies
+            self._property_wait_done = True
+            try:
+                retry()
+            finally:
+                self._property_wait_done = False
+                self._launch_applies = {}
+            self.on_engines_changed()
+            return False
+
+        for future in futures:
+            future.add_done_callback(lambda _f: GLib.idle_add(on_loaded))
+        return True
+
+    def restart_screens(self, screens: List[str], force: bool = False):
+        """
+        Restart the engine for the given screens.
+
+        In per-screen mode only those screens' processes are replaced; the
+        shared process always renders every screen, so it restarts whole.
+        """
+        if not self.is_per_screen() or self.current_proc:
+            self.restart_wallpapers(force=force)
+            return
+        restarted = [scr for scr in screens if self.restart_screen(scr, force=force)]
+        if restarted:
+            self._sync_colors()
+
+    def restart_screen(self, screen: str, force: bool = False) -> bool:
+        """
+        Replace the engine process of one screen (per-screen mode).
+
+        Returns True if a new engine was started.
+        """
+        wp_id = (self.config.get("active_monitors", {}) or {}).get(screen)
+        if not wp_id:
+            self._stop_screen_process(screen)
+            return False
+        if screen not in self.screen_manager.get_screens():
+            self.log_manager.add_info(f"Screen {screen} is not connected, not starting it", "Controller")
+            self._stop_screen_process(screen)
+            return False
+
+        if self._defer_until_loaded({wp_id}, lambda: self.restart_screens([screen], force=force)):
+            return False
+        cmd = self._command_for({screen: wp_id})
+        proc = self._screen_procs.get(screen)
+        if (not force and proc and self.supervisor.is_alive(proc.pid)
+                and self._screen_commands.get(screen) == cmd):
+            self.log_manager.add_debug(f"Engine command for {screen} unchanged, keeping it", "Controller")
+            return False
+
+        old_proc = self._detach_for_switch(screen)
+        self._stop_screen_process(screen)
+        self._start_screen(screen, wp_id, cmd, old_proc)
+        return True
+
+    def _command_for(self, monitors: Dict[str, str]) -> List[str]:
+        """Static image command when snapshots stand in for the engine, else the renderer's command"""
+        static = self.snapshots.static_command(monitors)
+        if static:
+            return static
+        wallpapers = self._wallpapers_of(monitors)
+        renderer = self.renderers.pick(wallpapers, len(monitors))
+        if renderer is not self.renderers.engine:
+            self.log_manager.add_debug(
+                f"Rendering {', '.join(sorted(set(monitors.values())))} with {renderer.name}", "Controller")
+        cmd = renderer.command(monitors, wallpapers, self._launch_flags(monitors))
+        # Wrapped so a launch policy change also counts as a changed command
+        return self.launch_policy.wrap(cmd)
+
+    def workshop_path(self) -> str:
+        """Library directory the wallpapers are read from"""
+        if self.wp_manager:
+            return self.wp_manager.workshop_path
+        from py_GUI.const import WORKSHOP_PATH
+        return self.config.get("workshopPath", WORKSHOP_PATH)
+
+    def _wallpapers_of(self, monitors: Dict[str, str]) -> List[Dict]:
+        """Library entries of the wallpapers in monitors, empty if any is unknown"""
+        if not self.wp_manager:
+            return []
+        wallpapers = []
+        for wid in dict.fromkeys(str(w) for w in monitors.values()):
+            wp = self.wp_manager.get_wallpaper(wid)
+            if not wp:
+                return []
+            wallpapers.append(dict(wp, folder=os.path.join(self.workshop_path(), wid)))
+        return wallpapers
+
+    def is_per_screen(self) -> bool:
+        return self.config.get("processMode", "shared") == "per_screen"
+
+    def _start_screen(self, screen: str, wp_id: str, cmd: List[str],
+                      old_proc: Optional[subprocess.Popen] = None):
+        self._screen_commands[screen] = cmd
+        self.log_manager.add_debug(f"Executing for {screen}: {' '.join(cmd)}", "Controller")
+
+        from py_GUI.const import CONFIG_DIR
+        safe_name = re.sub(r"[^A-Za-z0-9_.-]", "_", screen)
+        log_path = os.path.join(CONFIG_DIR, f"engine_{safe_name}.log")
+        if old_proc:
+            proc = self._switch(cmd, log_path, screen, [wp_id], old_proc)
+        else:
+            proc = self._launch(cmd, log_path, screen)
+        if proc:
+            self._screen_procs[screen] = proc
+
+    def _stop_screen_process(self, screen: str):
+        self.perf_monitor.stop_monitoring(f"backend:{screen}")
+        self._screen_commands.pop(screen, None)
+        self._retire(self._screen_procs.pop(screen, None))
+
+    def _retire(self, proc: Optional[subprocess.Popen]):
+        """Stop an engine process without waiting for it"""
+        if proc:
+            self.supervisor.stop_pid(proc.pid)
+
+    def _category(self, screen: Optional[str]) -> str:
+        """Performance/supervisor key of the shared engine (None) or a screen's engine"""
+        return "backend" if screen is None else f"backend:{screen}"
+
+    def _slot(self, screen: Optional[str]) -> Optional[subprocess.Popen]:
+        """Engine process of a screen, or the shared engine for None"""
+        if screen is None:
+            return self.current_proc
+        return self._screen_procs.get(screen)
+
+    def _set_slot(self, screen: Optional[str], proc: Optional[subprocess.Popen]):
+        if screen is None:
+            self.current_proc = proc
+        elif proc:
+            self._screen_procs[screen] = proc
+        else:
+            self._screen_procs.pop(screen, None)
+
+    def _detach_for_switch(self, screen: Optional[str]) -> Optional[subprocess.Popen]:
+        """
+        Take the running engine of a slot out of the controller so it keeps
+        rendering while its replacement loads. Returns None when seamless
+        switching is off or nothing is running.
+        """
+        if not self.config.get("seamlessSwitch", False):
+            return None
+        proc = self._slot(screen)
+        if proc is None or not self.supervisor.is_alive(proc.pid):
+            return None
+        self._set_slot(screen, None)
+        self.perf_monitor.stop_monitoring(self._category(screen))
+        return proc
+
+    def _has_switch_headroom(self, wp_ids: List[str], old_proc: subprocess.Popen) -> bool:
+        """Whether a second engine fits in memory next to the running one"""
+        expected = self.perf_monitor.estimate_backend_mb([str(w) for w in wp_ids], old_proc.pid)
+        if expected is None:
+            expected = DEFAULT_ENGINE_MB
+        available = self.perf_monitor.available_memory_mb()
+        if available >= expected + SWITCH_HEADROOM_MB:
+            return True
+        self.log_manager.add_info(
+            f"Not enough memory for a seamless switch (need {expected + SWITCH_HEADROOM_MB:.0f} MB, "
+            f"{available:.0f} MB available), restarting instead", "Controller")
+        return False
+
+    def _switch(self, cmd: List[str], log_path: str, screen: Optional[str], wp_ids: List[str],
+                old_proc: subprocess.Popen) -> Optional[subprocess.Popen]:
+        """
+        Start cmd while old_proc keeps rendering, and retire old_proc once the
+        new engine is ready. Falls back to a plain restart when two engines
+        would not fit in memory.
+        """
+        if not self._has_switch_headroom(wp_ids, old_proc):
+            self._retire(old_proc)
+            return self._launch(cmd, log_path, screen)
+
+        try:
+            timeout = float(self.config.get("switchTimeout", SWITCH_TIMEOUT))
+        except (TypeError, ValueError):
+            timeout = SWITCH_TIMEOUT
+
+        # Starting rotates log_path to .1, where the old engine keeps writing
+        proc = self._launch(cmd, log_path, screen)
+        if not proc:
+            self._retire(old_proc)
+            return None
+        started = time.monotonic()
+        self.supervisor.wait_ready(
+            proc.pid, timeout,
+            lambda result: self._on_handover(result, screen, proc, old_proc, started),
+        )
+        return proc
+
+    def _ready_pattern(self) -> Optional["re.Pattern[str]"]:
+        """switchReadyPattern, a line the user's engine prints once it renders; None to use the GPU check"""
+        pattern = self.config.get("switchReadyPattern")
+        if not pattern:
+            return None
+        try:
+            return re.compile(pattern)
+        except re.error as e:
+            self.log_manager.add_warning(f"Ignoring invalid switchReadyPattern: {e}", "Controller")
+            return None
+
+    def _on_handover(self, result: str, screen: Optional[str], proc: subprocess.Popen,
+                     old_proc: subprocess.Popen, started: float):
+        category = self._category(screen)
+        if result == "exited":
+            if self._slot(screen) is proc and self.supervisor.is_alive(old_proc.pid):
+                # Put the old engine back instead of leaving the screen blank
+                self._set_slot(screen, old_proc)
+                self.supervisor.adopt(category, old_proc.pid)
+                self.perf_monitor.stop_monitoring(category)
+                self.perf_monitor.start_monitoring(category, old_proc.pid)
+                self.log_manager.add_warning("New engine exited during switch, keeping previous wallpaper", "Controller")
+            else:
+                # Superseded by a newer switch or stopped; nobody owns the old engine
+                self._retire(old_proc)
+            return
+
+        self._retire(old_proc)
+        elapsed = time.monotonic() - started
+        if result == "ready":
+            self.log_manager.add_info(f"Engine switched seamlessly in {elapsed:.2f}s", "Controller")
+        else:
+            self.log_manager.add_warning(
+                f"New engine was not ready within {elapsed:.1f}s, stopped the previous one anyway "
+                f"(raise switchTimeout, or set switchReadyPattern to a line the engine prints when it renders)",
+                "Controller")
+
+    def _on_engine_crashed(self, key: str, code: int, uptime: float, output: str,
+                           restart_in: Optional[float]):
+        screen = backend_screen(key)
+        proc = self._slot(screen)
+        if proc is not None and proc.returncode is not None:
+            self._set_slot(screen, None)
+            self.perf_monitor.stop_monitoring(key)
+
+        what = "failed to start" if uptime < STARTUP_WINDOW else f"crashed after {uptime:.0f}s"
+        self.log_manager.add_error(
+            f"Engine {key} {what} ({describe_exit(code)})\nOutput:\n{output}", "Engine")
+        if restart_in is not None:
+            self.show_toast(f"❌ Wallpaper engine {what.split(' after')[0]}, retrying in {restart_in:.0f}s")
+        else:
+            self.show_toast(f"❌ Wallpaper engine {what.split(' after')[0]} - check logs")
+
+    def _on_power_profile_changed(self, old: str, new: str):
+        self.log_manager.add_info(
+            f"Power profile {old} -> {new} ({self.power.describe()})", "Controller")
+        if self.power.enabled() and self.config.get("active_monitors"):
+            # Only engines whose command the new profile changes are restarted
+            self.schedule_restart()
+
+    def _on_snapshots_changed(self, active: bool):
+        if self.config.get("active_monitors"):
+            # Engines whose command is unchanged (e.g. a frame still missing) keep running
+            self.schedule_restart()
+
+    def _on_engine_restarted(self, key: str, proc: subprocess.Popen):
+        self._set_slot(backend_screen(key), proc)
+        self.perf_monitor.stop_monitoring(key)
+        self.perf_monitor.start_monitoring(key, proc.pid)
+
+    def build_command(self, monitors: Dict[str, str]) -> List[str]:
+        """Engine command line rendering monitors (screen -> wallpaper id)"""
         cmd = ["linux-wallpaperengine"]
         
         # Add screens
-        for scr, wid in active_monitors.items():
+        for scr, wid in monitors.items():
             cmd.extend(["--screen-root", scr, "--bg", str(wid)])
 
-        # Global args
-        cmd.extend(["-f", str(self.config.get("fps", 30))])
+        # Global args, merged with the launch profiles of the wallpapers shown
+        flags = self._launch_flags(monitors)
+        cmd.extend(["-f", str(flags["fps"])])
 
-        # Strict boolean check with default True for None
-        silence_cfg = self.config.get("silence")
-        is_silent_mode = True if silence_cfg is None else bool(silence_cfg)
-        
-        self.log_manager.add_debug(f"Building command. Silence mode: {is_silent_mode} (Raw: {silence_cfg})", "Controller")
+        is_silent_mode = flags["silent"]
+        self.log_manager.add_debug(f"Building command. Silence mode: {is_silent_mode} "
+                                   f"(Raw: {self.config.get('silence')})", "Controller")
 
         if is_silent_mode:
             cmd.append("--silent")
@@ -132,10 +583,10 @@ class WallpaperController:
         if scaling != "default":
             cmd.extend(["--scaling", scaling])
 
-        if self.config.get("noFullscreenPause", False):
+        if flags["noFullscreenPause"]:
             cmd.append("--no-fullscreen-pause")
 
-        if self.config.get("disableMouse", False):
+        if flags["disableMouse"]:
             cmd.append("--disable-mouse")
 
         if self.config.get("noautomute", False):
@@ -144,10 +595,10 @@ class WallpaperController:
         if self.config.get("noAudioProcessing", False):
             cmd.append("--no-audio-processing")
 
-        if self.config.get("disableParallax", False):
+        if flags["disableParallax"]:
             cmd.append("--disable-parallax")
 
-        if self.config.get("disableParticles", False):
+        if flags["disableParticles"]:
             cmd.append("--disable-particles")
 
         clamp = str(self.config.get("clamping", "clamp") or "clamp")
@@ -170,8 +621,8 @@ class WallpaperController:
         # Properties (Apply for all active wallpapers)
         audio_props = {'musicvolume', 'music', 'bellvolume', 'sound', 'soundsettings', 'volume'}
         
-        for wid in set(active_monitors.values()):
-            user_props = self.prop_manager._user_properties.get(wid, {})
+        for wid in set(monitors.values()):
+            user_props = self.prop_manager.get_user_properties(wid)
             for prop_name, prop_value in user_props.items():
                 if is_silent_mode and prop_name.lower() in audio_props:
                     continue
@@ -179,146 +630,237 @@ class WallpaperController:
                 formatted_value = self.prop_manager.format_property_value(prop_type, prop_value)
                 cmd.extend(["--set-property", f"{prop_name}={formatted_value}"])
 
-        self._last_command = cmd
-        self.log_manager.add_debug(f"Executing: {' '.join(cmd)}", "Controller")
-
-        try:
-            # Fix potential deadlock by redirecting stdout/stderr to a log file instead of PIPE
-            from py_GUI.const import CONFIG_DIR
-            log_path = os.path.join(CONFIG_DIR, "engine_last.log")
-            self.engine_log = open(log_path, "w")
-
-            self.current_proc = subprocess.Popen(
-                cmd,
-                stdout=self.engine_log,
-                stderr=self.engine_log
-            )
-
-            import time
-            time.sleep(0.5)
-            if self.current_proc.poll() is not None:
-                self.engine_log.close()
-                with open(log_path, "r") as f:
-                    output = f.read()
-                
-                error_msg = f"Process exited immediately!\nOutput:\n{output}"
-                self.log_manager.add_error(error_msg, "Engine")
-                self.show_toast("❌ Wallpaper engine failed to start - check logs")
-                return
-
-            self.log_manager.add_info("Engine started successfully", "Controller")
-
-            # Start Performance Monitoring
-            if self.current_proc and self.current_proc.pid:
-                self.perf_monitor.stop_all_backends()
-                self.perf_monitor.start_monitoring("backend", self.current_proc.pid)
+        return cmd
 
-            colors_script = os.path.expanduser("~/niri/scripts/sync_colors.sh")
-            if os.path.exists(colors_script):
-                try:
-                    subprocess.run(["bash", colors_script], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
-                except Exception:
-                    pass
+    def _launch_flags(self, monitors: Dict[str, str]) -> Dict[str, Any]:
+        """
+        fps, silence, fullscreen-pause and disable-* flags for one engine process.
 
+        A wallpaper's launch profile replaces the global setting for that
+        wallpaper. When one process shows several wallpapers the strictest
+        value wins: the lowest fps, any disabled feature, any muted
+        wallpaper. A power profile's fps cap and disable flags still apply
+        on top, since they only ever restrict.
+        """
+        # Settings a power profile can override are read through self.power
+        power = self.power.overrides()
+        try:
+            global_fps = int(self.power.get("fps", 30))
+        except (TypeError, ValueError):
+            global_fps = 30
+        # Strict boolean check with default True for None
+        silence_cfg = self.config.get("silence")
+        global_silent = True if silence_cfg is None else bool(silence_cfg)
+        defaults = {
+            "disableParticles": bool(self.power.get("disableParticles", False)),
+            "disableParallax": bool(self.power.get("disableParallax", False)),
+            "disableMouse": bool(self.config.get("disableMouse", False)),
+        }
+
+        profiles = [self.prop_manager.get_launch_profile(wid) for wid in set(monitors.values())] or [{}]
+        fps_values = []
+        for profile in profiles:
+            try:
+                fps_values.append(int(profile["fps"]) if profile.get("fps") else global_fps)
+            except (TypeError, ValueError):
+                fps_values.append(global_fps)
+        fps = min(fps_values)
+        if "fps" in power:
+            fps = min(fps, global_fps)
+
+        flags: Dict[str, Any] = {
+            "fps": max(1, fps),
+            "silent": any(not p["audio"] if "audio" in p else global_silent for p in profiles),
+            "noFullscreenPause": bool(self.power.get("noFullscreenPause", False)),
+        }
+        for key, default in defaults.items():
+            flags[key] = any(bool(p.get(key, default)) for p in profiles) or power.get(key) is True
+        return flags
+
+    def _launch(self, cmd: List[str], log_path: str, screen: Optional[str]) -> Optional[subprocess.Popen]:
+        """Start a supervised engine for a slot and monitor it; None if it could not be spawned"""
+        category = self._category(screen)
+        self.supervisor.ready_pattern = self._ready_pattern()
+        spawn_start = time.monotonic()
+        try:
+            # The supervisor streams the output into log_path and the Engine log
+            proc = self.supervisor.start(category, cmd, log_path)
         except Exception as e:
             self.log_manager.add_error(f"Failed to start engine: {e}", "Controller")
             self.show_toast(f"❌ Failed to start engine: {e}")
-
-    def take_screenshot(self, wp_id: str, output_path: str, delay: Optional[int] = None):
-        """Take a high-resolution screenshot of a specific wallpaper"""
+            return None
+        self._track_applies(proc.pid, screen, spawn_start, time.monotonic())
+
+        # Crashes are reported asynchronously by the supervisor
+        self.log_manager.add_info(f"Engine started (pid {proc.pid})", "Controller")
+        self.perf_monitor.stop_monitoring(category)
+        self.perf_monitor.start_monitoring(category, proc.pid)
+        return proc
+
+    def _track_applies(self, pid: int, screen: Optional[str], spawn_start: float, spawned: float):
+        """Hand the applies this engine renders over to wait for its first frame"""
+        if screen is None:
+            timings = list(self._launch_applies.values())
+            self._launch_applies = {}
+        else:
+            timing = self._launch_applies.pop(screen, None)
+            timings = [timing] if timing else []
+        # One apply to several screens of the shared engine is one sample
+        unique = {(t["wp_id"], t["started"]): t for t in timings}
+        for t in unique.values():
+            t["queued"] = spawn_start - t["scheduled"]
+            t["spawn"] = spawned - spawn_start
+            t["spawned"] = spawned
+        # Engines that exited before they were ready are not measured
+        for stale in [p for p in self._ready_waits if not self.supervisor.is_alive(p)]:
+            del self._ready_waits[stale]
+        if unique:
+            waits = self._ready_waits[pid] = list(unique.values())
+            GLib.timeout_add(int(APPLY_READY_TIMEOUT * 1000), self._on_ready_timeout, pid, waits)
+
+    def _on_first_frame(self, key: str, pid: int, seconds: float):
+        self._record_applies(self._ready_waits.pop(pid, None), timed_out=False)
+
+    def _on_ready_timeout(self, pid: int, waits: List[Dict]) -> bool:
+        if self._ready_waits.get(pid) is not waits:
+            # Ready, exited or replaced meanwhile
+            return False
+        del self._ready_waits[pid]
+        if self.supervisor.is_alive(pid):
+            self.log_manager.add_warning(
+                f"Engine (pid {pid}) was not ready within {APPLY_READY_TIMEOUT:.0f}s, "
+                "recording its apply latency as timed out", "Controller")
+            self._record_applies(waits, timed_out=True)
+        return False
+
+    def _record_applies(self, timings: Optional[List[Dict]], timed_out: bool):
+        latency = self.perf_monitor.latency
+        if not timings or not latency:
+            return
+        now = time.monotonic()
+        for t in timings:
+            phases = {phase: t[phase] for phase in ("config", "history", "queued", "spawn")}
+            phases["ready"] = now - t["spawned"]
+            total = now - t["started"]
+            latency.record(t["wp_id"], total, phases, timed_out)
+            self.log_manager.add_debug(
+                f"Applied {t['wp_id']} in {total:.2f}s{' (timed out)' if timed_out else ''} ("
+                + ", ".join(f"{name} {value * 1000:.0f} ms" for name, value in phases.items()) + ")",
+                "Controller")
+
+    def _sync_colors(self):
+        colors_script = os.path.expanduser("~/niri/scripts/sync_colors.sh")
+        if os.path.exists(colors_script):
+            try:
+                subprocess.run(["bash", colors_script], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+            except Exception:
+                pass
+
+    def take_screenshot(self, wp_id: str, output_path: str, delay: Optional[int] = None,
+                        task: str = "screenshot", display: Optional[str] = None):
+        """
+        Take a high-resolution screenshot of a specific wallpaper, tracked as task.
+
+        display runs the engine on that X display (an Xvfb server); without
+        one it is wrapped in xvfb-run when available, see start_screenshot().
+        """
         if delay is None:
             delay = self.config.get("screenshotDelay", 20)
 
-        default_res = "3840x2160"
-        res_raw = self.config.get("screenshotRes", default_res)
-        res = res_raw if isinstance(res_raw, str) else default_res
-        res = res.strip()
-        if not re.fullmatch(r"\d+[xX]\d+", res):
-            res = default_res
-        else:
-            res = res.lower()
-        
-        # Check for xvfb-run dynamically and preference
-        xvfb_path = shutil.which("xvfb-run")
-        prefer_xvfb = self.config.get("preferXvfb", True)
-        has_xvfb = (xvfb_path is not None) and prefer_xvfb
-        
-        # Base command for the engine
-        engine_cmd = [
-            "linux-wallpaperengine",
-            "--screenshot", output_path,
-            "--screenshot-delay", str(delay),
-            "--silent",
-            "-f", "60",
-            str(wp_id)
-        ]
-
-        assets_path = self.config.get("assetsPath")
-        if assets_path:
-            engine_cmd.extend(["--assets-dir", assets_path])
-
-        if has_xvfb:
-            assert xvfb_path is not None
-            # Wrap in xvfb-run
-            # Important: The server args must be a single string for -s
-            xvfb_args = ["-a", "-s", f"-screen 0 {res}x24 +extension GLX"]
-            
-            # Combine commands
-            # Even in Xvfb, we MUST force the engine to create a window of the target resolution
-            # Otherwise it might default to 640x480 or 800x600
-            cmd = [xvfb_path] + xvfb_args + engine_cmd + ["--window", f"0x0x{res}"]
-            mode_msg = f"Silent (Xvfb) at {res}"
-        else:
-            # Fallback: Force window size
-            cmd = engine_cmd + ["--window", f"0x0x{res}"]
-            mode_msg = f"Windowed at {res} (Xvfb not found)"
-        
-        self.log_manager.add_info(f"Starting screenshot: {mode_msg}", "Controller")
-        self.log_manager.add_info(f"Raw command: {cmd}", "Controller")
-        
-        # Prepare environment: Force X11/Xvfb usage by stripping Wayland vars
-        env = os.environ.copy()
-        if has_xvfb:
-            # Aggressively strip Wayland indicators
-            env.pop("WAYLAND_DISPLAY", None)
-            env["XDG_SESSION_TYPE"] = "x11"
-            env["SDL_VIDEODRIVER"] = "x11"
-            env["GDK_BACKEND"] = "x11"
-            # Ensure software rendering fallback if hardware GL fails in Xvfb
-            env["LIBGL_ALWAYS_SOFTWARE"] = "1" 
-        
         # Run asynchronously with a new session so we can kill the whole group
         # Redirect stderr to a temp file for debugging crashes
-        err_log = open("/tmp/wallpaper_screenshot_error.log", "w")
-        proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=err_log, start_new_session=True, env=env)
-        
-        tracker = self.perf_monitor.start_task("screenshot", proc.pid)
+        proc, cmd, mode_msg = start_screenshot(self.config, wp_id, output_path, int(delay),
+                                               f"/tmp/wallpaper_{task}_error.log", display)
+        self.log_manager.add_info(f"Starting screenshot: {mode_msg}", "Controller")
+        self.log_manager.add_info(f"Raw command: {cmd}", "Controller")
+
+        tracker = self.perf_monitor.start_task(task, proc.pid)
         return proc, tracker
 
-    def stop(self):
-        """Stop wallpaper"""
+    def uses_xvfb(self) -> bool:
+        """Whether screenshots render in Xvfb rather than in a window"""
+        return uses_xvfb(self.config)
+
+    def capture_timeout(self, delay: int) -> float:
+        """Seconds a capture of delay frames may take before the engine is interrupted"""
+        return capture_timeout(delay, self.uses_xvfb())
+
+    def capture(self, wp_id: str, output_path: str, on_done: Callable[[Dict[str, Any]], None],
+                delay: Optional[int] = None, task: str = "screenshot",
+                timeout: Optional[float] = None,
+                display: Optional[str] = None) -> Union[CaptureTracker, PendingCapture]:
+        """
+        Capture a frame of wp_id into output_path without blocking.
+
+        on_done(result) runs on the main loop once the frame is written or the
+        capture failed; see CaptureTracker for the result. display runs the
+        engine on that X display. Otherwise it runs on a shared Xvfb of the
+        screenshot resolution, started in the background (a PendingCapture is
+        returned meanwhile), falling back to xvfb-run if that server does not
+        come up. Raises if an engine started right away cannot be started; one
+        started later reports that to on_done.
+        """
+        if delay is None:
+            delay = int(self.config.get("screenshotDelay", 20))
+        if timeout is None:
+            timeout = capture_timeout(delay, display is not None or self.uses_xvfb())
+        error_log = f"/tmp/wallpaper_{task}_error.log"
+
+        def launch(display: Optional[str], shared: bool = False) -> CaptureTracker:
+            proc, tracker = self.take_screenshot(wp_id, output_path, delay, task=task, display=display)
+            if shared:
+                # The server is reused once this engine exits
+                self.xvfb.attach(display, proc)
+            return CaptureTracker(proc, output_path, timeout, self.perf_monitor, tracker,
+                                  error_log, on_done)
+
+        if display is not None or not (have_xvfb() and self.config.get("preferXvfb", True)):
+            return launch(display)
+
+        pending = PendingCapture(output_path, timeout, on_done)
+
+        def on_display(shared: Optional[str], error: Optional[str]):
+            if pending.done:
+                if shared:
+                    self.xvfb.release(shared)
+                return
+            if error:
+                self.log_manager.add_warning(f"Shared Xvfb unavailable, using xvfb-run: {error}", "Controller")
+            try:
+                pending.tracker = launch(shared, shared is not None)
+            except Exception as e:
+                if shared:
+                    self.xvfb.release(shared)
+                self.log_manager.add_error(f"Failed to start screenshot of {wp_id}: {e}", "Controller")
+                pending.fail(str(e))
+
+        self.xvfb.acquire(screenshot_resolution(self.config), on_display)
+        return pending
+
+    def stop(self, keep: Optional[subprocess.Popen] = None):
+        """Stop wallpaper (every engine this app started, except keep)"""
         self.log_manager.add_info("Stopping wallpaper", "Controller")
+        self._cancel_scheduled_restart()
         
         self.perf_monitor.stop_all_backends()
-        
-        if self.current_proc:
-            self.current_proc.terminate()
-            self.current_proc = None
-            
-            # Close log file handle if open
-            if hasattr(self, 'engine_log') and self.engine_log and not self.engine_log.closed:
-                try:
-                    self.engine_log.close()
-                except Exception:
-                    pass
-        subprocess.run(
-            ["pkill", "-f", "linux-wallpaperengine"],
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-            check=False
-        )
+
+        self.current_proc = None
+        self._screen_procs.clear()
+        self._screen_commands.clear()
+        self.supervisor.stop_all(keep=[keep.pid] if keep else [])
+
+    def shutdown(self):
+        """Stop every engine and wait for them to exit, for quitting the app"""
+        self.power.stop()
+        self.suspend_manager.stop()
+        self.snapshots.stop()
+        self.stop()
+        self.supervisor.shutdown()
+        self.xvfb.shutdown()
 
     def get_current_command(self) -> str:
+        if self._screen_commands:
+            return "\n".join(" ".join(cmd) for cmd in self._screen_commands.values())
         if not self._last_command:
             return ""
         return " ".join(self._last_command)
@@ -1,92 +1,318 @@
 import os
 import json
-from typing import List, Dict
+import time
+from collections import OrderedDict
+from typing import List, Dict, Iterable, Optional, Set
 from datetime import datetime
 from py_GUI.const import CONFIG_DIR
 
+# Rewrite the journal once it holds this many more lines than live entries
+COMPACT_MIN_LINES = 500
+COMPACT_RATIO = 4
+
 
 class HistoryManager:
     """
     Manages wallpaper playback history with persistence.
-    
-    - Stores up to 30 entries in history.json
-    - Deduplicates by wp_id (moves existing to top)
-    - Saves automatically on modifications
+
+    - Append-only journal in history.jsonl, one play start/end event per line
+    - In-memory index id -> latest entry, so dedupe and stats are O(1)
+    - Journal is compacted to one line per wallpaper when it grows too long
+    - Entries older than historyRetentionDays are dropped on compaction (0 keeps all)
     """
-    
-    MAX_ENTRIES = 30
-    
+
+    # Entries shown by the history dialog
+    DISPLAY_LIMIT = 30
+
     def __init__(self, config_manager):
         """
         Initialize HistoryManager.
-        
+
         Args:
-            config_manager: ConfigManager instance (for future extensibility)
+            config_manager: ConfigManager instance (reads historyRetentionDays)
         """
-        self.history_file = os.path.join(CONFIG_DIR, "history.json")
-        self.history: List[Dict] = self._load()
-    
+        self.config = config_manager
+        self.journal_file = os.path.join(CONFIG_DIR, "history.jsonl")
+        self.legacy_file = os.path.join(CONFIG_DIR, "history.json")
+        # id -> entry, least recently played first
+        self._index: "OrderedDict[str, Dict]" = OrderedDict()
+        # id -> start time of the play session still running
+        self._open: Dict[str, float] = {}
+        self._journal_lines = 0
+        # Bumped on every change so callers can cache derived orderings
+        self.revision = 0
+        self._load()
+
     def add(self, wp_id: str, title: str, preview: str) -> None:
-        self.history = [e for e in self.history if e.get("id") != wp_id]
-        
-        entry = {
+        """
+        Record the start of a play session.
+
+        A wallpaper that is already playing keeps its running session.
+        """
+        if wp_id in self._open:
+            return
+        self._append({
+            "ev": "start",
             "id": wp_id,
             "title": title,
             "preview": preview,
-            "timestamp": datetime.now().isoformat()
-        }
-        
-        self.history.insert(0, entry)
-        self.history = self.history[:self.MAX_ENTRIES]
-        self._save()
-    
+            "ts": time.time(),
+        })
+
+    def end(self, wp_id: str) -> None:
+        """Record the end of the running play session of wp_id, if any"""
+        if wp_id in self._open:
+            self._append({"ev": "end", "id": wp_id, "ts": time.time()})
+
+    def end_all(self) -> None:
+        """End every running session (engine stopped or app quitting)"""
+        for wp_id in list(self._open):
+            self.end(wp_id)
+
+    def sync_active(self, active_ids: Iterable[str]) -> None:
+        """End sessions of wallpapers that are no longer on any screen"""
+        active = set(active_ids)
+        for wp_id in list(self._open):
+            if wp_id not in active:
+                self.end(wp_id)
+
+    def playing(self) -> Set[str]:
+        return set(self._open)
+
     def get_all(self) -> List[Dict]:
         """
         Get all history entries in order.
-        
+
         Returns:
             List of history entries (most recent first)
         """
-        return self.history.copy()
-    
+        return [dict(e) for e in reversed(self._index.values())]
+
+    def get_recent(self, limit: int = DISPLAY_LIMIT) -> List[Dict]:
+        result = []
+        for entry in reversed(self._index.values()):
+            if len(result) >= limit:
+                break
+            result.append(dict(entry))
+        return result
+
+    def count(self) -> int:
+        return len(self._index)
+
+    def get_play_count(self, wp_id: str) -> int:
+        entry = self._index.get(wp_id)
+        return entry["play_count"] if entry else 0
+
+    def get_play_seconds(self, wp_id: str) -> float:
+        """Total play time, including the session still running"""
+        entry = self._index.get(wp_id)
+        if not entry:
+            return 0.0
+        seconds = entry["play_seconds"]
+        if wp_id in self._open:
+            seconds += max(0.0, time.time() - self._open[wp_id])
+        return seconds
+
+    def get_last_played(self, wp_id: str) -> Optional[float]:
+        entry = self._index.get(wp_id)
+        return entry["last_played"] if entry else None
+
     def has_history(self) -> bool:
         """
         Check if history has any entries.
-        
+
         Returns:
             True if history is not empty, False otherwise
         """
-        return len(self.history) > 0
-    
+        return len(self._index) > 0
+
     def clear(self) -> None:
         """
         Clear all history and save.
         """
-        self.history = []
-        self._save()
-    
-    def _load(self) -> List[Dict]:
+        self._index.clear()
+        self._open.clear()
+        self._rewrite()
+        self.revision += 1
+
+    def compact(self) -> None:
+        """Rewrite the journal as one line per wallpaper, applying retention"""
+        retention_days = self.config.get("historyRetentionDays", 0) if self.config else 0
+        try:
+            retention_days = float(retention_days)
+        except (TypeError, ValueError):
+            retention_days = 0
+        if retention_days > 0:
+            cutoff = time.time() - retention_days * 86400
+            for wp_id in [i for i, e in self._index.items() if e["last_played"] < cutoff]:
+                if wp_id not in self._open:
+                    del self._index[wp_id]
+        self._rewrite()
+
+    def _apply(self, event: Dict) -> None:
+        """Fold one journal event into the index"""
+        ev = event.get("ev")
+        wp_id = event.get("id")
+        if not wp_id:
+            return
+        ts = float(event.get("ts", 0))
+
+        if ev == "start":
+            if wp_id in self._open:
+                return
+            timestamp = datetime.fromtimestamp(ts).isoformat()
+            entry = self._index.pop(wp_id, None) or {
+                "id": wp_id, "play_count": 0, "play_seconds": 0.0,
+            }
+            entry["title"] = event.get("title", entry.get("title", ""))
+            entry["preview"] = event.get("preview", entry.get("preview", ""))
+            entry["play_count"] += 1
+            entry["last_played"] = ts
+            entry["timestamp"] = timestamp
+            self._index[wp_id] = entry
+            self._open[wp_id] = ts
+        elif ev == "end":
+            start = self._open.pop(wp_id, None)
+            entry = self._index.get(wp_id)
+            if start is not None and entry:
+                entry["play_seconds"] += max(0.0, ts - start)
+        elif ev == "entry":
+            # Compacted snapshot of one wallpaper; built first so a bad field changes nothing
+            entry = {
+                "id": wp_id,
+                "title": event.get("title", ""),
+                "preview": event.get("preview", ""),
+                "play_count": int(event.get("count", 1)),
+                "play_seconds": float(event.get("seconds", 0)),
+                "last_played": ts,
+                "timestamp": datetime.fromtimestamp(ts).isoformat(),
+            }
+            self._index.pop(wp_id, None)
+            self._index[wp_id] = entry
+
+    def _append(self, event: Dict) -> None:
+        self._apply(event)
+        self.revision += 1
+        try:
+            os.makedirs(CONFIG_DIR, exist_ok=True)
+            with open(self.journal_file, 'a') as f:
+                f.write(json.dumps(event) + "\n")
+            self._journal_lines += 1
+        except IOError as e:
+            print(f"[HISTORY] Failed to write journal: {e}")
+            return
+        if self._needs_compaction():
+            self.compact()
+
+    def _needs_compaction(self) -> bool:
+        return self._journal_lines > max(COMPACT_MIN_LINES, COMPACT_RATIO * len(self._index))
+
+    def _snapshot_events(self) -> List[Dict]:
+        events = []
+        for wp_id, entry in self._index.items():
+            events.append({
+                "ev": "entry",
+                "id": wp_id,
+                "title": entry.get("title", ""),
+                "preview": entry.get("preview", ""),
+                "count": entry["play_count"],
+                "seconds": round(entry["play_seconds"], 1),
+                "ts": entry["last_played"],
+            })
+        # Sessions still running are re-opened after the snapshot
+        for wp_id, start in self._open.items():
+            events.append({"ev": "open", "id": wp_id, "ts": start})
+        return events
+
+    def _rewrite(self) -> None:
+        """Atomically replace the journal with a snapshot of the index"""
+        events = self._snapshot_events()
+        try:
+            os.makedirs(CONFIG_DIR, exist_ok=True)
+            tmp_path = f"{self.journal_file}.tmp"
+            with open(tmp_path, 'w') as f:
+                for event in events:
+                    f.write(json.dumps(event) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.journal_file)
+            self._journal_lines = len(events)
+        except IOError as e:
+            print(f"[HISTORY] Failed to compact journal: {e}")
+
+    def _load(self) -> None:
         """
-        Load history from JSON file.
-        
-        Returns:
-            List of history entries, or empty list if file doesn't exist
+        Replay the journal into the index.
+
+        Sessions left open by a previous run (crash, killed GUI) are closed at
+        their start time, so they count as a play without adding play time.
         """
-        if not os.path.exists(self.history_file):
-            return []
-        
+        if not os.path.exists(self.journal_file):
+            self._migrate_legacy()
+            return
+
+        try:
+            with open(self.journal_file, 'r') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    self._journal_lines += 1
+                    try:
+                        event = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Torn last line after a crash
+                        continue
+                    if not isinstance(event, dict):
+                        # A torn line can still parse, e.g. as a bare number
+                        continue
+                    try:
+                        if event.get("ev") == "open":
+                            if event.get("id") in self._index:
+                                self._open[event["id"]] = float(event.get("ts", 0))
+                        else:
+                            self._apply(event)
+                    except (TypeError, ValueError, OverflowError):
+                        # Valid JSON with fields of the wrong type or range
+                        continue
+        except IOError:
+            return
+
+        stale = bool(self._open)
+        self._open.clear()
+        if stale or self._needs_compaction():
+            self.compact()
+
+    def _migrate_legacy(self) -> None:
+        """Import the old capped history.json (most recent first) once"""
+        if not os.path.exists(self.legacy_file):
+            return
         try:
-            with open(self.history_file, 'r') as f:
+            with open(self.legacy_file, 'r') as f:
                 data = json.load(f)
-                return data if isinstance(data, list) else []
         except (json.JSONDecodeError, IOError):
-            return []
-    
-    def _save(self) -> None:
-        """
-        Save history to JSON file.
-        """
-        os.makedirs(CONFIG_DIR, exist_ok=True)
-        
-        with open(self.history_file, 'w') as f:
-            json.dump(self.history, f, indent=2)
+            return
+        if not isinstance(data, list):
+            return
+
+        for item in reversed(data):
+            if not isinstance(item, dict) or not item.get("id"):
+                continue
+            try:
+                ts = datetime.fromisoformat(item.get("timestamp", "")).timestamp()
+            except (TypeError, ValueError):
+                ts = 0.0
+            self._apply({
+                "ev": "entry",
+                "id": item["id"],
+                "title": item.get("title", ""),
+                "preview": item.get("preview", ""),
+                "count": 1,
+                "ts": ts,
+            })
+        self._rewrite()
+        if os.path.exists(self.journal_file):
+            try:
+                os.remove(self.legacy_file)
+            except OSError:
+                pass
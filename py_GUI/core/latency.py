@@ -0,0 +1,76 @@
+import time
+from typing import Dict, List, Optional
+from py_GUI.core.storage import WallpaperStore
+
+# Samples kept per wallpaper; percentiles are taken over these
+SAMPLES_PER_WALLPAPER = 50
+
+# Phases of an apply, in order; "total" runs from the click to the first frame
+PHASES = ("config", "history", "queued", "spawn", "ready")
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+class ApplyLatency:
+    """
+    How long applying a wallpaper takes, per wallpaper.
+
+    The controller times each phase of an apply (config writes, history
+    insert, waiting for the coalesced restart, spawning the engine and the
+    engine becoming ready) and records one sample once the engine is ready.
+    An engine that is not ready in time gets a sample marked timed_out, whose
+    total is a lower bound. Samples are written straight to the store;
+    summaries are cached until the next sample.
+    """
+
+    def __init__(self, store: WallpaperStore, samples: int = SAMPLES_PER_WALLPAPER):
+        self._store = store
+        self._samples = samples
+        self._stats: Optional[Dict[str, Dict[str, float]]] = None
+        # Bumped on each new sample so views can tell when to refresh
+        self.revision = 0
+
+    def record(self, wp_id: str, total: float, phases: Dict[str, float], timed_out: bool = False):
+        try:
+            self._store.add_apply_latency(str(wp_id), time.time(), total, phases, self._samples,
+                                          timed_out)
+        except Exception as e:
+            print(f"[LATENCY] Failed to save apply latency: {e}")
+            return
+        self._stats = None
+        self.revision += 1
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        """p50/p95/max of the total latency, timed-out samples and the latest phase breakdown per wallpaper id"""
+        if self._stats is None:
+            stats = {}
+            for wp_id, rows in self._store.get_apply_latency().items():
+                totals = [row["total"] for row in rows]
+                summary = {
+                    "count": len(totals),
+                    "p50": percentile(totals, 50),
+                    "p95": percentile(totals, 95),
+                    "max": max(totals),
+                    "last": totals[-1],
+                    "timed_out": sum(1 for row in rows if row["timed_out"]),
+                    "last_timed_out": bool(rows[-1]["timed_out"]),
+                }
+                # Latest sample's breakdown, to tell a slow spawn from a slow scene
+                summary.update({phase: rows[-1][phase] for phase in PHASES})
+                stats[wp_id] = summary
+            self._stats = stats
+        return self._stats
+
+    def get_stat(self, wp_id: str) -> Optional[Dict[str, float]]:
+        return self.get_stats().get(str(wp_id))
+
+    def clear(self):
+        self._store.clear_apply_latency()
+        self._stats = None
+        self.revision += 1
@@ -0,0 +1,103 @@
+import os
+import time
+import threading
+from typing import Dict, Iterable, Optional
+from py_GUI.core.storage import WallpaperStore
+
+# Seconds between writes of accumulated samples to the store
+FLUSH_INTERVAL = 60.0
+
+_EMPTY = {"runtime": 0.0, "cpu_seconds": 0.0, "rss_mb_seconds": 0.0, "peak_rss_mb": 0.0}
+
+
+class CostLedger:
+    """
+    Per-wallpaper runtime cost, accumulated across sessions.
+
+    PerformanceMonitor feeds backend samples in; the cost of a sample is split
+    evenly between the wallpapers rendered by that process. Totals are kept in
+    memory and written to the store every FLUSH_INTERVAL seconds.
+    """
+
+    def __init__(self, store: WallpaperStore, flush_interval: float = FLUSH_INTERVAL):
+        self._store = store
+        self._flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._pending: Dict[str, Dict[str, float]] = {}
+        self._totals: Optional[Dict[str, Dict[str, float]]] = None
+        self._last_flush = time.monotonic()
+        self._cpu_count = os.cpu_count() or 1
+        # Bumped on each flush so sorted views can be cached between flushes
+        self.revision = 0
+
+    def add_sample(self, wp_ids: Iterable[str], cpu_seconds: float, rss_mb: float, elapsed: float):
+        ids = [str(i) for i in wp_ids if i]
+        if not ids or elapsed <= 0:
+            return
+        share = 1.0 / len(ids)
+        with self._lock:
+            for wp_id in ids:
+                d = self._pending.setdefault(wp_id, dict(_EMPTY))
+                d["runtime"] += elapsed
+                d["cpu_seconds"] += max(cpu_seconds, 0.0) * share
+                d["rss_mb_seconds"] += rss_mb * share * elapsed
+                d["peak_rss_mb"] = max(d["peak_rss_mb"], rss_mb * share)
+            due = time.monotonic() - self._last_flush >= self._flush_interval
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            self._last_flush = time.monotonic()
+            if not self._pending:
+                return
+            try:
+                self._store.add_costs(self._pending, time.time())
+            except Exception as e:
+                print(f"[LEDGER] Failed to save costs: {e}")
+                return
+            if self._totals is not None:
+                for wp_id, d in self._pending.items():
+                    self._merge(self._totals.setdefault(wp_id, dict(_EMPTY)), d)
+            self._pending = {}
+            self.revision += 1
+
+    def _merge(self, into: Dict[str, float], d: Dict[str, float]):
+        into["runtime"] += d["runtime"]
+        into["cpu_seconds"] += d["cpu_seconds"]
+        into["rss_mb_seconds"] += d["rss_mb_seconds"]
+        into["peak_rss_mb"] = max(into["peak_rss_mb"], d["peak_rss_mb"])
+
+    def _summarize(self, d: Dict[str, float]) -> Dict[str, float]:
+        runtime = d["runtime"]
+        return {
+            "runtime": runtime,
+            "cpu_seconds": d["cpu_seconds"],
+            # Same scale as the Performance page: share of all cores
+            "avg_cpu": (d["cpu_seconds"] / runtime * 100 / self._cpu_count) if runtime else 0.0,
+            "avg_rss_mb": (d["rss_mb_seconds"] / runtime) if runtime else 0.0,
+            "peak_rss_mb": d["peak_rss_mb"],
+        }
+
+    def get_costs(self) -> Dict[str, Dict[str, float]]:
+        """Cost summary per wallpaper id, including samples not yet flushed"""
+        with self._lock:
+            if self._totals is None:
+                self._totals = {
+                    wp_id: {k: float(row.get(k) or 0) for k in _EMPTY}
+                    for wp_id, row in self._store.get_costs().items()
+                }
+            merged = {wp_id: dict(d) for wp_id, d in self._totals.items()}
+            for wp_id, d in self._pending.items():
+                self._merge(merged.setdefault(wp_id, dict(_EMPTY)), d)
+        return {wp_id: self._summarize(d) for wp_id, d in merged.items()}
+
+    def get_cost(self, wp_id: str) -> Optional[Dict[str, float]]:
+        return self.get_costs().get(str(wp_id))
+
+    def clear(self):
+        with self._lock:
+            self._pending.clear()
+            self._totals = {}
+            self.revision += 1
+        self._store.clear_costs()
@@ -0,0 +1,91 @@
+import shutil
+from typing import List, Optional
+
+# ionice scheduling classes offered in Settings; "none" leaves the default
+IONICE_CLASSES = {"none": None, "best-effort": "2", "idle": "3"}
+
+
+def parse_cpu_list(text: str) -> List[int]:
+    """CPU numbers of a taskset-style list such as "0-3,6"; ValueError if malformed"""
+    cpus = set()
+    for part in (p.strip() for p in text.split(",")):
+        if not part:
+            continue
+        first, _, last = part.partition("-")
+        lo, hi = int(first), int(last or first)
+        if lo < 0 or hi < lo:
+            raise ValueError(f"invalid CPU range {part!r}")
+        cpus.update(range(lo, hi + 1))
+    return sorted(cpus)
+
+
+class LaunchPolicy:
+    """
+    Scheduling and resource limits for engine processes.
+
+    wrap() prefixes the engine command with the standard tools that apply
+    them (systemd-run, nice, ionice, taskset). Each of these execs the next
+    one, so the engine keeps the pid the supervisor started and the policy
+    shows up in the copyable command line. A tool that is not installed is
+    skipped with a warning.
+    """
+
+    def __init__(self, config, log_manager):
+        self.config = config
+        self.log_manager = log_manager
+        self._warned = set()
+
+    def wrap(self, cmd: List[str]) -> List[str]:
+        prefix: List[str] = []
+
+        if self.config.get("engineScope", False) and self._have("systemd-run"):
+            # A transient scope gets its own cgroup, which PerformanceMonitor reads
+            prefix += ["systemd-run", "--user", "--scope", "--quiet", "--collect"]
+            quota = self._int("engineCpuQuota")
+            if quota > 0:
+                prefix += ["-p", f"CPUQuota={quota}%"]
+            memory_max = self._int("engineMemoryMax")
+            if memory_max > 0:
+                prefix += ["-p", f"MemoryMax={memory_max}M"]
+
+        nice = max(-20, min(19, self._int("engineNice")))
+        if nice and self._have("nice"):
+            prefix += ["nice", "-n", str(nice)]
+
+        io_class = IONICE_CLASSES.get(str(self.config.get("engineIoniceClass") or "none"))
+        if io_class and self._have("ionice"):
+            prefix += ["ionice", "-c", io_class]
+
+        affinity = self._affinity()
+        if affinity and self._have("taskset"):
+            prefix += ["taskset", "-c", affinity]
+
+        return prefix + cmd
+
+    def _affinity(self) -> Optional[str]:
+        text = str(self.config.get("engineCpuAffinity") or "").strip()
+        if not text:
+            return None
+        try:
+            cpus = parse_cpu_list(text)
+        except ValueError:
+            self._warn_once(f"affinity:{text}", f"Ignoring invalid CPU affinity {text!r}")
+            return None
+        return ",".join(str(c) for c in cpus) if cpus else None
+
+    def _int(self, key: str) -> int:
+        try:
+            return int(self.config.get(key, 0) or 0)
+        except (TypeError, ValueError):
+            return 0
+
+    def _have(self, tool: str) -> bool:
+        if shutil.which(tool):
+            return True
+        self._warn_once(tool, f"{tool} not found, launching the engine without it")
+        return False
+
+    def _warn_once(self, key: str, message: str):
+        if key not in self._warned:
+            self._warned.add(key)
+            self.log_manager.add_warning(message, "Controller")
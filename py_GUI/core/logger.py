@@ -1,10 +1,12 @@
+from collections import deque
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Deque
 
 class LogManager:
     def __init__(self, max_entries: int = 500):
-        self._logs: List[Dict] = []
-        self._max_entries = max_entries
+        # Ring buffer: the oldest entries fall off once max_entries is reached
+        self._logs: Deque[Dict] = deque(maxlen=max_entries)
+        self.max_entries = max_entries
         self._callbacks: List[callable] = []
 
     def add(self, level: str, message: str, source: str = "GUI"):
@@ -18,10 +20,6 @@ class LogManager:
         }
         self._logs.append(log_entry)
 
-        # Limit log size
-        if len(self._logs) > self._max_entries:
-            self._logs = self._logs[-self._max_entries:]
-
         # Notify listeners
         for callback in self._callbacks:
             try:
@@ -43,7 +41,7 @@ class LogManager:
 
     def get_logs(self) -> List[Dict]:
         """Get all logs"""
-        return self._logs.copy()
+        return list(self._logs)
 
     def clear(self):
         """Clear logs"""
@@ -1,23 +1,18 @@
 from typing import Dict, Optional, List, Tuple
-from py_GUI.core.config import ConfigManager
+from py_GUI.core.storage import WallpaperStore
 
 
 class NicknameManager:
-    """Manage wallpaper nicknames stored in config.json"""
+    """Manage wallpaper nicknames stored in the wallpaper store"""
     
-    def __init__(self, config: ConfigManager):
-        self._config = config
+    def __init__(self, store: WallpaperStore):
+        self._store = store
         self._nicknames: Dict[str, str] = {}
-        self.load_from_config()
+        self.load()
     
-    def load_from_config(self):
-        """Load nicknames from config"""
-        nicknames_data = self._config.get("wallpaperNicknames", {})
-        self._nicknames = nicknames_data.copy()
-    
-    def save_to_config(self):
-        """Save nicknames to config"""
-        self._config.set("wallpaperNicknames", self._nicknames)
+    def load(self):
+        """Load all nicknames (needed in memory for search)"""
+        self._nicknames = self._store.get_nicknames()
     
     def get(self, wp_id: str) -> Optional[str]:
         """Get nickname for wallpaper, return None if not set"""
@@ -29,26 +24,24 @@ class NicknameManager:
         - Trim whitespace
         - If empty after trim -> delete
         - Max length 100 chars (truncate if longer)
-        - Save to config
+        - Save to store (single row)
         """
         trimmed = nickname.strip()
         
         if not trimmed:
             # Empty after trim, delete if exists
-            if wp_id in self._nicknames:
-                del self._nicknames[wp_id]
+            self.delete(wp_id)
         else:
             # Truncate to 100 chars
             trimmed = trimmed[:100]
             self._nicknames[wp_id] = trimmed
-        
-        self.save_to_config()
+            self._store.set_nickname(wp_id, trimmed)
     
     def delete(self, wp_id: str):
         """Remove nickname for wallpaper"""
         if wp_id in self._nicknames:
             del self._nicknames[wp_id]
-            self.save_to_config()
+            self._store.delete_nicknames([wp_id])
     
     def get_all(self) -> Dict[str, str]:
         """Return all nicknames as a copy"""
@@ -67,7 +60,7 @@ class NicknameManager:
             del self._nicknames[wp_id]
         
         if to_delete:
-            self.save_to_config()
+            self._store.delete_nicknames(to_delete)
     
     def get_display_name(self, wp: Dict) -> Tuple[str, Optional[str]]:
         """
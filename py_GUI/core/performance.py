@@ -4,8 +4,18 @@ import threading
 import os
 from collections import deque
 from typing import Callable, Protocol, TypedDict, cast
+from py_GUI.core.storage import WallpaperStore, SCREENSHOT_HISTORY_LIMIT
+from py_GUI.core.ledger import CostLedger
+from py_GUI.core.latency import ApplyLatency
+from py_GUI.core.renderers import RENDERER_PROCESSES
 
 HISTORY_SIZE = 60
+# Backend CPU samples averaged to estimate what a suspension saves
+SUSPEND_RATE_SAMPLES = 10
+CGROUP_ROOT = "/sys/fs/cgroup"
+# Tasks that run the engine once to capture a frame: the user's screenshots
+# and the frames cached for static snapshot mode; batch workers add ":<n>"
+CAPTURE_TASKS = ("screenshot", "snapshot")
 
 def _format_cpu(val: float) -> str:
     return f"{int(val)}%" if val == int(val) else f"{val:.1f}%"
@@ -13,6 +23,18 @@ def _format_cpu(val: float) -> str:
 def _format_mem(val: float) -> str:
     return f"{int(val)} MB" if val == int(val) else f"{val:.1f} MB"
 
+def is_capture(category: str) -> bool:
+    """True for capture tasks, including batch workers like "screenshot:0" """
+    return category.split(":", 1)[0] in CAPTURE_TASKS
+
+def is_backend(category: str) -> bool:
+    """True for the shared "backend" engine and per-screen "backend:<screen>" engines"""
+    return category == "backend" or category.startswith("backend:")
+
+def backend_screen(category: str) -> str | None:
+    """Screen of a per-screen engine category, None for the shared engine"""
+    return category.split(":", 1)[1] if category.startswith("backend:") else None
+
 def _get_thread_names(pid: int) -> list[str]:
     names: list[str] = []
     task_dir = f"/proc/{pid}/task"
@@ -27,7 +49,27 @@ def _get_thread_names(pid: int) -> list[str]:
         pass
     return names
 
-SCREENSHOT_HISTORY_LIMIT = 10
+def _cgroup_of(pid: int) -> str | None:
+    """cgroup v2 path of a process relative to CGROUP_ROOT, None on cgroup v1"""
+    try:
+        with open(f"/proc/{pid}/cgroup") as f:
+            for line in f:
+                if line.startswith("0::"):
+                    return line[3:].strip()
+    except (IOError, OSError):
+        pass
+    return None
+
+def _read_cgroup_usage(path: str) -> tuple[float, float] | None:
+    """(CPU seconds, memory MB) of every process in a cgroup v2 directory"""
+    try:
+        with open(os.path.join(path, "cpu.stat")) as f:
+            usec = next(int(line.split()[1]) for line in f if line.startswith("usage_usec "))
+        with open(os.path.join(path, "memory.current")) as f:
+            mem = int(f.read())
+    except (IOError, OSError, ValueError, StopIteration):
+        return None
+    return usec / 1_000_000, mem / (1024 * 1024)
 
 
 class _Config(Protocol):
@@ -68,6 +110,8 @@ class _TotalPayload(TypedDict):
     memory_mb: float
     memory_fmt: str
     threads: int
+    suspended_seconds: float
+    saved_cpu_seconds: float
     history: _HistoryPayload
     thread_names: dict[str, list[str]]
 
@@ -78,7 +122,7 @@ class _StatsPayload(TypedDict):
 
 
 class PerformanceMonitor:
-    def __init__(self, config: _Config | None = None):
+    def __init__(self, config: _Config | None = None, store: WallpaperStore | None = None):
         self._stop_event: threading.Event = threading.Event()
         self._thread: threading.Thread | None = None
         self._callbacks: list[Callable[[_StatsPayload], None]] = []
@@ -88,6 +132,23 @@ class PerformanceMonitor:
         self._history: dict[str, dict[str, deque[float]]] = {}
         self._cpu_count: int = psutil.cpu_count() or 1
         self._config: _Config | None = config
+        self._store: WallpaperStore | None = store
+        self.ledger: CostLedger | None = CostLedger(store) if store else None
+        self.latency: ApplyLatency | None = ApplyLatency(store) if store else None
+        # category -> (pid, cpu seconds, monotonic time, seconds suspended so far) at the previous sample
+        self._cpu_marks: dict[str, tuple[int, float, float, float]] = {}
+        # Backends in their own systemd scope (engineScope) are accounted from
+        # the scope's cgroup: category -> cgroup directory, and the previous
+        # (CPU seconds, monotonic time) reading for the CPU percentage
+        self._own_cgroup: str | None = _cgroup_of(os.getpid())
+        self._cgroups: dict[str, str] = {}
+        self._cgroup_marks: dict[str, tuple[float, float]] = {}
+        # Engine suspension (SuspendManager): start time and the backends' CPU
+        # seconds per second just before, to estimate what the pause saved
+        self._suspended_since: float | None = None
+        self._suspended_rate: float = 0.0
+        self._suspended_total: float = 0.0
+        self._saved_cpu_total: float = 0.0
         _ = self._add_process("frontend", psutil.Process().pid)
 
     def _init_history(self, category: str) -> None:
@@ -154,9 +215,10 @@ class PerformanceMonitor:
         return proc
 
     def _add_process(self, category: str, pid: int) -> bool:
-        # For backend and screenshot, find the real linux-wallpaperengine process
+        # For captures, find the real linux-wallpaperengine process under xvfb-run.
+        # Backends are started directly (launch wrappers exec), so their pid is the renderer.
         proc = None
-        if category in ("backend", "screenshot"):
+        if is_capture(category):
             poll_timeout = 0.2 if threading.current_thread() is threading.main_thread() else 1.0
             proc = self._find_real_process(pid, timeout=poll_timeout)
         if proc is None:
@@ -172,6 +234,8 @@ class PerformanceMonitor:
             
         self._processes[category] = proc
         self._init_history(category)
+        _ = self._cgroups.pop(category, None)
+        _ = self._cgroup_marks.pop(category, None)
         return True
 
     def start_monitoring(self, category: str, pid: int):
@@ -181,12 +245,131 @@ class PerformanceMonitor:
     def stop_monitoring(self, category: str):
         _ = self._processes.pop(category, None)
         _ = self._history.pop(category, None)
+        _ = self._cpu_marks.pop(category, None)
+        _ = self._cgroups.pop(category, None)
+        _ = self._cgroup_marks.pop(category, None)
 
     def stop_all_backends(self):
         keys = [k for k in self._processes.keys() if k not in ("frontend", "tray")]
         for k in keys:
             del self._processes[k]
             _ = self._history.pop(k, None)
+            _ = self._cpu_marks.pop(k, None)
+            _ = self._cgroups.pop(k, None)
+            _ = self._cgroup_marks.pop(k, None)
+        if self.ledger:
+            self.ledger.flush()
+
+    def _ledger_wp_ids(self, category: str) -> list[str]:
+        """Wallpaper ids rendered by the process of a monitored category"""
+        if not is_backend(category) or not self._config:
+            return []
+        active = cast(dict[str, str], self._config.get("active_monitors", {}) or {})
+        screen = backend_screen(category)
+        if screen is not None:
+            wid = active.get(screen)
+            return [str(wid)] if wid else []
+        return list(dict.fromkeys(str(wid) for wid in active.values() if wid))
+
+    def available_memory_mb(self) -> float:
+        return cast(int, psutil.virtual_memory().available) / (1024 * 1024)
+
+    def estimate_backend_mb(self, wp_ids: list[str], running_pid: int | None = None) -> float | None:
+        """Expected RSS of an engine rendering wp_ids: ledger peaks, else the engine running now"""
+        if self.ledger and wp_ids:
+            costs = self.ledger.get_costs()
+            peaks = [costs[w]["peak_rss_mb"] for w in wp_ids if w in costs]
+            if len(peaks) == len(wp_ids):
+                return sum(peaks)
+        if running_pid:
+            try:
+                return cast(int, psutil.Process(running_pid).memory_info().rss) / (1024 * 1024)
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                pass
+        return None
+
+    def _record_cost(self, category: str, pid: int, cpu_total: float, mem_mb: float) -> None:
+        """
+        Charge the CPU time used since the previous sample to the ledger.
+
+        Time the backends spent frozen by set_suspended() is left out of the
+        runtime, so a suspended engine does not lower its wallpaper's averages.
+        """
+        now = time.monotonic()
+        suspended, _ = self.get_suspension()
+        mark = self._cpu_marks.get(category)
+        self._cpu_marks[category] = (pid, cpu_total, now, suspended)
+        if not self.ledger or mark is None or mark[0] != pid:
+            return
+        wp_ids = self._ledger_wp_ids(category)
+        if wp_ids:
+            elapsed = (now - mark[2]) - (suspended - mark[3])
+            self.ledger.add_sample(wp_ids, cpu_total - mark[1], mem_mb, elapsed)
+
+    def _cgroup_usage(self, category: str, pid: int) -> tuple[float | None, float, float] | None:
+        """
+        (CPU percent or None on the first reading, CPU seconds, memory MB) of
+        the backend's own cgroup, or None if it does not run in one.
+        """
+        path = self._cgroups.get(category)
+        if path is None:
+            if not self._config or not self._config.get("engineScope", False):
+                return None
+            rel = _cgroup_of(pid)
+            # systemd-run moves the engine into its scope just before exec
+            if not rel or rel == self._own_cgroup or not rel.endswith(".scope"):
+                return None
+            path = os.path.join(CGROUP_ROOT, rel.lstrip("/"))
+            self._cgroups[category] = path
+            # CPU totals switch source; do not charge the difference to the ledger
+            _ = self._cpu_marks.pop(category, None)
+        usage = _read_cgroup_usage(path)
+        if usage is None:
+            _ = self._cgroups.pop(category, None)
+            _ = self._cgroup_marks.pop(category, None)
+            return None
+        cpu_seconds, mem_mb = usage
+        now = time.monotonic()
+        prev = self._cgroup_marks.get(category)
+        self._cgroup_marks[category] = (cpu_seconds, now)
+        cpu = None
+        if prev and now > prev[1]:
+            cpu = (cpu_seconds - prev[0]) / (now - prev[1]) * 100 / self._cpu_count
+        return cpu, cpu_seconds, mem_mb
+
+    def set_suspended(self, suspended: bool) -> None:
+        """Mark the backends as frozen or running again"""
+        now = time.monotonic()
+        if suspended and self._suspended_since is None:
+            self._suspended_rate = self._backend_cpu_rate()
+            self._suspended_since = now
+        elif not suspended and self._suspended_since is not None:
+            elapsed = now - self._suspended_since
+            self._suspended_total += elapsed
+            self._saved_cpu_total += elapsed * self._suspended_rate
+            self._suspended_since = None
+
+    def _backend_cpu_rate(self) -> float:
+        """CPU seconds per second used by the backends over the recent samples"""
+        rate = 0.0
+        for category, hist in list(self._history.items()):
+            if not is_backend(category) or category not in self._processes:
+                continue
+            recent = list(hist["cpu"])[-SUSPEND_RATE_SAMPLES:]
+            if recent:
+                # History is a share of all cores; convert back to core-seconds
+                rate += sum(recent) / len(recent) * self._cpu_count / 100
+        return rate
+
+    def get_suspension(self) -> tuple[float, float]:
+        """(seconds suspended, CPU seconds saved) this session, including a pause in progress"""
+        suspended, saved = self._suspended_total, self._saved_cpu_total
+        since = self._suspended_since
+        if since is not None:
+            elapsed = time.monotonic() - since
+            suspended += elapsed
+            saved += elapsed * self._suspended_rate
+        return suspended, saved
 
     def start_task(self, category: str, pid: int) -> TaskTracker:
         """Start tracking a specific task. Returns a tracker object (dict)."""
@@ -266,16 +449,8 @@ class PerformanceMonitor:
 
 
     def add_screenshot_history(self, wp_id: str, output_path: str, stats: dict[str, float]) -> None:
-        if not self._config:
+        if not self._store:
             return
-        raw_existing = self._config.get("screenshot_history", [])
-        if isinstance(raw_existing, list):
-            history: list[dict[str, object]] = []
-            for item in cast(list[object], raw_existing):
-                if isinstance(item, dict):
-                    history.append(cast(dict[str, object], item))
-        else:
-            history = []
         record: dict[str, object] = {
             "timestamp": time.time(),
             "wp_id": str(wp_id),
@@ -286,27 +461,16 @@ class PerformanceMonitor:
             "avg_cpu": stats.get("avg_cpu", 0),
             "avg_mem": stats.get("avg_mem", 0),
         }
-        history.append(record)
-        if len(history) > SCREENSHOT_HISTORY_LIMIT:
-            history = history[-SCREENSHOT_HISTORY_LIMIT:]
-        self._config.set("screenshot_history", history)
+        self._store.add_screenshot_record(record, SCREENSHOT_HISTORY_LIMIT)
 
     def get_screenshot_history(self) -> list[dict[str, object]]:
-        if not self._config:
-            return []
-        # Return a copy to prevent modification during iteration
-        raw_history = self._config.get("screenshot_history", [])
-        if not isinstance(raw_history, list):
+        if not self._store:
             return []
-        out: list[dict[str, object]] = []
-        for item in cast(list[object], raw_history):
-            if isinstance(item, dict):
-                out.append(dict(cast(dict[str, object], item)))
-        return out
+        return cast(list[dict[str, object]], self._store.get_screenshot_history())
 
     def clear_screenshot_history(self):
-        if self._config:
-            self._config.set("screenshot_history", [])
+        if self._store:
+            self._store.clear_screenshot_history()
 
     def _ensure_thread_running(self):
         if not self._thread or not self._thread.is_alive():
@@ -327,6 +491,8 @@ class PerformanceMonitor:
                     "memory_mb": 0.0,
                     "memory_fmt": _format_mem(0.0),
                     "threads": 0,
+                    "suspended_seconds": 0.0,
+                    "saved_cpu_seconds": 0.0,
                     "history": {"cpu": [], "memory_mb": []},
                     "thread_names": {},
                 },
@@ -339,7 +505,7 @@ class PerformanceMonitor:
             for category, proc in list(self._processes.items()):
                 try:
                     # Upgrade wrapper process to real engine if available
-                    if category in ("backend", "screenshot") and proc.name() != "linux-wallpaperengine":
+                    if is_capture(category) and proc.name() != "linux-wallpaperengine":
                         real = self._find_real_process(proc.pid)
                         if real and real.name() == "linux-wallpaperengine":
                             _ = real.cpu_percent(interval=None)
@@ -353,6 +519,19 @@ class PerformanceMonitor:
                         threads = int(proc.num_threads())
                         status = str(proc.status())
                         name = str(proc.name())
+                        cpu_times = proc.cpu_times()
+
+                    cpu_total = cpu_times.user + cpu_times.system
+                    if is_backend(category):
+                        # The scope's cgroup also covers helper processes and costs one read
+                        usage = self._cgroup_usage(category, proc.pid)
+                        if usage:
+                            cgroup_cpu, cpu_total, mem_mb = usage
+                            if cgroup_cpu is not None:
+                                cpu = cgroup_cpu
+                        # A static image backend costs nothing worth charging to the wallpaper
+                        if name in RENDERER_PROCESSES:
+                            self._record_cost(category, proc.pid, cpu_total, mem_mb)
 
                     if category not in self._history:
                         self._init_history(category)
@@ -393,6 +572,9 @@ class PerformanceMonitor:
             stats["total"]["cpu_fmt"] = _format_cpu(total_cpu)
             stats["total"]["memory_mb"] = total_mem
             stats["total"]["memory_fmt"] = _format_mem(total_mem)
+            suspended, saved = self.get_suspension()
+            stats["total"]["suspended_seconds"] = round(suspended, 1)
+            stats["total"]["saved_cpu_seconds"] = round(saved, 1)
             stats["total"]["history"] = {
                 "cpu": list(self._history["total"]["cpu"]),
                 "memory_mb": list(self._history["total"]["memory_mb"])
@@ -409,10 +591,8 @@ class PerformanceMonitor:
 
             self._notify(stats)
             
-            interval = self._interval
-            if "screenshot" in self._processes:
-                interval = 0.1
-            time.sleep(interval)
+            # Captures are sampled once more when they finish (stop_task)
+            time.sleep(self._interval)
 
     def _notify(self, stats: _StatsPayload) -> None:
         for cb in self._callbacks:
@@ -0,0 +1,141 @@
+import os
+from typing import Callable, List, Optional, Tuple
+
+from gi.repository import GLib
+
+POWER_SUPPLY_PATH = "/sys/class/power_supply"
+# Seconds between power supply checks
+POLL_SECONDS = 30
+
+PROFILES = ("ac", "battery", "low_battery")
+# Settings a power profile may override; anything it leaves out comes from config
+PROFILE_KEYS = ("fps", "disableParticles", "disableParallax", "noFullscreenPause", "cycleInterval")
+
+
+def _read(path: str) -> str:
+    try:
+        with open(path, "r") as f:
+            return f.read().strip()
+    except OSError:
+        return ""
+
+
+def read_power_supply(root: str = POWER_SUPPLY_PATH) -> Tuple[bool, Optional[int]]:
+    """
+    (on battery, battery percent) from the kernel's power_supply class.
+
+    Batteries of peripherals (scope "Device", e.g. a mouse) are ignored. A
+    machine without a system battery is always on AC.
+    """
+    try:
+        names = sorted(os.listdir(root))
+    except OSError:
+        return False, None
+
+    mains_seen = False
+    mains_online = False
+    discharging = False
+    capacities: List[int] = []
+    for name in names:
+        supply = os.path.join(root, name)
+        kind = _read(os.path.join(supply, "type"))
+        if kind in ("Mains", "USB", "Wireless"):
+            mains_seen = True
+            mains_online = mains_online or _read(os.path.join(supply, "online")) == "1"
+        elif kind == "Battery" and _read(os.path.join(supply, "scope")) != "Device":
+            discharging = discharging or _read(os.path.join(supply, "status")) == "Discharging"
+            try:
+                capacities.append(int(_read(os.path.join(supply, "capacity"))))
+            except ValueError:
+                pass
+
+    if not capacities and not discharging:
+        return False, None
+    on_battery = not mains_online if mains_seen else discharging
+    capacity = round(sum(capacities) / len(capacities)) if capacities else None
+    return on_battery, capacity
+
+
+class PowerMonitor:
+    """
+    Picks the power profile ("ac", "battery" or "low_battery") from sysfs.
+
+    The power source is polled every POLL_SECONDS; callbacks registered with
+    connect() run on the main loop when the profile changes. With
+    powerProfilesEnabled set, get() returns the active profile's overrides
+    from powerProfiles instead of the global settings.
+    """
+
+    def __init__(self, config, root: str = POWER_SUPPLY_PATH):
+        self.config = config
+        self.root = root
+        self.on_battery = False
+        self.capacity: Optional[int] = None
+        self.profile = "ac"
+        self._source = 0
+        self._callbacks: List[Callable[[str, str], None]] = []
+        self.refresh()
+
+    def start(self):
+        if not self._source:
+            self._source = GLib.timeout_add_seconds(POLL_SECONDS, self._poll)
+
+    def stop(self):
+        if self._source:
+            GLib.source_remove(self._source)
+            self._source = 0
+
+    def connect(self, callback: Callable[[str, str], None]):
+        """Call callback(old profile, new profile) on every profile change"""
+        self._callbacks.append(callback)
+
+    def _poll(self) -> bool:
+        self.refresh()
+        return True
+
+    def refresh(self):
+        self.on_battery, self.capacity = read_power_supply(self.root)
+        profile = self._pick()
+        if profile == self.profile:
+            return
+        old, self.profile = self.profile, profile
+        for callback in self._callbacks:
+            try:
+                callback(old, profile)
+            except Exception as e:
+                print(f"[POWER] Callback error: {e}")
+
+    def _pick(self) -> str:
+        if not self.on_battery:
+            return "ac"
+        try:
+            threshold = int(self.config.get("lowBatteryThreshold", 20))
+        except (TypeError, ValueError):
+            threshold = 20
+        if self.capacity is not None and self.capacity <= threshold:
+            return "low_battery"
+        return "battery"
+
+    def enabled(self) -> bool:
+        return bool(self.config.get("powerProfilesEnabled", False))
+
+    def overrides(self) -> dict:
+        """Settings the active profile overrides, empty when profiles are off"""
+        if not self.enabled():
+            return {}
+        profile = (self.config.get("powerProfiles") or {}).get(self.profile) or {}
+        return {k: v for k, v in profile.items() if k in PROFILE_KEYS}
+
+    def get(self, key: str, default=None):
+        """Config value of key as the active power profile has it"""
+        overrides = self.overrides()
+        if key in overrides:
+            return overrides[key]
+        return self.config.get(key, default)
+
+    def describe(self) -> str:
+        if not self.on_battery:
+            return "AC power"
+        if self.capacity is None:
+            return "Battery"
+        return f"Battery {self.capacity}%"
@@ -1,14 +1,34 @@
+import os
+import json
+import threading
 import subprocess
-from typing import List, Dict, Optional
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Iterable, List, Dict, Optional, Tuple
+from py_GUI.const import WORKSHOP_PATH
 from py_GUI.core.config import ConfigManager
+from py_GUI.core.storage import WallpaperStore
+
+# Background loaders; bounded so prefetching never floods the system with engine processes
+LOADER_WORKERS = 2
+
+# Engine flags a wallpaper's launch profile may override: "fps" is an int,
+# the others booleans ("audio" False mutes the wallpaper)
+LAUNCH_PROFILE_KEYS = ("fps", "disableParticles", "disableParallax", "disableMouse", "audio")
 
 class PropertiesManager:
-    def __init__(self, config: ConfigManager):
+    def __init__(self, config: ConfigManager, store: WallpaperStore):
         self._properties_cache: Dict[str, List[Dict]] = {}
         self._property_types: Dict[str, Dict[str, str]] = {}
+        # Rows read from the store, loaded per wallpaper on first access
         self._user_properties: Dict[str, Dict] = {}
+        self._launch_profiles: Dict[str, Dict] = {}
         self._config = config
-        self.load_from_config()
+        self._store = store
+        # Set by the app; used to locate project.json and read its version
+        self.wp_manager = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: Dict[str, Future] = {}
+        self._pending_lock = threading.Lock()
 
     def parse_properties_output(self, output: str) -> List[Dict]:
         """Parse --list-properties output"""
@@ -89,30 +109,271 @@ class PropertiesManager:
         parts = [p.strip() for p in value_str.split(',')]
         return (float(parts[0]), float(parts[1]), float(parts[2]))
 
+    # project.json property type -> type name printed by --list-properties
+    _PROJECT_TYPES = {
+        'bool': 'boolean',
+        'color': 'color',
+        'slider': 'slider',
+        'combo': 'combolist',
+        'textinput': 'textinput',
+        'text': 'text',
+    }
+
+    def parse_project_properties(self, raw: Dict) -> List[Dict]:
+        """
+        Build the parse_properties_output() structure from project.json's
+        general.properties, without running the engine.
+
+        Types the engine cannot set (file, directory, scene textures, groups)
+        are skipped, as --list-properties does.
+        """
+        properties = []
+        items = [(name, d) for name, d in raw.items() if isinstance(d, dict)]
+        items.sort(key=lambda item: (item[1].get('order', 0), item[0]))
+
+        for name, data in items:
+            prop_type = self._PROJECT_TYPES.get(str(data.get('type', '')).lower())
+            if prop_type is None:
+                continue
+
+            prop = {
+                'name': name,
+                'type': prop_type,
+                'text': str(data.get('text', '')),
+                'value': None,
+                'min': 0,
+                'max': 100,
+                'step': 1,
+                'options': []
+            }
+
+            value = data.get('value')
+            try:
+                if prop_type == 'color':
+                    # project.json colors are "r g b"
+                    prop['value'] = self._parse_color(",".join(str(value).replace(',', ' ').split()))
+                elif prop_type == 'boolean':
+                    prop['value'] = value in (True, 1, '1', 'true')
+                elif prop_type in ('textinput', 'text'):
+                    prop['value'] = '' if value is None else str(value)
+                else:
+                    prop['value'] = self._coerce_number(value)
+            except (ValueError, IndexError):
+                continue
+
+            if prop_type == 'slider':
+                prop['min'] = self._float_or(data.get('min'), 0.0)
+                prop['max'] = self._float_or(data.get('max'), 100.0)
+                if 'step' in data:
+                    prop['step'] = self._float_or(data['step'], 1.0)
+                elif data.get('fraction'):
+                    prop['step'] = 10.0 ** -int(self._float_or(data.get('precision'), 2))
+                else:
+                    prop['step'] = 1.0
+            elif prop_type == 'combolist':
+                for opt in data.get('options', []) or []:
+                    if isinstance(opt, dict):
+                        prop['options'].append({
+                            'label': str(opt.get('label', '')),
+                            'value': str(opt.get('value', ''))
+                        })
+
+            properties.append(prop)
+        return properties
+
+    def _float_or(self, value, default: float) -> float:
+        """value as a float, default if it is missing or not a number"""
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return default
+
+    def _coerce_number(self, value):
+        """Numbers the way parse_properties_output reads them: int if integral"""
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            return value
+        return int(number) if number == int(number) else number
+
+    def _cache_key(self, wp_id: str) -> Optional[str]:
+        """Version of a wallpaper's properties: project.json mtime + declared version"""
+        if self.wp_manager:
+            workshop_path = self.wp_manager.workshop_path
+        else:
+            workshop_path = self._config.get("workshopPath", WORKSHOP_PATH)
+        try:
+            st = os.stat(os.path.join(workshop_path, wp_id, "project.json"))
+        except OSError:
+            return None
+        version = ""
+        if self.wp_manager:
+            wp = self.wp_manager.get_wallpaper(wp_id)
+            if wp:
+                version = str(wp.get("version", ""))
+        return f"{st.st_mtime_ns}:{st.st_size}:{version}"
+
+    def _remember(self, wp_id: str, properties: List[Dict]):
+        self._properties_cache[wp_id] = properties
+        self._property_types[wp_id] = {p['name']: p['type'] for p in properties}
+
+    def _load_native(self, wp_id: str) -> Optional[List[Dict]]:
+        """Properties parsed from project.json, or None if it cannot be read"""
+        raw = None
+        wp = self.wp_manager.get_wallpaper(wp_id) if self.wp_manager else None
+        if wp is not None and 'project_properties' in wp:
+            raw = wp['project_properties']
+        else:
+            workshop_path = self.wp_manager.workshop_path if self.wp_manager else \
+                self._config.get("workshopPath", WORKSHOP_PATH)
+            try:
+                with open(os.path.join(workshop_path, wp_id, "project.json"), 'r') as f:
+                    general = json.load(f).get("general")
+                raw = general.get("properties", {}) if isinstance(general, dict) else {}
+            except (OSError, ValueError, AttributeError):
+                return None
+        if not isinstance(raw, dict):
+            return None
+
+        properties = self._filter_properties(self.parse_project_properties(raw))
+        self._remember(wp_id, properties)
+        return properties
+
+    def _load_cached(self, wp_id: str) -> Optional[List[Dict]]:
+        """Properties from the on-disk cache if still valid for project.json"""
+        cache_key = self._cache_key(wp_id)
+        if cache_key is None:
+            return None
+        try:
+            properties = self._store.get_cached_properties(wp_id, cache_key)
+        except Exception as e:
+            print(f"[PROPERTIES] Failed to read cache for {wp_id}: {e}")
+            return None
+        if properties is None:
+            return None
+        for prop in properties:
+            # JSON turns color tuples into lists
+            if prop.get('type') == 'color' and isinstance(prop.get('value'), list):
+                prop['value'] = tuple(prop['value'])
+        self._remember(wp_id, properties)
+        return properties
+
     def get_properties(self, wp_id: str) -> List[Dict]:
         """Get wallpaper properties"""
         if wp_id in self._properties_cache:
             return self._properties_cache[wp_id]
 
+        # Entries stay valid until project.json changes, whichever way they were built
+        cached = self._load_cached(wp_id)
+        if cached is not None:
+            return cached
+
+        native = self._load_native(wp_id)
+        if native is not None:
+            return native
+
+        # Fallback: project.json unreadable, ask the engine and cache the result
+
+        properties = self._run_engine(wp_id)
+        if properties is None:
+            return []
+        self._remember(wp_id, properties)
+        cache_key = self._cache_key(wp_id)
+        if cache_key is not None:
+            self._store.set_cached_properties(wp_id, cache_key, properties)
+        return properties
+
+    def _run_engine(self, wp_id: str, timeout: float = 5) -> Optional[List[Dict]]:
+        """Run --list-properties; None if the engine failed or timed out"""
         try:
             result = subprocess.run(
                 ['linux-wallpaperengine', '--list-properties', wp_id],
                 capture_output=True,
                 text=True,
-                timeout=5
+                timeout=timeout
             )
-            properties = self.parse_properties_output(result.stdout)
-
-            # Filter irrelevant properties
-            properties = self._filter_properties(properties)
-
-            self._properties_cache[wp_id] = properties
-            # Store types
-            self._property_types[wp_id] = {p['name']: p['type'] for p in properties}
-            return properties
         except Exception as e:
             print(f"[PROPERTIES] Failed to get properties for {wp_id}: {e}")
-            return []
+            return None
+        if result.returncode != 0:
+            print(f"[PROPERTIES] --list-properties exited with {result.returncode} for {wp_id}")
+            return None
+        # Filter irrelevant properties
+        return self._filter_properties(self.parse_properties_output(result.stdout))
+
+    def build_cache_entry(self, wp_id: str, use_engine: bool = False,
+                          timeout: float = 5, force: bool = False) -> Tuple[str, int]:
+        """
+        Write the persistent cache entry for one wallpaper.
+
+        Returns (status, property count); status is "skipped" (already cached
+        for this project.json), "native", "engine", "missing" or "failed".
+        """
+        cache_key = self._cache_key(wp_id)
+        if cache_key is None:
+            return "missing", 0
+        if not force:
+            cached = self._store.get_cached_properties(wp_id, cache_key)
+            if cached is not None:
+                return "skipped", len(cached)
+
+        properties = None
+        status = "native"
+        if not use_engine:
+            properties = self._load_native(wp_id)
+        if properties is None:
+            status = "engine"
+            properties = self._run_engine(wp_id, timeout)
+        if properties is None:
+            return "failed", 0
+
+        self._store.set_cached_properties(wp_id, cache_key, properties)
+        return status, len(properties)
+
+    def is_loaded(self, wp_id: str) -> bool:
+        return wp_id in self._properties_cache
+
+    def load_async(self, wp_id: str, callback: Optional[Callable[[str, List[Dict]], None]] = None) -> Future:
+        """
+        Load properties on the worker pool. callback(wp_id, properties) runs
+        on a worker thread; UI callers must hop back with GLib.idle_add.
+        Concurrent requests for the same id share one load.
+        """
+        with self._pending_lock:
+            future = self._pending.get(wp_id)
+            if future is None:
+                if wp_id in self._properties_cache:
+                    future = Future()
+                    future.set_result(self._properties_cache[wp_id])
+                else:
+                    if self._executor is None:
+                        self._executor = ThreadPoolExecutor(
+                            max_workers=LOADER_WORKERS, thread_name_prefix="PropLoader"
+                        )
+                    future = self._executor.submit(self.get_properties, wp_id)
+                    self._pending[wp_id] = future
+                    future.add_done_callback(lambda f, w=wp_id: self._forget_pending(w, f))
+        if callback:
+            future.add_done_callback(lambda f: callback(wp_id, f.result() if not f.exception() else []))
+        return future
+
+    def _forget_pending(self, wp_id: str, future: Future):
+        with self._pending_lock:
+            if self._pending.get(wp_id) is future:
+                del self._pending[wp_id]
+
+    def prefetch(self, wp_ids: Iterable[str]) -> List[Future]:
+        """Queue background loads for ids not loaded yet"""
+        return [self.load_async(wp_id) for wp_id in wp_ids if wp_id and not self.is_loaded(wp_id)]
+
+    def invalidate(self, wp_id: Optional[str] = None):
+        """Drop in-memory properties so the next access revalidates against disk"""
+        if wp_id is None:
+            self._properties_cache.clear()
+            self._property_types.clear()
+        else:
+            self._properties_cache.pop(wp_id, None)
+            self._property_types.pop(wp_id, None)
 
     def _filter_properties(self, properties: List[Dict]) -> List[Dict]:
         """Filter out internal/UI properties"""
@@ -135,28 +396,52 @@ class PropertiesManager:
         return filtered
 
     def get_property_type(self, wp_id: str, prop_name: str) -> str:
+        if wp_id not in self._property_types:
+            # Cheap: never spawns the engine
+            if self._load_native(wp_id) is None:
+                self._load_cached(wp_id)
         if wp_id in self._property_types and prop_name in self._property_types[wp_id]:
             return self._property_types[wp_id][prop_name]
         return 'unknown'
 
-    def load_from_config(self):
-        props_data = self._config.get("wallpaperProperties", {})
-        self._user_properties = props_data
-
-
-    def save_to_config(self):
-        self._config.set("wallpaperProperties", self._user_properties)
+    def get_user_properties(self, wp_id: str) -> Dict:
+        """User overrides for a wallpaper (name -> value)"""
+        if wp_id not in self._user_properties:
+            self._user_properties[wp_id] = self._store.get_properties(wp_id)
+        return self._user_properties[wp_id]
 
     def get_user_property(self, wp_id: str, prop_name: str):
-        if wp_id in self._user_properties and prop_name in self._user_properties[wp_id]:
-            return self._user_properties[wp_id][prop_name]
-        return None
+        return self.get_user_properties(wp_id).get(prop_name)
 
     def set_user_property(self, wp_id: str, prop_name: str, value):
-        if wp_id not in self._user_properties:
-            self._user_properties[wp_id] = {}
-        self._user_properties[wp_id][prop_name] = value
-        self.save_to_config()
+        self.get_user_properties(wp_id)[prop_name] = value
+        self._store.set_property(wp_id, prop_name, value)
+
+    def reset_user_property(self, wp_id: str, prop_name: str):
+        self.get_user_properties(wp_id).pop(prop_name, None)
+        self._store.delete_property(wp_id, prop_name)
+
+    def get_launch_profile(self, wp_id: str) -> Dict:
+        """Engine flags overridden for a wallpaper (see LAUNCH_PROFILE_KEYS)"""
+        if wp_id not in self._launch_profiles:
+            self._launch_profiles[wp_id] = self._store.get_launch_profile(wp_id)
+        return self._launch_profiles[wp_id]
+
+    def set_launch_profile_value(self, wp_id: str, key: str, value):
+        """Set one launch profile entry; None removes it"""
+        if key not in LAUNCH_PROFILE_KEYS:
+            raise ValueError(f"unknown launch profile key {key!r}")
+        profile = dict(self.get_launch_profile(wp_id))
+        if value is None:
+            profile.pop(key, None)
+        else:
+            profile[key] = value
+        self._launch_profiles[wp_id] = profile
+        self._store.set_launch_profile(wp_id, profile)
+
+    def reset_launch_profile(self, wp_id: str):
+        self._launch_profiles[wp_id] = {}
+        self._store.set_launch_profile(wp_id, {})
 
     def format_property_value(self, prop_type: str, value) -> str:
         if isinstance(value, (tuple, list)):
@@ -0,0 +1,145 @@
+import os
+import shutil
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Optional
+
+ENGINE = "linux-wallpaperengine"
+# Renderers tried in order per wallpaper type (project.json "type", lowercase);
+# types without a rule, and wallpapers no listed renderer can show, use the engine
+DEFAULT_RENDERER_RULES = {"video": ["mpvpaper", ENGINE]}
+# Process names of renderers whose cost is charged to the wallpapers they show
+RENDERER_PROCESSES = (ENGINE, "mpvpaper")
+
+
+def wp_type(wallpaper: Dict) -> str:
+    return str(wallpaper.get("type") or "scene").lower()
+
+
+class Renderer(ABC):
+    """
+    A program that draws wallpapers on screens.
+
+    The executable is looked up on PATH by name unless rendererPaths maps
+    the name to another program, so a stub script can stand in for it.
+    """
+
+    name = ""
+    # Wallpaper types it can show, None for all
+    types: Optional[tuple] = None
+    # Whether one process can show different wallpapers on several screens
+    multi_screen = True
+
+    def __init__(self, config):
+        self.config = config
+
+    def executable(self) -> Optional[str]:
+        path = (self.config.get("rendererPaths") or {}).get(self.name) or self.name
+        return shutil.which(path)
+
+    def can_render(self, wallpapers: List[Dict], screens: int) -> bool:
+        if screens > 1 and not self.multi_screen:
+            return False
+        if self.types is not None and any(wp_type(wp) not in self.types for wp in wallpapers):
+            return False
+        return self.executable() is not None
+
+    @abstractmethod
+    def command(self, monitors: Dict[str, str], wallpapers: List[Dict],
+                flags: Dict[str, Any]) -> List[str]:
+        """
+        Command showing monitors (screen -> wallpaper id). wallpapers are their
+        WallpaperManager entries plus "folder"; flags are the controller's
+        merged fps, silence, fullscreen-pause and disable-* settings, with the
+        power profile applied.
+        """
+
+
+class EngineRenderer(Renderer):
+    """linux-wallpaperengine, for every type; the command comes from the controller"""
+
+    name = ENGINE
+
+    def __init__(self, config, build_command: Callable[[Dict[str, str]], List[str]]):
+        super().__init__(config)
+        self._build_command = build_command
+
+    def can_render(self, wallpapers: List[Dict], screens: int) -> bool:
+        # The fallback: shown even when not installed, so the launch error is reported
+        return True
+
+    def command(self, monitors: Dict[str, str], wallpapers: List[Dict],
+                flags: Dict[str, Any]) -> List[str]:
+        cmd = self._build_command(monitors)
+        if (self.config.get("rendererPaths") or {}).get(self.name):
+            cmd[0] = self.executable() or cmd[0]
+        return cmd
+
+
+class MpvpaperRenderer(Renderer):
+    """
+    mpvpaper, for video wallpapers: mpv decodes the file with hardware
+    decoding, which costs far less than the engine. One output per process.
+    """
+
+    name = "mpvpaper"
+    types = ("video",)
+    multi_screen = False
+
+    def can_render(self, wallpapers: List[Dict], screens: int) -> bool:
+        return (super().can_render(wallpapers, screens)
+                and all(os.path.isfile(self._file(wp)) for wp in wallpapers))
+
+    def _file(self, wallpaper: Dict) -> str:
+        return os.path.join(wallpaper.get("folder") or "", wallpaper.get("file") or "")
+
+    def command(self, monitors: Dict[str, str], wallpapers: List[Dict],
+                flags: Dict[str, Any]) -> List[str]:
+        (screen, _), = monitors.items()
+        # No fps cap: a video filter would take decoding off the GPU again
+        opts = ["loop-file=inf", "hwdec=auto-safe"]
+        if flags["silent"]:
+            opts.append("no-audio")
+        else:
+            opts.append(f"volume={self.config.get('volume', 50)}")
+        scaling = str(self.config.get("scaling") or "default")
+        if scaling == "fill":
+            opts.append("panscan=1.0")
+        elif scaling == "stretch":
+            opts.append("keepaspect=no")
+
+        cmd = [self.executable() or self.name, "-o", " ".join(opts)]
+        if not flags["noFullscreenPause"]:
+            # Pause while the wallpaper is hidden, like the engine's fullscreen pause
+            cmd.append("--auto-pause")
+        cmd.extend([screen, self._file(wallpapers[0])])
+        return cmd
+
+
+class RendererSelector:
+    """Picks the first renderer in rendererRules that can show a set of wallpapers"""
+
+    def __init__(self, config, build_command: Callable[[Dict[str, str]], List[str]]):
+        self.config = config
+        self.engine = EngineRenderer(config, build_command)
+        self.renderers: Dict[str, Renderer] = {
+            r.name: r for r in (self.engine, MpvpaperRenderer(config))
+        }
+
+    def rules(self) -> Dict[str, List[str]]:
+        rules = dict(DEFAULT_RENDERER_RULES)
+        rules.update(self.config.get("rendererRules") or {})
+        return rules
+
+    def pick(self, wallpapers: List[Dict], screens: int) -> Renderer:
+        """Renderer for wallpapers shown on that many screens by one process"""
+        if not wallpapers:
+            return self.engine
+        rules = self.rules()
+        # The first wallpaper's rule decides the order; the others must be renderable too
+        for name in rules.get(wp_type(wallpapers[0]), [ENGINE]):
+            renderer = self.renderers.get(name)
+            if renderer is None:
+                continue
+            if renderer.can_render(wallpapers, screens):
+                return renderer
+        return self.engine
@@ -0,0 +1,257 @@
+import os
+import shutil
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from gi.repository import GLib
+
+from py_GUI.const import CONFIG_DIR
+from py_GUI.core.capture import CaptureTracker, PendingCapture, uses_xvfb
+
+SNAPSHOT_DIR = os.path.join(CONFIG_DIR, "snapshots")
+# When static snapshots replace the engine (staticSnapshotMode)
+SNAPSHOT_MODES = ("off", "battery", "low_battery", "always")
+# Image backends that keep running while the image is shown: swaybg on
+# Wayland, xwallpaper on X11 (staticBackend "auto")
+STATIC_BACKENDS = ("swaybg", "xwallpaper")
+# Seconds between load average checks
+LOAD_POLL_SECONDS = 30
+# Under load, live engines resume once the load falls below this share of the threshold
+LOAD_RESUME_RATIO = 0.75
+# Frames the engine renders before a snapshot is taken
+CAPTURE_DELAY = 20
+# Seconds a capture may take before it is given up
+CAPTURE_TIMEOUT = 120.0
+
+
+def load_per_cpu() -> float:
+    """1-minute load average divided by the number of CPUs"""
+    try:
+        return os.getloadavg()[0] / (os.cpu_count() or 1)
+    except OSError:
+        return 0.0
+
+
+class StaticSnapshots:
+    """
+    Shows cached still frames instead of running the engine.
+
+    Each wallpaper is captured once with the screenshot pipeline (in Xvfb)
+    and kept in SNAPSHOT_DIR. While the conditions of staticSnapshotMode hold
+    (on battery, on low battery, always) or the load per CPU is above
+    staticSnapshotLoad, static_command() returns a swaybg or xwallpaper
+    command showing those frames; the controller runs it in place of the
+    engine. Callbacks registered with connect() run when the mode turns on
+    or off, and after a capture so the frame can replace the engine.
+    """
+
+    def __init__(self, config, power, log_manager,
+                 start_capture: Callable[[str, str, Callable[[Dict], None]],
+                                         Union[CaptureTracker, PendingCapture]],
+                 workshop_path: Callable[[], str],
+                 directory: str = SNAPSHOT_DIR):
+        self.config = config
+        self.power = power
+        self.log_manager = log_manager
+        # start_capture(wp_id, output_path, on_done) is WallpaperController.capture()
+        self._start_capture = start_capture
+        # Library directory, resolved on each use since it can change in Settings
+        self._workshop_path = workshop_path
+        self.directory = directory
+        self.active = False
+        self._loaded = False
+        self._source = 0
+        self._callbacks: List[Callable[[bool], None]] = []
+        self._queue: List[str] = []
+        self._failed: set = set()
+        self._capture: Optional[Union[CaptureTracker, PendingCapture]] = None
+        self._capture_id: Optional[str] = None
+        self._warned: set = set()
+        self.config.connect("staticSnapshotMode", lambda key, old, new: self.refresh())
+        self.config.connect("staticSnapshotLoad", lambda key, old, new: self.refresh())
+        self.power.connect(lambda old, new: self.refresh())
+
+    def start(self):
+        if not self._source:
+            self._source = GLib.timeout_add_seconds(LOAD_POLL_SECONDS, self._poll)
+        self.refresh()
+
+    def stop(self):
+        if self._source:
+            GLib.source_remove(self._source)
+            self._source = 0
+        self._queue.clear()
+        if self._capture:
+            self._capture.cancel()
+            self._capture = None
+            self._capture_id = None
+
+    def connect(self, callback: Callable[[bool], None]):
+        """Call callback(active) when the mode changes or a new frame is ready"""
+        self._callbacks.append(callback)
+
+    def _notify(self):
+        for callback in self._callbacks:
+            try:
+                callback(self.active)
+            except Exception as e:
+                print(f"[SNAPSHOT] Callback error: {e}")
+
+    def _poll(self) -> bool:
+        self.refresh()
+        return True
+
+    def refresh(self):
+        active = self._wanted()
+        if active == self.active:
+            return
+        self.active = active
+        self.log_manager.add_info(
+            "Static snapshots on" if active else "Static snapshots off, resuming engines",
+            "Snapshot")
+        self._notify()
+
+    def _wanted(self) -> bool:
+        mode = str(self.config.get("staticSnapshotMode") or "off")
+        if mode == "always":
+            return True
+        if mode == "battery" and self.power.on_battery:
+            return True
+        if mode == "low_battery" and self.power.profile == "low_battery":
+            return True
+        try:
+            threshold = float(self.config.get("staticSnapshotLoad", 0) or 0)
+        except (TypeError, ValueError):
+            threshold = 0.0
+        if threshold <= 0:
+            self._loaded = False
+            return False
+        # Hysteresis: the engines themselves add to the load they are stopped for
+        load = load_per_cpu()
+        limit = threshold * LOAD_RESUME_RATIO if self._loaded else threshold
+        self._loaded = load > limit
+        return self._loaded
+
+    # Cached frames
+
+    def path(self, wp_id: str) -> str:
+        return os.path.join(self.directory, f"{wp_id}.png")
+
+    def is_cached(self, wp_id: str) -> bool:
+        """Whether a frame exists that is newer than the wallpaper's project.json"""
+        try:
+            shot = os.stat(self.path(wp_id))
+        except OSError:
+            return False
+        try:
+            project = os.path.getmtime(os.path.join(self._workshop_path(), str(wp_id), "project.json"))
+        except OSError:
+            project = 0.0
+        return shot.st_size > 0 and shot.st_mtime >= project
+
+    # Static backend
+
+    def backend(self) -> Optional[str]:
+        """Image backend for this session, None if none is installed"""
+        preferred = str(self.config.get("staticBackend") or "auto")
+        if preferred != "auto":
+            candidates: Tuple[str, ...] = (preferred,)
+        elif os.environ.get("WAYLAND_DISPLAY"):
+            candidates = ("swaybg",)
+        else:
+            candidates = ("xwallpaper",)
+        for name in candidates:
+            if name in STATIC_BACKENDS and shutil.which(name):
+                return name
+        self._warn_once("backend", f"No static image backend found ({', '.join(candidates)}), keeping the engine")
+        return None
+
+    def static_command(self, monitors: Dict[str, str]) -> Optional[List[str]]:
+        """
+        Command showing the cached frames of monitors (screen -> wallpaper id).
+
+        None while the mode is off, without a backend, or until every frame
+        is cached; missing frames are captured in the background.
+        """
+        if not self.active or not monitors:
+            return None
+        backend = self.backend()
+        if not backend:
+            return None
+        missing = [wid for wid in dict.fromkeys(monitors.values()) if not self.is_cached(wid)]
+        if missing:
+            self.request(missing)
+            return None
+
+        if backend == "swaybg":
+            cmd = ["swaybg"]
+            for scr, wid in monitors.items():
+                cmd.extend(["-o", scr, "-i", self.path(wid), "-m", "fill"])
+        else:
+            # --daemon stays in the foreground and reapplies on output changes
+            cmd = ["xwallpaper", "--daemon"]
+            for scr, wid in monitors.items():
+                cmd.extend(["--output", scr, "--zoom", self.path(wid)])
+        return cmd
+
+    # Captures, one at a time
+
+    def request(self, wp_ids: List[str]):
+        """Queue captures of wallpapers without a cached frame"""
+        if not uses_xvfb(self.config):
+            # Without Xvfb the capture would open a window on the desktop
+            self._warn_once("xvfb", "Static snapshots need Xvfb to capture frames, keeping the engine")
+            return
+        for wp_id in wp_ids:
+            wp_id = str(wp_id)
+            if wp_id not in self._queue and wp_id not in self._failed and wp_id != self._capture_id:
+                self._queue.append(wp_id)
+        self._next()
+
+    def _next(self):
+        if self._capture or not self._queue:
+            return
+        wp_id = self._queue.pop(0)
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = self.path(wp_id) + ".part.png"
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        try:
+            self._capture = self._start_capture(
+                wp_id, tmp_path, lambda result: self._on_captured(wp_id, result))
+        except Exception as e:
+            self.log_manager.add_error(f"Failed to capture {wp_id}: {e}", "Snapshot")
+            self._failed.add(wp_id)
+            self._next()
+            return
+        self._capture_id = wp_id
+        self.log_manager.add_info(f"Capturing a frame of {wp_id}", "Snapshot")
+
+    def _on_captured(self, wp_id: str, result: Dict):
+        self._capture = None
+        self._capture_id = None
+        if result["ok"]:
+            try:
+                os.replace(result["path"], self.path(wp_id))
+            except OSError as e:
+                result = dict(result, ok=False, error=str(e))
+        if result["ok"]:
+            self.log_manager.add_info(f"Captured {wp_id} in {result['seconds']:.1f}s", "Snapshot")
+        else:
+            # Not retried until the app restarts
+            self._failed.add(wp_id)
+            try:
+                os.remove(result["path"])
+            except OSError:
+                pass
+            self.log_manager.add_warning(
+                f"Could not capture a frame of {wp_id} ({result['error']}), keeping the engine", "Snapshot")
+        self._next()
+        if result["ok"] and self.active:
+            self._notify()
+
+    def _warn_once(self, key: str, message: str):
+        if key not in self._warned:
+            self._warned.add(key)
+            self.log_manager.add_warning(message, "Snapshot")
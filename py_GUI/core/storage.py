@@ -0,0 +1,414 @@
+import os
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Iterable, Any
+from py_GUI.const import STORE_FILE
+
+SCREENSHOT_HISTORY_LIMIT = 10
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS wallpaper_properties (
+    wp_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    value TEXT,
+    PRIMARY KEY (wp_id, name)
+);
+CREATE TABLE IF NOT EXISTS wallpaper_launch_profiles (
+    wp_id TEXT PRIMARY KEY,
+    profile TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS wallpaper_nicknames (
+    wp_id TEXT PRIMARY KEY,
+    nickname TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS properties_cache (
+    wp_id TEXT PRIMARY KEY,
+    cache_key TEXT NOT NULL,
+    properties TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS wallpaper_cost (
+    wp_id TEXT PRIMARY KEY,
+    runtime REAL DEFAULT 0,
+    cpu_seconds REAL DEFAULT 0,
+    rss_mb_seconds REAL DEFAULT 0,
+    peak_rss_mb REAL DEFAULT 0,
+    updated REAL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS screenshot_history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp REAL NOT NULL,
+    wp_id TEXT NOT NULL,
+    output_path TEXT,
+    duration REAL DEFAULT 0,
+    max_cpu REAL DEFAULT 0,
+    max_mem REAL DEFAULT 0,
+    avg_cpu REAL DEFAULT 0,
+    avg_mem REAL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS apply_latency (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp REAL NOT NULL,
+    wp_id TEXT NOT NULL,
+    total REAL DEFAULT 0,
+    config REAL DEFAULT 0,
+    history REAL DEFAULT 0,
+    queued REAL DEFAULT 0,
+    spawn REAL DEFAULT 0,
+    ready REAL DEFAULT 0,
+    timed_out INTEGER DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS apply_latency_wp ON apply_latency (wp_id, id);
+CREATE TABLE IF NOT EXISTS wallpaper_benchmarks (
+    wp_id TEXT NOT NULL,
+    version TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    status TEXT NOT NULL,
+    duration REAL DEFAULT 0,
+    samples INTEGER DEFAULT 0,
+    avg_cpu REAL DEFAULT 0,
+    peak_cpu REAL DEFAULT 0,
+    avg_rss_mb REAL DEFAULT 0,
+    peak_rss_mb REAL DEFAULT 0,
+    avg_threads REAL DEFAULT 0,
+    peak_threads INTEGER DEFAULT 0,
+    error TEXT,
+    PRIMARY KEY (wp_id, version)
+);
+"""
+
+# Columns added to tables after they first shipped: table -> ((column, definition), ...)
+_ADDED_COLUMNS = {
+    "apply_latency": (("timed_out", "INTEGER DEFAULT 0"),),
+}
+
+# Config keys that used to hold per-wallpaper data inside config.json
+_MIGRATED_CONFIG_KEYS = ("wallpaperProperties", "wallpaperNicknames", "screenshot_history")
+
+
+class WallpaperStore:
+    """
+    Embedded SQLite store for bulky per-wallpaper data.
+
+    config.json keeps small scalar settings; anything that grows with the
+    library (user properties, nicknames, screenshot stats) lives here and is
+    read and written one row at a time.
+    """
+
+    def __init__(self, path: str = STORE_FILE):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.RLock()
+        # Autocommit mode; multi-statement writes use transaction()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            if path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+            self._add_columns()
+
+    def _add_columns(self):
+        """Bring tables created by an older version up to _SCHEMA"""
+        for table, columns in _ADDED_COLUMNS.items():
+            existing = {row["name"] for row in self._conn.execute(f"PRAGMA table_info({table})")}
+            for name, definition in columns:
+                if name not in existing:
+                    self._conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {definition}")
+
+    def _execute(self, sql: str, params: Iterable[Any] = ()) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(sql, tuple(params)).fetchall()
+
+    @contextmanager
+    def transaction(self):
+        """Run several writes atomically"""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                yield self
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # Meta
+
+    def get_meta(self, key: str) -> Optional[str]:
+        rows = self._execute("SELECT value FROM meta WHERE key = ?", (key,))
+        return rows[0]["value"] if rows else None
+
+    def set_meta(self, key: str, value: str):
+        self._execute(
+            "INSERT INTO meta (key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, value),
+        )
+
+    # User properties
+
+    def get_properties(self, wp_id: str) -> Dict[str, Any]:
+        rows = self._execute(
+            "SELECT name, value FROM wallpaper_properties WHERE wp_id = ?", (wp_id,)
+        )
+        return {row["name"]: json.loads(row["value"]) for row in rows}
+
+    def set_property(self, wp_id: str, name: str, value: Any):
+        self._execute(
+            "INSERT INTO wallpaper_properties (wp_id, name, value) VALUES (?, ?, ?) "
+            "ON CONFLICT(wp_id, name) DO UPDATE SET value = excluded.value",
+            (wp_id, name, json.dumps(value)),
+        )
+
+    def delete_property(self, wp_id: str, name: str):
+        self._execute(
+            "DELETE FROM wallpaper_properties WHERE wp_id = ? AND name = ?", (wp_id, name)
+        )
+
+    # Launch profiles (per-wallpaper engine flags)
+
+    def get_launch_profile(self, wp_id: str) -> Dict[str, Any]:
+        rows = self._execute(
+            "SELECT profile FROM wallpaper_launch_profiles WHERE wp_id = ?", (wp_id,)
+        )
+        return json.loads(rows[0]["profile"]) if rows else {}
+
+    def set_launch_profile(self, wp_id: str, profile: Dict[str, Any]):
+        """Store a wallpaper's launch profile; an empty one is deleted"""
+        if not profile:
+            self._execute("DELETE FROM wallpaper_launch_profiles WHERE wp_id = ?", (wp_id,))
+            return
+        self._execute(
+            "INSERT INTO wallpaper_launch_profiles (wp_id, profile) VALUES (?, ?) "
+            "ON CONFLICT(wp_id) DO UPDATE SET profile = excluded.profile",
+            (wp_id, json.dumps(profile)),
+        )
+
+    # Parsed --list-properties results
+
+    def get_cached_properties(self, wp_id: str, cache_key: str) -> Optional[List[Dict[str, Any]]]:
+        """Cached property list, or None if missing or stale for cache_key"""
+        rows = self._execute(
+            "SELECT properties FROM properties_cache WHERE wp_id = ? AND cache_key = ?",
+            (wp_id, cache_key),
+        )
+        return json.loads(rows[0]["properties"]) if rows else None
+
+    def set_cached_properties(self, wp_id: str, cache_key: str, properties: List[Dict[str, Any]]):
+        self._execute(
+            "INSERT INTO properties_cache (wp_id, cache_key, properties) VALUES (?, ?, ?) "
+            "ON CONFLICT(wp_id) DO UPDATE SET "
+            "cache_key = excluded.cache_key, properties = excluded.properties",
+            (wp_id, cache_key, json.dumps(properties)),
+        )
+
+    def clear_cached_properties(self):
+        self._execute("DELETE FROM properties_cache")
+
+    # Nicknames
+
+    def get_nicknames(self) -> Dict[str, str]:
+        rows = self._execute("SELECT wp_id, nickname FROM wallpaper_nicknames")
+        return {row["wp_id"]: row["nickname"] for row in rows}
+
+    def set_nickname(self, wp_id: str, nickname: str):
+        self._execute(
+            "INSERT INTO wallpaper_nicknames (wp_id, nickname) VALUES (?, ?) "
+            "ON CONFLICT(wp_id) DO UPDATE SET nickname = excluded.nickname",
+            (wp_id, nickname),
+        )
+
+    def delete_nicknames(self, wp_ids: Iterable[str]):
+        with self.transaction():
+            for wp_id in wp_ids:
+                self._conn.execute("DELETE FROM wallpaper_nicknames WHERE wp_id = ?", (wp_id,))
+
+    # Runtime cost
+
+    def get_costs(self) -> Dict[str, Dict[str, float]]:
+        rows = self._execute(
+            "SELECT wp_id, runtime, cpu_seconds, rss_mb_seconds, peak_rss_mb, updated FROM wallpaper_cost"
+        )
+        return {row["wp_id"]: {k: row[k] for k in row.keys() if k != "wp_id"} for row in rows}
+
+    def add_costs(self, deltas: Dict[str, Dict[str, float]], updated: float):
+        """Accumulate runtime/CPU/RSS deltas per wallpaper in one transaction"""
+        with self.transaction():
+            for wp_id, d in deltas.items():
+                self._conn.execute(
+                    "INSERT INTO wallpaper_cost "
+                    "(wp_id, runtime, cpu_seconds, rss_mb_seconds, peak_rss_mb, updated) "
+                    "VALUES (?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(wp_id) DO UPDATE SET "
+                    "runtime = runtime + excluded.runtime, "
+                    "cpu_seconds = cpu_seconds + excluded.cpu_seconds, "
+                    "rss_mb_seconds = rss_mb_seconds + excluded.rss_mb_seconds, "
+                    "peak_rss_mb = MAX(peak_rss_mb, excluded.peak_rss_mb), "
+                    "updated = excluded.updated",
+                    (wp_id, d["runtime"], d["cpu_seconds"], d["rss_mb_seconds"],
+                     d["peak_rss_mb"], updated),
+                )
+
+    def clear_costs(self):
+        self._execute("DELETE FROM wallpaper_cost")
+
+    # Screenshot history
+
+    def _insert_screenshot(self, record: Dict[str, Any]):
+        self._conn.execute(
+            "INSERT INTO screenshot_history "
+            "(timestamp, wp_id, output_path, duration, max_cpu, max_mem, avg_cpu, avg_mem) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                record.get("timestamp", 0),
+                str(record.get("wp_id", "")),
+                record.get("output_path", ""),
+                record.get("duration", 0),
+                record.get("max_cpu", 0),
+                record.get("max_mem", 0),
+                record.get("avg_cpu", 0),
+                record.get("avg_mem", 0),
+            ),
+        )
+
+    def add_screenshot_record(self, record: Dict[str, Any], limit: int = SCREENSHOT_HISTORY_LIMIT):
+        with self.transaction():
+            self._insert_screenshot(record)
+            self._conn.execute(
+                "DELETE FROM screenshot_history WHERE id NOT IN "
+                "(SELECT id FROM screenshot_history ORDER BY id DESC LIMIT ?)",
+                (limit,),
+            )
+
+    def get_screenshot_history(self) -> List[Dict[str, Any]]:
+        """Oldest first, matching the old config list layout"""
+        rows = self._execute(
+            "SELECT timestamp, wp_id, output_path, duration, max_cpu, max_mem, avg_cpu, avg_mem "
+            "FROM screenshot_history ORDER BY id ASC"
+        )
+        return [dict(row) for row in rows]
+
+    def clear_screenshot_history(self):
+        self._execute("DELETE FROM screenshot_history")
+
+    # Apply latency
+
+    def add_apply_latency(self, wp_id: str, timestamp: float, total: float,
+                          phases: Dict[str, float], limit: int, timed_out: bool = False):
+        """Store one sample and keep only the newest limit samples of wp_id"""
+        with self.transaction():
+            self._conn.execute(
+                "INSERT INTO apply_latency "
+                "(timestamp, wp_id, total, config, history, queued, spawn, ready, timed_out) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (timestamp, wp_id, total, phases.get("config", 0), phases.get("history", 0),
+                 phases.get("queued", 0), phases.get("spawn", 0), phases.get("ready", 0),
+                 int(timed_out)),
+            )
+            self._conn.execute(
+                "DELETE FROM apply_latency WHERE wp_id = ? AND id NOT IN "
+                "(SELECT id FROM apply_latency WHERE wp_id = ? ORDER BY id DESC LIMIT ?)",
+                (wp_id, wp_id, limit),
+            )
+
+    def get_apply_latency(self) -> Dict[str, List[Dict[str, float]]]:
+        """Samples per wallpaper id, oldest first"""
+        rows = self._execute(
+            "SELECT wp_id, total, config, history, queued, spawn, ready, timed_out "
+            "FROM apply_latency ORDER BY id ASC"
+        )
+        samples: Dict[str, List[Dict[str, float]]] = {}
+        for row in rows:
+            samples.setdefault(row["wp_id"], []).append(
+                {k: row[k] for k in row.keys() if k != "wp_id"})
+        return samples
+
+    def clear_apply_latency(self):
+        self._execute("DELETE FROM apply_latency")
+
+    # Headless benchmarks
+
+    def add_benchmark(self, record: Dict[str, Any]):
+        """Store a benchmark result, replacing an earlier one of the same wallpaper version"""
+        self._execute(
+            "INSERT OR REPLACE INTO wallpaper_benchmarks "
+            "(wp_id, version, timestamp, status, duration, samples, avg_cpu, peak_cpu, "
+            "avg_rss_mb, peak_rss_mb, avg_threads, peak_threads, error) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                str(record["wp_id"]), record["version"], record["timestamp"], record["status"],
+                record.get("duration", 0), record.get("samples", 0),
+                record.get("avg_cpu", 0), record.get("peak_cpu", 0),
+                record.get("avg_rss_mb", 0), record.get("peak_rss_mb", 0),
+                record.get("avg_threads", 0), record.get("peak_threads", 0),
+                record.get("error"),
+            ),
+        )
+
+    def get_benchmarks(self) -> Dict[str, Dict[str, Any]]:
+        """Newest benchmark result per wallpaper id"""
+        rows = self._execute("SELECT * FROM wallpaper_benchmarks ORDER BY timestamp ASC")
+        return {row["wp_id"]: dict(row) for row in rows}
+
+    def clear_benchmarks(self):
+        self._execute("DELETE FROM wallpaper_benchmarks")
+
+    # Migration
+
+    def migrate_from_config(self, config) -> bool:
+        """
+        One-time import of per-wallpaper data embedded in config.json.
+
+        Returns True if anything was migrated. The keys are removed from the
+        config afterwards so it only keeps scalar settings.
+        """
+        if self.get_meta("config_migrated"):
+            return False
+
+        props = config.get("wallpaperProperties", {}) or {}
+        nicknames = config.get("wallpaperNicknames", {}) or {}
+        shots = config.get("screenshot_history", []) or []
+
+        with self.transaction():
+            if isinstance(props, dict):
+                for wp_id, values in props.items():
+                    if not isinstance(values, dict):
+                        continue
+                    for name, value in values.items():
+                        self._conn.execute(
+                            "INSERT OR REPLACE INTO wallpaper_properties (wp_id, name, value) "
+                            "VALUES (?, ?, ?)",
+                            (str(wp_id), name, json.dumps(value)),
+                        )
+            if isinstance(nicknames, dict):
+                for wp_id, nickname in nicknames.items():
+                    if nickname:
+                        self._conn.execute(
+                            "INSERT OR REPLACE INTO wallpaper_nicknames (wp_id, nickname) "
+                            "VALUES (?, ?)",
+                            (str(wp_id), str(nickname)),
+                        )
+            if isinstance(shots, list):
+                for record in shots[-SCREENSHOT_HISTORY_LIMIT:]:
+                    if isinstance(record, dict):
+                        self._insert_screenshot(record)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('config_migrated', '1')"
+            )
+
+        with config.batch():
+            for key in _MIGRATED_CONFIG_KEYS:
+                config.remove(key)
+
+        return bool(props or nicknames or shots)
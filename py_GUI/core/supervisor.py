@@ -0,0 +1,562 @@
+import os
+import re
+import codecs
+import signal
+import subprocess
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Iterable, List, Optional
+
+from gi.repository import GLib
+
+# Seconds between SIGTERM and SIGKILL
+TERM_TIMEOUT = 2.0
+# An engine exiting this soon after launch failed to start rather than crashed
+STARTUP_WINDOW = 2.0
+# Auto-restart delay: BACKOFF_BASE * 2^attempt seconds, capped at BACKOFF_MAX
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 60.0
+# Consecutive crashes after which an engine is left stopped
+MAX_RESTARTS = 5
+# Uptime after which an engine counts as healthy again and the backoff resets
+STABLE_SECONDS = 30.0
+# Output lines kept in memory for crash reports
+OUTPUT_LINES = 50
+# Engine log files are rotated at start and when they reach this size
+ENGINE_LOG_MAX_BYTES = 1024 * 1024
+# Rotated engine logs kept next to the current one (.1 is the newest)
+ENGINE_LOG_BACKUPS = 3
+# Engine lines forwarded to the GUI log: sustained lines per second and burst size
+LOG_RATE = 20.0
+LOG_BURST = 100
+# A line without a newline is cut off here so the read buffer stays bounded
+MAX_LINE = 8192
+# Device nodes an engine holds open once its GL context is up: DRM nodes and
+# the NVIDIA driver's devices
+GPU_DEVICE_PREFIXES = ("/dev/dri/", "/dev/nvidia")
+# Seconds between readiness checks of a starting engine, and how long it is checked
+READY_POLL_INTERVAL = 0.1
+READY_POLL_WINDOW = 60.0
+
+
+def describe_exit(code: int) -> str:
+    if code < 0:
+        try:
+            return f"killed by {signal.Signals(-code).name}"
+        except ValueError:
+            return f"killed by signal {-code}"
+    return f"exit code {code}"
+
+
+def uses_gpu(pid: int) -> bool:
+    """Whether the process holds a GPU device open, i.e. has set up its GL context"""
+    fd_dir = f"/proc/{pid}/fd"
+    try:
+        fds = os.listdir(fd_dir)
+    except OSError:
+        return False
+    for fd in fds:
+        try:
+            if os.readlink(os.path.join(fd_dir, fd)).startswith(GPU_DEVICE_PREFIXES):
+                return True
+        except OSError:
+            continue
+    return False
+
+
+def _line_level(line: str) -> str:
+    lower = line.lower()
+    if "error" in lower or "fatal" in lower or "segmentation fault" in lower:
+        return "ERROR"
+    if "warn" in lower:
+        return "WARNING"
+    return "INFO"
+
+
+class RotatingLog:
+    """
+    Engine output file that never grows past max_bytes.
+
+    Opening rotates the previous file to .1 (and .1 to .2, ...) so the output
+    of the last few runs survives a restart; a file that fills up is rotated
+    the same way while the engine keeps running.
+    """
+
+    def __init__(self, path: str, max_bytes: int = ENGINE_LOG_MAX_BYTES,
+                 backups: int = ENGINE_LOG_BACKUPS):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._file = None
+        self._size = 0
+        self.rotate()
+
+    def rotate(self):
+        self.close()
+        try:
+            for i in range(self.backups - 1, 0, -1):
+                older = f"{self.path}.{i}"
+                if os.path.exists(older):
+                    os.replace(older, f"{self.path}.{i + 1}")
+            if self.backups > 0 and os.path.exists(self.path) and os.path.getsize(self.path) > 0:
+                os.replace(self.path, f"{self.path}.1")
+        except OSError as e:
+            print(f"[SUPERVISOR] Failed to rotate {self.path}: {e}")
+        self._file = open(self.path, "w", encoding="utf-8", errors="replace")
+        self._size = 0
+
+    def write(self, line: str):
+        if not self._file:
+            return
+        data = line + "\n"
+        self._file.write(data)
+        self._size += len(data)
+        if self._size >= self.max_bytes:
+            self.rotate()
+
+    def flush(self):
+        if self._file:
+            self._file.flush()
+
+    def close(self):
+        if self._file:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+            self._file = None
+
+
+class _Engine:
+    """Bookkeeping for one supervised engine process"""
+
+    def __init__(self, key: str, proc: subprocess.Popen, cmd: List[str], log_path: str, log: RotatingLog):
+        self.key = key
+        self.proc = proc
+        self.cmd = cmd
+        self.log_path = log_path
+        self.log = log
+        self.started = time.monotonic()
+        self.stopping = False
+        self.kill_source = 0
+        # SIGSTOPped by freeze()
+        self.suspended = False
+        # Output pipe state
+        self.io_source = 0
+        self.decoder = codecs.getincrementaldecoder("utf-8")("replace")
+        self.partial = ""
+        self.tail: Deque[str] = deque(maxlen=OUTPUT_LINES)
+        # Token bucket for lines forwarded to the LogManager
+        self.tokens = float(LOG_BURST)
+        self.refilled = self.started
+        self.suppressed = 0
+        # Readiness: the supervisor's ready_pattern at spawn, or the GPU check polled by ready_poll
+        self.ready = False
+        self.ready_pattern: Optional["re.Pattern[str]"] = None
+        self.ready_poll = 0
+        # wait_ready() state
+        self.on_ready: Optional[Callable[[str], None]] = None
+        self.ready_source = 0
+
+
+class EngineSupervisor:
+    """
+    Owns the linux-wallpaperengine processes started by the GUI.
+
+    Every engine runs in its own process group and is reaped by a GLib child
+    watch, so starting and stopping never block the main loop and stray
+    engines started outside the GUI are left alone. Engines are grouped by a
+    key (the performance category, "backend" or "backend:<screen>"); the
+    current engine of a key that exits without being asked to is restarted
+    with exponential backoff.
+
+    Engine output is read from a non-blocking pipe as it is written: each line
+    goes to a RotatingLog on disk, to a short in-memory tail for crash
+    reports, and, rate limited, to the LogManager under the "Engine" source.
+
+    An engine is ready once it prints a line matching ready_pattern or,
+    without a pattern, once it holds a GPU device open, which it does when its
+    surface and GL context are up. wait_ready() and on_first_frame report it.
+    """
+
+    def __init__(self, log_manager):
+        self.log_manager = log_manager
+        self._engines: Dict[int, _Engine] = {}
+        # key -> pid of the engine that should be running for it
+        self._current: Dict[str, int] = {}
+        self._attempts: Dict[str, int] = {}
+        self._restart_sources: Dict[str, int] = {}
+        # Per-session counters shown on the Performance page
+        self.crashes: Dict[str, int] = {}
+        self.restarts: Dict[str, int] = {}
+        # freeze(): every engine, including ones started meanwhile, is SIGSTOPped
+        self.frozen = False
+        # (key, new process) after an automatic restart
+        self.on_restarted: Callable[[str, subprocess.Popen], None] = lambda key, proc: None
+        # (key, exit code, uptime, output tail, seconds until restart or None)
+        self.on_crashed: Callable[[str, int, float, str, Optional[float]], None] = \
+            lambda key, code, uptime, output, restart_in: None
+        # Output line that marks an engine as rendering (switchReadyPattern). Without
+        # one, an engine is ready once it holds a GPU device open. on_first_frame gets
+        # (key, pid, seconds since spawn) once per engine when it becomes ready.
+        self.ready_pattern: Optional["re.Pattern[str]"] = None
+        self.on_first_frame: Callable[[str, int, float], None] = lambda key, pid, seconds: None
+
+    def start(self, key: str, cmd: List[str], log_path: str) -> subprocess.Popen:
+        """
+        Launch cmd as the current engine of key.
+
+        An engine already running for key is not touched, so callers can keep
+        it on screen until the new one is ready and then stop_pid() it.
+        """
+        self._cancel_restart(key)
+        self._attempts.pop(key, None)
+        return self._spawn(key, cmd, log_path)
+
+    def _spawn(self, key: str, cmd: List[str], log_path: str) -> subprocess.Popen:
+        log = RotatingLog(log_path)
+        try:
+            proc = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                                    stderr=subprocess.STDOUT, start_new_session=True)
+        except Exception:
+            log.close()
+            raise
+        engine = _Engine(key, proc, cmd, log_path, log)
+        engine.ready_pattern = self.ready_pattern
+        self._engines[proc.pid] = engine
+        self._current[key] = proc.pid
+        fd = proc.stdout.fileno()
+        os.set_blocking(fd, False)
+        engine.io_source = GLib.unix_fd_add_full(
+            GLib.PRIORITY_DEFAULT, fd,
+            GLib.IOCondition.IN | GLib.IOCondition.HUP | GLib.IOCondition.ERR,
+            self._on_output, proc.pid)
+        GLib.child_watch_add(GLib.PRIORITY_DEFAULT, proc.pid, self._on_exit, key)
+        if engine.ready_pattern is None:
+            engine.ready_poll = GLib.timeout_add(int(READY_POLL_INTERVAL * 1000), self._poll_ready, proc.pid)
+        if self.frozen:
+            self._suspend(engine)
+        return proc
+
+    def is_alive(self, pid: int) -> bool:
+        engine = self._engines.get(pid)
+        return engine is not None and not engine.stopping
+
+    def adopt(self, key: str, pid: int):
+        """Make a still running engine the current one of key again"""
+        engine = self._engines.get(pid)
+        if engine and not engine.stopping:
+            engine.key = key
+            self._current[key] = pid
+
+    def current_pid(self, key: str) -> Optional[int]:
+        return self._current.get(key)
+
+    def stop(self, key: str):
+        """Stop the current engine of key and any pending restart"""
+        self._cancel_restart(key)
+        self._attempts.pop(key, None)
+        pid = self._current.pop(key, None)
+        if pid:
+            self.stop_pid(pid)
+
+    def stop_pid(self, pid: int):
+        """SIGTERM the engine's process group, SIGKILL it after TERM_TIMEOUT"""
+        engine = self._engines.get(pid)
+        if not engine or engine.stopping:
+            return
+        engine.stopping = True
+        if self._current.get(engine.key) == pid:
+            del self._current[engine.key]
+        self._finish_ready(engine, None)
+        self._stop_ready_poll(engine)
+        self._signal(engine, signal.SIGTERM)
+        if engine.suspended:
+            # A stopped process only acts on SIGTERM once it runs again
+            engine.suspended = False
+            self._signal(engine, signal.SIGCONT)
+        engine.kill_source = GLib.timeout_add(int(TERM_TIMEOUT * 1000), self._escalate, pid)
+
+    def stop_all(self, keep: Iterable[int] = ()):
+        keep = set(keep)
+        for key in list(self._restart_sources):
+            self._cancel_restart(key)
+        self._attempts.clear()
+        for pid in list(self._engines):
+            if pid not in keep:
+                self.stop_pid(pid)
+
+    def shutdown(self, timeout: float = TERM_TIMEOUT):
+        """Stop every engine and wait for it; used when the main loop is ending"""
+        self.stop_all()
+        pending = set(self._engines)
+        deadline = time.monotonic() + timeout
+        while pending and time.monotonic() < deadline:
+            for pid in list(pending):
+                try:
+                    done, _ = os.waitpid(pid, os.WNOHANG)
+                except ChildProcessError:
+                    done = pid
+                if done:
+                    pending.discard(pid)
+            if pending:
+                time.sleep(0.05)
+        for pid in pending:
+            self._signal(self._engines[pid], signal.SIGKILL)
+
+    def freeze(self) -> int:
+        """SIGSTOP every running engine until thaw(); returns how many were stopped"""
+        self.frozen = True
+        engines = [e for e in self._engines.values() if not e.stopping and not e.suspended]
+        for engine in engines:
+            self._suspend(engine)
+        return len(engines)
+
+    def thaw(self) -> int:
+        """SIGCONT the engines stopped by freeze(); returns how many were resumed"""
+        self.frozen = False
+        engines = [e for e in self._engines.values() if e.suspended]
+        for engine in engines:
+            engine.suspended = False
+            self._signal(engine, signal.SIGCONT)
+        return len(engines)
+
+    def _suspend(self, engine: _Engine):
+        engine.suspended = True
+        self._signal(engine, signal.SIGSTOP)
+
+    def wait_ready(self, pid: int, timeout: float, callback: Callable[[str], None]):
+        """
+        Wait for the engine to become ready (see ready_pattern).
+
+        callback gets "ready" when it is, "timeout" if it is not within
+        timeout seconds, or "exited" if the engine dies first. An engine that
+        exits while being watched is not restarted; the caller recovers.
+        """
+        engine = self._engines.get(pid)
+        if not engine:
+            callback("exited")
+            return
+        if engine.ready:
+            callback("ready")
+            return
+        engine.on_ready = callback
+        engine.ready_source = GLib.timeout_add(int(timeout * 1000), self._ready_timeout, pid)
+
+    def get_counts(self, key: str) -> Dict[str, int]:
+        return {"crashes": self.crashes.get(key, 0), "restarts": self.restarts.get(key, 0)}
+
+    def total_crashes(self) -> int:
+        return sum(self.crashes.values())
+
+    def _ready_timeout(self, pid: int) -> bool:
+        engine = self._engines.get(pid)
+        if engine:
+            engine.ready_source = 0
+            self._finish_ready(engine, "timeout")
+        return False
+
+    def _finish_ready(self, engine: _Engine, result: Optional[str]):
+        if engine.ready_source:
+            GLib.source_remove(engine.ready_source)
+            engine.ready_source = 0
+        callback, engine.on_ready = engine.on_ready, None
+        if callback and result:
+            callback(result)
+
+    def _poll_ready(self, pid: int) -> bool:
+        engine = self._engines.get(pid)
+        if not engine:
+            return False
+        if uses_gpu(pid):
+            engine.ready_poll = 0
+            self._mark_ready(engine)
+            return False
+        if engine.stopping or time.monotonic() - engine.started > READY_POLL_WINDOW:
+            # Left to the caller's timeout
+            engine.ready_poll = 0
+            return False
+        return True
+
+    def _stop_ready_poll(self, engine: _Engine):
+        if engine.ready_poll:
+            GLib.source_remove(engine.ready_poll)
+            engine.ready_poll = 0
+
+    def _mark_ready(self, engine: _Engine):
+        if engine.ready:
+            return
+        engine.ready = True
+        self._stop_ready_poll(engine)
+        self._finish_ready(engine, "ready")
+        self.on_first_frame(engine.key, engine.proc.pid, time.monotonic() - engine.started)
+
+    # Output streaming
+
+    def _on_output(self, _fd: int, _condition, pid: int) -> bool:
+        engine = self._engines.get(pid)
+        if not engine:
+            return False
+        if self._drain(engine):
+            return True
+        # Returning False removes the watch
+        engine.io_source = 0
+        self._close_output(engine)
+        return False
+
+    def _drain(self, engine: _Engine) -> bool:
+        """Read everything the pipe holds; False once it reached EOF"""
+        open_ = True
+        while True:
+            try:
+                chunk = os.read(engine.proc.stdout.fileno(), 65536)
+            except BlockingIOError:
+                break
+            except (OSError, ValueError):
+                chunk = b""
+            if not chunk:
+                open_ = False
+                break
+            self._feed(engine, engine.decoder.decode(chunk))
+        engine.log.flush()
+        return open_
+
+    def _feed(self, engine: _Engine, text: str):
+        lines = (engine.partial + text).split("\n")
+        engine.partial = lines.pop()
+        if len(engine.partial) > MAX_LINE:
+            lines.append(engine.partial)
+            engine.partial = ""
+        for line in lines:
+            self._emit(engine, line.rstrip("\r"))
+
+    def _emit(self, engine: _Engine, line: str):
+        engine.log.write(line)
+        if not line.strip():
+            return
+        engine.tail.append(line)
+        if not engine.ready and engine.ready_pattern and engine.ready_pattern.search(line):
+            self._mark_ready(engine)
+        if not self._take_token(engine):
+            engine.suppressed += 1
+            return
+        self._report_suppressed(engine)
+        prefix = "" if engine.key == "backend" else f"{engine.key.partition(':')[2]}: "
+        self.log_manager.add(_line_level(line), prefix + line, "Engine")
+
+    def _take_token(self, engine: _Engine) -> bool:
+        now = time.monotonic()
+        engine.tokens = min(LOG_BURST, engine.tokens + (now - engine.refilled) * LOG_RATE)
+        engine.refilled = now
+        if engine.tokens < 1:
+            return False
+        engine.tokens -= 1
+        return True
+
+    def _report_suppressed(self, engine: _Engine):
+        if engine.suppressed:
+            self.log_manager.add_warning(
+                f"{engine.suppressed} lines from {engine.key} not shown (rate limited), "
+                f"see {engine.log_path}", "Engine")
+            engine.suppressed = 0
+
+    def _close_output(self, engine: _Engine):
+        """Flush what is left of the output and release the pipe and log file"""
+        if engine.io_source:
+            GLib.source_remove(engine.io_source)
+            engine.io_source = 0
+        rest = engine.decoder.decode(b"", final=True)
+        if rest or engine.partial:
+            self._feed(engine, rest + "\n")
+        self._report_suppressed(engine)
+        try:
+            engine.proc.stdout.close()
+        except OSError:
+            pass
+        engine.log.close()
+
+    def _escalate(self, pid: int) -> bool:
+        engine = self._engines.get(pid)
+        if engine:
+            engine.kill_source = 0
+            self.log_manager.add_warning(
+                f"Engine {pid} ignored SIGTERM for {TERM_TIMEOUT:.0f}s, sending SIGKILL", "Supervisor")
+            self._signal(engine, signal.SIGKILL)
+        return False
+
+    def _signal(self, engine: _Engine, sig: int):
+        try:
+            # start_new_session makes the engine its own group leader
+            os.killpg(engine.proc.pid, sig)
+        except ProcessLookupError:
+            pass
+        except PermissionError:
+            try:
+                engine.proc.send_signal(sig)
+            except OSError:
+                pass
+
+    def _cancel_restart(self, key: str):
+        source = self._restart_sources.pop(key, None)
+        if source:
+            GLib.source_remove(source)
+
+    def _on_exit(self, pid: int, status: int, _key: str):
+        engine = self._engines.pop(pid, None)
+        if not engine:
+            return
+        # adopt() may have moved the engine to another key since it was spawned
+        key = engine.key
+        code = os.waitstatus_to_exitcode(status)
+        # GLib reaped the child; keep the Popen object consistent
+        engine.proc.returncode = code
+        if engine.kill_source:
+            GLib.source_remove(engine.kill_source)
+            engine.kill_source = 0
+        self._stop_ready_poll(engine)
+        # The last lines may still sit in the pipe; read them before reporting
+        if not engine.proc.stdout.closed:
+            self._drain(engine)
+            self._close_output(engine)
+
+        current = self._current.get(key) == pid
+        if current:
+            del self._current[key]
+        if engine.stopping:
+            return
+
+        uptime = time.monotonic() - engine.started
+        output = "\n".join(engine.tail)
+        self.crashes[key] = self.crashes.get(key, 0) + 1
+
+        if engine.on_ready or not current:
+            # A handover in progress, or an engine already replaced
+            self._finish_ready(engine, "exited")
+            self.on_crashed(key, code, uptime, output, None)
+            return
+
+        attempt = 0 if uptime >= STABLE_SECONDS else self._attempts.get(key, 0)
+        if attempt >= MAX_RESTARTS:
+            self._attempts.pop(key, None)
+            self.log_manager.add_error(
+                f"{key} crashed {MAX_RESTARTS} times in a row, not restarting", "Supervisor")
+            self.on_crashed(key, code, uptime, output, None)
+            return
+
+        delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt)
+        self._attempts[key] = attempt + 1
+        self._restart_sources[key] = GLib.timeout_add(
+            int(delay * 1000), self._restart, key, engine.cmd, engine.log_path)
+        self.on_crashed(key, code, uptime, output, delay)
+
+    def _restart(self, key: str, cmd: List[str], log_path: str) -> bool:
+        self._restart_sources.pop(key, None)
+        try:
+            proc = self._spawn(key, cmd, log_path)
+        except Exception as e:
+            self.log_manager.add_error(f"Failed to restart {key}: {e}", "Supervisor")
+            return False
+        self.restarts[key] = self.restarts.get(key, 0) + 1
+        self.log_manager.add_info(f"Restarted {key} (pid {proc.pid})", "Supervisor")
+        self.on_restarted(key, proc)
+        return False
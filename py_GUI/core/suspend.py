@@ -0,0 +1,122 @@
+import os
+from typing import Optional
+
+from gi.repository import Gio, GLib
+
+LOGIND_NAME = "org.freedesktop.login1"
+LOGIND_PATH = "/org/freedesktop/login1"
+LOGIND_MANAGER = "org.freedesktop.login1.Manager"
+LOGIND_SESSION = "org.freedesktop.login1.Session"
+
+
+class SuspendManager:
+    """
+    Freezes the supervised engines while the session is idle or locked.
+
+    Idle and lock state come from the logind session the GUI runs in:
+    IdleHint and LockedHint, plus the Lock/Unlock signals. While either is
+    set (and suspendWhenIdle is on) every engine process group gets SIGSTOP;
+    SIGCONT resumes them. The PerformanceMonitor is told about each
+    suspension so it can estimate the CPU time saved.
+    """
+
+    def __init__(self, config, supervisor, perf_monitor, log_manager):
+        self.config = config
+        self.supervisor = supervisor
+        self.perf_monitor = perf_monitor
+        self.log_manager = log_manager
+        self.idle = False
+        self.locked = False
+        self._proxy: Optional[Gio.DBusProxy] = None
+        self._cancellable = Gio.Cancellable()
+        self.config.connect("suspendWhenIdle", lambda key, old, new: self._update())
+
+    @property
+    def suspended(self) -> bool:
+        return self.supervisor.frozen
+
+    def start(self):
+        """Look up our logind session; everything after this is asynchronous"""
+        Gio.bus_get(Gio.BusType.SYSTEM, self._cancellable, self._on_bus)
+
+    def stop(self):
+        self._cancellable.cancel()
+        self._proxy = None
+        self.idle = self.locked = False
+        self._update()
+
+    def _on_bus(self, _source, result):
+        try:
+            bus = Gio.bus_get_finish(result)
+        except GLib.Error as e:
+            self._unavailable(e)
+            return
+        # "auto" is the caller's session, or its user's display session
+        session_id = os.environ.get("XDG_SESSION_ID") or "auto"
+        bus.call(LOGIND_NAME, LOGIND_PATH, LOGIND_MANAGER, "GetSession",
+                 GLib.Variant("(s)", (session_id,)), GLib.VariantType.new("(o)"),
+                 Gio.DBusCallFlags.NONE, -1, self._cancellable, self._on_session, bus)
+
+    def _on_session(self, bus, result, _data=None):
+        try:
+            (path,) = bus.call_finish(result).unpack()
+        except GLib.Error as e:
+            self._unavailable(e)
+            return
+        Gio.DBusProxy.new(bus, Gio.DBusProxyFlags.NONE, None, LOGIND_NAME, path,
+                          LOGIND_SESSION, self._cancellable, self._on_proxy)
+
+    def _on_proxy(self, _source, result):
+        try:
+            self._proxy = Gio.DBusProxy.new_finish(result)
+        except GLib.Error as e:
+            self._unavailable(e)
+            return
+        self._proxy.connect("g-properties-changed", self._on_properties_changed)
+        self._proxy.connect("g-signal", self._on_signal)
+        self.idle = self._hint("IdleHint")
+        self.locked = self._hint("LockedHint")
+        self.log_manager.add_debug(f"Watching logind session {self._proxy.get_object_path()}", "Suspend")
+        self._update()
+
+    def _unavailable(self, error: GLib.Error):
+        if not error.matches(Gio.io_error_quark(), Gio.IOErrorEnum.CANCELLED):
+            self.log_manager.add_warning(
+                f"logind session not available, engines keep running when idle: {error.message}", "Suspend")
+
+    def _hint(self, name: str) -> bool:
+        value = self._proxy.get_cached_property(name) if self._proxy else None
+        return bool(value.unpack()) if value is not None else False
+
+    def _on_properties_changed(self, _proxy, changed, _invalidated):
+        changed = changed.unpack()
+        if "IdleHint" in changed:
+            self.idle = bool(changed["IdleHint"])
+        if "LockedHint" in changed:
+            self.locked = bool(changed["LockedHint"])
+        self._update()
+
+    def _on_signal(self, _proxy, _sender, signal_name, _params):
+        # Lock/Unlock ask the screen locker to act; LockedHint follows once it has
+        if signal_name == "Lock":
+            self.locked = True
+        elif signal_name == "Unlock":
+            self.locked = False
+        else:
+            return
+        self._update()
+
+    def _update(self):
+        want = bool(self.config.get("suspendWhenIdle", False)) and (self.idle or self.locked)
+        if want == self.supervisor.frozen:
+            return
+        reason = "locked" if self.locked else "idle"
+        if want:
+            # Sample the engines' CPU rate before they stop using any
+            self.perf_monitor.set_suspended(True)
+            count = self.supervisor.freeze()
+            self.log_manager.add_info(f"Session {reason}, suspended {count} engine(s)", "Suspend")
+        else:
+            count = self.supervisor.thaw()
+            self.perf_monitor.set_suspended(False)
+            self.log_manager.add_info(f"Session active, resumed {count} engine(s)", "Suspend")
@@ -185,6 +185,8 @@ class WallpaperManager:
                         data = json.load(f)
                         preview_file = data.get("preview", "preview.jpg")
                         folder_path = os.path.join(self.workshop_path, folder)
+                        general = data.get("general")
+                        project_properties = general.get("properties") if isinstance(general, dict) else None
                         self._wallpapers[folder] = {
                             "id": folder,
                             "title": data.get("title", "Unknown"),
@@ -196,6 +198,8 @@ class WallpaperManager:
                             "contentrating": data.get("contentrating", ""),
                             "version": data.get("version", ""),
                             "size": get_folder_size(folder_path),
+                            # Raw general.properties, parsed by PropertiesManager
+                            "project_properties": project_properties if isinstance(project_properties, dict) else {},
                         }
                 except json.JSONDecodeError as e:
                     self.scan_errors.append(f"Invalid JSON in {folder}: {e}")
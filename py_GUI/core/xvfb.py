@@ -0,0 +1,287 @@
+import os
+import shutil
+import signal
+import subprocess
+import time
+from typing import Callable, Dict, List, Optional
+
+from gi.repository import GLib
+
+# Seconds Xvfb gets to report its display number
+XVFB_START_TIMEOUT = 10.0
+# Seconds a stopped server gets to exit before SIGKILL
+XVFB_STOP_GRACE = 5
+# Seconds a shared server may stay unused before it is stopped
+XVFB_IDLE_TIMEOUT = 120
+# Seconds between idle checks of the shared servers
+XVFB_CHECK_INTERVAL = 15
+
+
+def have_xvfb() -> bool:
+    return shutil.which("Xvfb") is not None
+
+
+class XvfbServer:
+    """
+    One Xvfb X server with a single screen of the given resolution.
+
+    Xvfb picks a free display number itself and reports it through
+    -displayfd once it accepts connections, so there is no guessing of
+    numbers or polling for the socket. Nothing here blocks: the pipe is
+    watched from the main loop and the process is reaped by a child watch.
+    """
+
+    def __init__(self, resolution: str):
+        self.resolution = resolution
+        self.proc: Optional[subprocess.Popen] = None
+        self.display: Optional[str] = None
+        self._on_ready: Optional[Callable[[Optional[str], Optional[str]], None]] = None
+        self._read_fd: Optional[int] = None
+        self._buffer = b""
+        self._fd_source = 0
+        self._timeout_source = 0
+        self._kill_source = 0
+
+    def start(self, on_ready: Callable[[Optional[str], Optional[str]], None]):
+        """
+        Start the server. on_ready(display, None) runs on the main loop once it
+        accepts connections, or on_ready(None, error) if it does not come up.
+        """
+        self._on_ready = on_ready
+        read_fd, write_fd = os.pipe()
+        try:
+            self.proc = subprocess.Popen(
+                ["Xvfb", "-displayfd", str(write_fd), "-screen", "0", f"{self.resolution}x24",
+                 "+extension", "GLX", "-nolisten", "tcp", "-noreset"],
+                stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                pass_fds=(write_fd,), start_new_session=True)
+        except OSError as e:
+            os.close(read_fd)
+            os.close(write_fd)
+            error = f"cannot start Xvfb: {e}"
+            GLib.idle_add(lambda: self._started(error))
+            return
+        os.close(write_fd)
+        self._read_fd = read_fd
+        self._fd_source = GLib.unix_fd_add_full(
+            GLib.PRIORITY_DEFAULT, read_fd, GLib.IOCondition.IN | GLib.IOCondition.HUP,
+            self._on_displayfd)
+        self._timeout_source = GLib.timeout_add(int(XVFB_START_TIMEOUT * 1000), self._on_start_timeout)
+        GLib.child_watch_add(GLib.PRIORITY_DEFAULT, self.proc.pid, self._on_exit)
+
+    def _on_displayfd(self, fd: int, _condition) -> bool:
+        try:
+            chunk = os.read(fd, 32)
+        except OSError:
+            chunk = b""
+        self._buffer += chunk
+        if chunk and not self._buffer.endswith(b"\n"):
+            return True
+        self._fd_source = 0
+        number = self._buffer.strip().decode(errors="replace")
+        if number.isdigit():
+            self.display = f":{number}"
+            self._started(None)
+        else:
+            # End of file: Xvfb exited before it was ready
+            self._started("Xvfb exited before reporting a display")
+        return False
+
+    def _on_start_timeout(self) -> bool:
+        self._timeout_source = 0
+        self._started(f"Xvfb did not report a display within {XVFB_START_TIMEOUT:.0f}s")
+        return False
+
+    def _started(self, error: Optional[str]) -> bool:
+        on_ready = self._on_ready
+        self._end_start()
+        if error:
+            self.stop()
+        if on_ready:
+            on_ready(self.display, error)
+        return False
+
+    def _end_start(self):
+        self._on_ready = None
+        for source in (self._fd_source, self._timeout_source):
+            if source:
+                GLib.source_remove(source)
+        self._fd_source = self._timeout_source = 0
+        if self._read_fd is not None:
+            os.close(self._read_fd)
+            self._read_fd = None
+
+    def _on_exit(self, _pid: int, status: int):
+        # GLib reaped the child; keep the Popen object consistent
+        self.proc.returncode = os.waitstatus_to_exitcode(status)
+        if self._kill_source:
+            GLib.source_remove(self._kill_source)
+            self._kill_source = 0
+        if self._on_ready:
+            self._started("Xvfb exited before reporting a display")
+
+    def alive(self) -> bool:
+        return self.proc is not None and self.proc.returncode is None
+
+    def healthy(self) -> bool:
+        """Running and still listening on its display socket"""
+        if not self.alive() or not self.display:
+            return False
+        return os.path.exists(f"/tmp/.X11-unix/X{self.display.lstrip(':')}")
+
+    def stop(self):
+        """SIGTERM without waiting; SIGKILL if the server is still running after XVFB_STOP_GRACE"""
+        self._end_start()
+        self.display = None
+        if not self.alive() or self._kill_source:
+            return
+        try:
+            os.killpg(self.proc.pid, signal.SIGTERM)
+        except OSError:
+            return
+        self._kill_source = GLib.timeout_add_seconds(XVFB_STOP_GRACE, self._kill)
+
+    def _kill(self) -> bool:
+        self._kill_source = 0
+        if self.alive():
+            try:
+                os.killpg(self.proc.pid, signal.SIGKILL)
+            except OSError:
+                pass
+        return False
+
+
+class _Slot:
+    def __init__(self, server: XvfbServer):
+        self.server = server
+        # True while reserved by acquire(), then the engine attached to it
+        self.user = None
+        self.last_used = time.monotonic()
+
+    def busy(self) -> bool:
+        if self.user is True:
+            return True
+        if self.user is not None and self.user.poll() is None:
+            return True
+        if self.user is not None:
+            self.user = None
+            self.last_used = time.monotonic()
+        return False
+
+
+class XvfbPool:
+    """
+    Long-lived Xvfb servers for headless captures, kept per resolution.
+
+    xvfb-run starts and tears down an X server for every capture, which
+    costs seconds; these servers start on first use and are reused. A
+    server hosts one engine at a time, since windows overlapping on one
+    screen would hide each other's pixels, so a capture finding every server
+    of its resolution busy starts another. Servers that died or lost their
+    socket are replaced on the next acquire(); unused ones are stopped after
+    idle_timeout seconds.
+    """
+
+    def __init__(self, log_manager=None, idle_timeout: float = XVFB_IDLE_TIMEOUT):
+        self.log_manager = log_manager
+        self.idle_timeout = idle_timeout
+        self._slots: Dict[str, List[_Slot]] = {}
+        self._check_source = 0
+
+    def _log(self, message: str):
+        if self.log_manager:
+            self.log_manager.add_info(message, "Xvfb")
+
+    def acquire(self, resolution: str, on_ready: Callable[[Optional[str], Optional[str]], None]):
+        """
+        Reserve an idle server of that resolution, starting one if needed.
+
+        on_ready(display, None) runs on the main loop once the server accepts
+        connections; the display stays reserved until the engine given to
+        attach() exits or release() is called. on_ready(None, error) means no
+        server could be started and nothing is reserved.
+        """
+        slots = self._slots.setdefault(resolution, [])
+        for slot in list(slots):
+            if slot.busy():
+                continue
+            if slot.server.healthy():
+                slot.user = True
+                GLib.idle_add(self._reused, resolution, slot, on_ready)
+                return
+            self._log(f"Xvfb {slot.server.display or ''} at {resolution} stopped responding, replacing it")
+            slot.server.stop()
+            slots.remove(slot)
+
+        slot = _Slot(XvfbServer(resolution))
+        slot.user = True
+        slots.append(slot)
+        slot.server.start(lambda display, error: self._started(resolution, slot, on_ready, display, error))
+        if not self._check_source:
+            self._check_source = GLib.timeout_add_seconds(XVFB_CHECK_INTERVAL, self._check)
+
+    def _reused(self, resolution: str, slot: _Slot, on_ready) -> bool:
+        if slot not in self._slots.get(resolution, []):
+            on_ready(None, "Xvfb pool was shut down")
+        elif not slot.server.healthy():
+            # Died since it was reserved; acquire() replaces it
+            slot.user = None
+            self.acquire(resolution, on_ready)
+        else:
+            on_ready(slot.server.display, None)
+        return False
+
+    def _started(self, resolution: str, slot: _Slot, on_ready, display: Optional[str], error: Optional[str]):
+        if error:
+            slots = self._slots.get(resolution, [])
+            if slot in slots:
+                slots.remove(slot)
+            on_ready(None, error)
+            return
+        self._log(f"Started Xvfb {display} at {resolution}")
+        on_ready(display, None)
+
+    def _slot(self, display: str) -> Optional[_Slot]:
+        for slots in self._slots.values():
+            for slot in slots:
+                if slot.server.display == display:
+                    return slot
+        return None
+
+    def attach(self, display: str, proc: subprocess.Popen):
+        """Keep display reserved until proc exits"""
+        slot = self._slot(display)
+        if slot:
+            slot.user = proc
+
+    def release(self, display: str):
+        slot = self._slot(display)
+        if slot:
+            slot.user = None
+            slot.last_used = time.monotonic()
+
+    def _check(self) -> bool:
+        now = time.monotonic()
+        for resolution, slots in self._slots.items():
+            for slot in list(slots):
+                if slot.busy():
+                    continue
+                if not slot.server.alive() or now - slot.last_used >= self.idle_timeout:
+                    self._log(f"Stopping idle Xvfb {slot.server.display} at {resolution}")
+                    slot.server.stop()
+                    slots.remove(slot)
+        self._slots = {res: slots for res, slots in self._slots.items() if slots}
+        if not self._slots:
+            self._check_source = 0
+            return False
+        return True
+
+    def shutdown(self):
+        """Stop every server, busy or not"""
+        if self._check_source:
+            GLib.source_remove(self._check_source)
+            self._check_source = 0
+        for slots in self._slots.values():
+            for slot in slots:
+                slot.server.stop()
+        self._slots.clear()
@@ -1,5 +1,21 @@
 #!/usr/bin/env python3
-from py_GUI.ui.app import main
+import sys
+
+
+def main():
+    # Headless modes run without importing GTK or touching the single instance
+    if "--build-properties-cache" in sys.argv[1:]:
+        from py_GUI.cli import build_properties_cache
+        sys.exit(build_properties_cache(sys.argv[1:]))
+    if "--screenshot-library" in sys.argv[1:]:
+        from py_GUI.cli import screenshot_library
+        sys.exit(screenshot_library(sys.argv[1:]))
+    if "--benchmark-library" in sys.argv[1:]:
+        from py_GUI.cli import benchmark_library
+        sys.exit(benchmark_library(sys.argv[1:]))
+
+    from py_GUI.ui.app import main as app_main
+    app_main()
 
 if __name__ == '__main__':
     main()
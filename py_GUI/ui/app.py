@@ -17,6 +17,7 @@ from py_GUI.core.controller import WallpaperController
 from py_GUI.core.logger import LogManager
 from py_GUI.core.nickname import NicknameManager
 from py_GUI.core.history import HistoryManager
+from py_GUI.core.storage import WallpaperStore
 from py_GUI.utils import markdown_to_pango
 
 from py_GUI.ui.components.navbar import NavBar
@@ -162,15 +163,20 @@ class WallpaperApp(Adw.Application):
         )
         self.config = ConfigManager()
         self.log_manager = LogManager()
+        self.store = WallpaperStore()
+        if self.store.migrate_from_config(self.config):
+            self.log_manager.add_info("Migrated per-wallpaper data from config.json to library.db", "App")
         self.history_manager = HistoryManager(self.config)
         
         workshop_path = self.config.get("workshopPath", WORKSHOP_PATH)
         self.wp_manager = WallpaperManager(workshop_path)
-        self.prop_manager = PropertiesManager(self.config)
+        self.prop_manager = PropertiesManager(self.config, self.store)
         self.screen_manager = ScreenManager()
-        self.nickname_manager = NicknameManager(self.config)
-        self.controller = WallpaperController(self.config, self.prop_manager, self.log_manager, self.screen_manager)
+        self.nickname_manager = NicknameManager(self.store)
+        self.controller = WallpaperController(self.config, self.prop_manager, self.log_manager,
+                                              self.screen_manager, store=self.store)
         self.controller.wp_manager = self.wp_manager
+        self.prop_manager.wp_manager = self.wp_manager
         self.controller.nickname_manager = self.nickname_manager
         self.controller.history_manager = self.history_manager
 
@@ -286,6 +292,11 @@ class WallpaperApp(Adw.Application):
         )
         main_box.append(self.navbar)
         main_box.append(self.stack)
+        self.config.connect(
+            "lastScreen",
+            # May fire on a worker thread; the navbar is updated on the main loop
+            lambda key, old, new: GLib.idle_add(self.navbar.set_selected_screen, new)
+        )
         
         # Pages
         self.wallpapers_page = WallpapersPage(
@@ -308,6 +319,9 @@ class WallpaperApp(Adw.Application):
         self.stack.add_named(self.settings_page, "settings")
 
         self.controller.set_toast_callback(self.show_toast)
+        self.controller.set_engines_changed_callback(self.wallpapers_page.update_active_wallpaper_label)
+        # A power profile may change or pause the cycling interval
+        self.controller.power.connect(lambda old, new: self.setup_cycle_timer())
 
         self.compact_win = CompactWindow(
             app=self,
@@ -333,6 +347,7 @@ class WallpaperApp(Adw.Application):
         # Restore last session wallpapers
         active_monitors = self.config.get("active_monitors") or {}
         screens = self.screen_manager.get_screens()
+        self.prop_manager.prefetch(active_monitors.values())
 
         # Ensure lastScreen always points to a connected screen (fallback to first/primary)
         last_screen = self.config.get("lastScreen")
@@ -443,17 +458,13 @@ class WallpaperApp(Adw.Application):
             pass
 
     def on_navbar_screen_changed(self, screen: str):
+        # WallpapersPage follows lastScreen through its config subscription
         self.config.set("lastScreen", screen)
-        if hasattr(self, 'wallpapers_page'):
-            self.wallpapers_page.selected_screen = screen
-            self.wallpapers_page.update_active_wallpaper_label()
 
     def on_navbar_link_toggled(self, is_linked: bool):
         mode = "same" if is_linked else "diff"
         self.config.set("apply_mode", mode)
-        if hasattr(self, 'wallpapers_page'):
-            self.wallpapers_page.apply_mode = mode
-            self.log_manager.add_info(f"Apply mode changed to: {mode}", "App")
+        self.log_manager.add_info(f"Apply mode changed to: {mode}", "App")
 
     def on_compact_mode_toggled(self, is_compact: bool):
         self.config.set("compact_mode", is_compact)
@@ -500,7 +511,6 @@ class WallpaperApp(Adw.Application):
         # Tray stop means STOP ALL
         self.controller.stop()
         self.config.set("active_monitors", {})
-        self.wallpapers_page.update_active_wallpaper_label()
     
     def random_wallpaper(self):
         # Triggered by cycle timer or CLI or Menu
@@ -554,16 +564,17 @@ class WallpaperApp(Adw.Application):
                 new_monitors[scr] = wp_id
         
         if new_monitors:
-            self.config.set("active_monitors", new_monitors)
-            # Update lastScreen/lastWallpaper for proper restore & tray apply-last
-            primary_screen = self.config.get("lastScreen")
-            if primary_screen not in new_monitors:
-                primary_screen = next(iter(new_monitors.keys()))
-                self.config.set("lastScreen", primary_screen)
+            with self.config.batch():
+                self.config.set("active_monitors", new_monitors)
+                # Update lastScreen/lastWallpaper for proper restore & tray apply-last
+                primary_screen = self.config.get("lastScreen")
+                if primary_screen not in new_monitors:
+                    primary_screen = next(iter(new_monitors.keys()))
+                    self.config.set("lastScreen", primary_screen)
 
-            self.config.set("lastWallpaper", new_monitors.get(primary_screen))
+                self.config.set("lastWallpaper", new_monitors.get(primary_screen))
 
-            self.controller.restart_wallpapers()
+            self.controller.schedule_restart()
             self.wallpapers_page.update_active_wallpaper_label()
             
             self.log_manager.add_info(f"Cycled wallpaper ({cycle_order})", "App")
@@ -579,9 +590,15 @@ class WallpaperApp(Adw.Application):
             self.cycle_timer_id = None
             
         if self.config.get("cycleEnabled"):
-            interval_mins = self.config.get("cycleInterval") or 15
+            interval_mins = self.controller.power.get("cycleInterval")
+            if interval_mins == 0 and "cycleInterval" in self.controller.power.overrides():
+                # A power profile can pause cycling, e.g. on low battery;
+                # a global interval of 0 still means the 15 minute default
+                self.log_manager.add_info(
+                    f"Wallpaper cycling paused by the {self.controller.power.profile} power profile", "App")
+                return
             # Minimum 1 minute safety
-            interval_mins = max(1, interval_mins)
+            interval_mins = max(1, interval_mins or 15)
             self.cycle_timer_id = GLib.timeout_add_seconds(
                 interval_mins * 60, 
                 self.on_cycle_trigger
@@ -603,14 +620,18 @@ class WallpaperApp(Adw.Application):
             self.log_manager.add_info(f"Shortcut update check skipped: {str(e)}", "App")
 
     def quit_app(self):
-        self.controller.stop()
+        self.controller.shutdown()
+        self.history_manager.end_all()
         self.tray.stop()
+        self.config.flush()
         self.quit()
 
     def restart_app(self):
         self.log_manager.add_info("Restarting application...", "App")
-        self.controller.stop()
+        self.controller.shutdown()
+        self.history_manager.end_all()
         self.tray.stop()
+        self.config.flush()
         
         import os
         import sys
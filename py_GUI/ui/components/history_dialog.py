@@ -24,7 +24,7 @@ class HistoryDialog(Gtk.Window):
         clear_btn.connect("clicked", self.on_clear_clicked)
         header.pack_end(clear_btn)
 
-        self.lbl_count = Gtk.Label(label="0/30")
+        self.lbl_count = Gtk.Label(label="0/0")
         self.lbl_count.add_css_class("caption")
         self.lbl_count.add_css_class("dim-label")
         self.lbl_count.set_margin_end(10)
@@ -70,9 +70,9 @@ class HistoryDialog(Gtk.Window):
                 break
             self.list_box.remove(row)
             
-        history = self.history_manager.get_all()
+        history = self.history_manager.get_recent(self.history_manager.DISPLAY_LIMIT)
         
-        self.lbl_count.set_label(f"{len(history)}/30")
+        self.lbl_count.set_label(f"{len(history)}/{self.history_manager.count()}")
         
         if len(history) == 0:
             self.stack.set_visible_child_name("empty")
@@ -177,6 +177,18 @@ class NavBar(Gtk.Box):
     def get_selected_screen(self) -> str:
         return self.selected_screen
 
+    def set_selected_screen(self, screen: str):
+        """Reflect a screen change made elsewhere without re-emitting it"""
+        if screen == self.selected_screen or screen not in self.screens:
+            return
+        self.selected_screen = screen
+        cb = self.on_screen_changed_cb
+        self.on_screen_changed_cb = None
+        try:
+            self.screen_dd.set_selected(self.screens.index(screen))
+        finally:
+            self.on_screen_changed_cb = cb
+
     def on_home_toggled(self, btn):
         if btn.get_active():
             self.btn_settings.set_active(False)
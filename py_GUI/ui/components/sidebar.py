@@ -36,6 +36,8 @@ class Sidebar(Gtk.Box):
         self.set_halign(Gtk.Align.END)
         
         self._compact_mode = False
+        # Pending debounced engine restart after a property edit
+        self._prop_restart_id: Optional[int] = None
         
         self.build_ui()
 
@@ -246,6 +248,50 @@ class Sidebar(Gtk.Box):
         self.lbl_desc.set_margin_end(20)
         content.append(self.lbl_desc)
 
+        # Properties (loaded in the background)
+        self.props_header = Gtk.Label(label="Properties")
+        self.props_header.add_css_class("sidebar-section")
+        self.props_header.set_halign(Gtk.Align.START)
+        self.props_header.set_margin_start(20)
+        self.props_header.set_margin_end(20)
+        self.props_header.set_visible(False)
+        content.append(self.props_header)
+
+        self.props_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=6)
+        self.props_box.set_margin_start(20)
+        self.props_box.set_margin_end(20)
+        self.props_box.set_margin_bottom(10)
+        self.props_box.set_visible(False)
+        content.append(self.props_box)
+
+        # Launch profile: engine flags overridden for this wallpaper
+        engine_header = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=8)
+        engine_header.set_margin_start(20)
+        engine_header.set_margin_end(20)
+        lbl_engine = Gtk.Label(label="Engine")
+        lbl_engine.add_css_class("sidebar-section")
+        lbl_engine.set_halign(Gtk.Align.START)
+        lbl_engine.set_hexpand(True)
+        engine_header.append(lbl_engine)
+        self.btn_launch_reset = Gtk.Button(icon_name="edit-undo-symbolic")
+        self.btn_launch_reset.add_css_class("flat")
+        self.btn_launch_reset.add_css_class("circular")
+        self.btn_launch_reset.set_tooltip_text("Use the global settings")
+        self.btn_launch_reset.set_valign(Gtk.Align.CENTER)
+        self.btn_launch_reset.connect("clicked", self._on_launch_profile_reset)
+        engine_header.append(self.btn_launch_reset)
+        self.launch_header = engine_header
+        self.launch_header.set_visible(False)
+        content.append(self.launch_header)
+
+        self.launch_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=6)
+        self.launch_box.set_margin_start(20)
+        self.launch_box.set_margin_end(20)
+        self.launch_box.set_margin_bottom(10)
+        self.launch_box.set_visible(False)
+        content.append(self.launch_box)
+        self._build_launch_profile_rows()
+
         # Bottom Buttons
         btn_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=10)
         btn_box.set_margin_top(20)
@@ -426,6 +472,232 @@ class Sidebar(Gtk.Box):
                 chip.add_css_class("tag-chip")
                 self.tags_flow.append(chip)
 
+        self._load_properties(wp_id)
+        self._show_launch_profile(wp_id)
+
+    def _clear_properties(self):
+        while True:
+            child = self.props_box.get_first_child()
+            if child is None: break
+            self.props_box.remove(child)
+
+    def _load_properties(self, wp_id: str):
+        self._clear_properties()
+        self.props_header.set_visible(True)
+        self.props_box.set_visible(True)
+
+        if self.prop_manager.is_loaded(wp_id):
+            self._show_properties(wp_id, self.prop_manager.get_properties(wp_id))
+            return
+
+        loading = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=8)
+        spinner = Gtk.Spinner()
+        spinner.start()
+        loading.append(spinner)
+        lbl = Gtk.Label(label="Loading properties...")
+        lbl.add_css_class("text-muted")
+        loading.append(lbl)
+        self.props_box.append(loading)
+
+        self.prop_manager.load_async(
+            wp_id, lambda wid, props: GLib.idle_add(self._on_properties_loaded, wid, props)
+        )
+
+    def _on_properties_loaded(self, wp_id: str, properties: List[Dict]):
+        # Ignore results for a wallpaper that is no longer shown
+        if wp_id == self.selected_wp:
+            self._show_properties(wp_id, properties)
+        return False
+
+    def _show_properties(self, wp_id: str, properties: List[Dict]):
+        self._clear_properties()
+        editable = [p for p in properties if p.get('type') != 'text']
+        if not editable:
+            lbl = Gtk.Label(label="No adjustable properties.")
+            lbl.add_css_class("text-muted")
+            lbl.set_halign(Gtk.Align.START)
+            self.props_box.append(lbl)
+            return
+
+        user_props = self.prop_manager.get_user_properties(wp_id)
+        for prop in editable:
+            row = self._create_property_row(wp_id, prop, user_props.get(prop['name']))
+            if row:
+                self.props_box.append(row)
+
+    def _create_property_row(self, wp_id: str, prop: Dict, user_value) -> Optional[Gtk.Widget]:
+        name = prop['name']
+        prop_type = prop.get('type')
+        value = prop.get('value') if user_value is None else user_value
+
+        row = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=8)
+        lbl = Gtk.Label(label=prop.get('text') or name)
+        lbl.set_halign(Gtk.Align.START)
+        lbl.set_hexpand(True)
+        lbl.set_xalign(0)
+        lbl.set_ellipsize(Pango.EllipsizeMode.END)
+        lbl.set_tooltip_text(name)
+        row.append(lbl)
+
+        if prop_type == 'boolean':
+            editor = Gtk.Switch()
+            editor.set_valign(Gtk.Align.CENTER)
+            editor.set_active(bool(value))
+            editor.connect("notify::active", lambda w, _p: self._on_property_changed(w, wp_id, name, w.get_active()))
+        elif prop_type == 'slider':
+            editor = Gtk.SpinButton()
+            step = prop.get('step') or 1
+            editor.set_range(prop.get('min', 0), prop.get('max', 100))
+            editor.set_increments(step, step * 10)
+            editor.set_digits(0 if float(step).is_integer() else min(len(str(step).split('.')[-1]), 4))
+            try:
+                editor.set_value(float(value))
+            except (TypeError, ValueError):
+                pass
+            editor.connect("value-changed", lambda w: self._on_property_changed(w, wp_id, name, w.get_value()))
+        elif prop_type == 'combolist' and prop.get('options'):
+            options = prop['options']
+            editor = Gtk.DropDown.new_from_strings([o['label'] for o in options])
+            for i, opt in enumerate(options):
+                if str(opt['value']) == str(value):
+                    editor.set_selected(i)
+                    break
+            editor.connect("notify::selected", lambda w, _p: self._on_property_changed(
+                w, wp_id, name, options[w.get_selected()]['value']))
+        elif prop_type == 'color':
+            rgba = Gdk.RGBA()
+            try:
+                rgba.red, rgba.green, rgba.blue = (float(c) for c in value)
+                rgba.alpha = 1.0
+            except (TypeError, ValueError):
+                pass
+            editor = Gtk.ColorDialogButton.new(Gtk.ColorDialog())
+            editor.set_rgba(rgba)
+            editor.connect("notify::rgba", lambda w, _p: self._on_property_changed(
+                w, wp_id, name, (w.get_rgba().red, w.get_rgba().green, w.get_rgba().blue)))
+        elif prop_type == 'textinput':
+            editor = Gtk.Entry()
+            editor.set_text("" if value is None else str(value))
+            editor.connect("activate", lambda w: self._on_property_changed(w, wp_id, name, w.get_text()))
+        else:
+            return None
+
+        editor.set_valign(Gtk.Align.CENTER)
+        row.append(editor)
+
+        btn_reset = Gtk.Button(icon_name="edit-undo-symbolic")
+        btn_reset.add_css_class("flat")
+        btn_reset.add_css_class("circular")
+        btn_reset.set_tooltip_text("Reset to default")
+        btn_reset.set_valign(Gtk.Align.CENTER)
+        btn_reset.set_opacity(1.0 if user_value is not None else 0.0)
+        btn_reset.set_sensitive(user_value is not None)
+        btn_reset.connect("clicked", lambda b: self._on_property_reset(wp_id, name))
+        row.append(btn_reset)
+        row.btn_reset = btn_reset
+        editor.prop_row = row
+        return row
+
+    def _on_property_changed(self, editor: Gtk.Widget, wp_id: str, name: str, value):
+        self.prop_manager.set_user_property(wp_id, name, value)
+        btn_reset = editor.prop_row.btn_reset
+        btn_reset.set_opacity(1.0)
+        btn_reset.set_sensitive(True)
+        self._schedule_property_restart(wp_id)
+
+    def _on_property_reset(self, wp_id: str, name: str):
+        self.prop_manager.reset_user_property(wp_id, name)
+        if wp_id == self.selected_wp:
+            self._show_properties(wp_id, self.prop_manager.get_properties(wp_id))
+        self._schedule_property_restart(wp_id)
+
+    def _build_launch_profile_rows(self):
+        def add_row(label: str, editor: Gtk.Widget, tooltip: str):
+            row = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=8)
+            lbl = Gtk.Label(label=label)
+            lbl.set_halign(Gtk.Align.START)
+            lbl.set_hexpand(True)
+            lbl.set_xalign(0)
+            lbl.set_tooltip_text(tooltip)
+            row.append(lbl)
+            editor.set_valign(Gtk.Align.CENTER)
+            row.append(editor)
+            self.launch_box.append(row)
+
+        self._launch_loading = False
+        self.launch_fps_spin = Gtk.SpinButton.new_with_range(0, 240, 1)
+        self.launch_fps_spin.connect("value-changed", self._on_launch_fps_changed)
+        add_row("FPS Cap", self.launch_fps_spin, "0 uses the global FPS limit")
+
+        # (profile key, label, choices, value stored for each choice)
+        self._launch_choices = {
+            "disableParticles": ("Particles", ["Global", "On", "Off"], [None, False, True]),
+            "disableParallax": ("Parallax", ["Global", "On", "Off"], [None, False, True]),
+            "disableMouse": ("Mouse Input", ["Global", "On", "Off"], [None, False, True]),
+            "audio": ("Audio", ["Global", "On", "Muted"], [None, True, False]),
+        }
+        self.launch_dropdowns: Dict[str, Gtk.DropDown] = {}
+        for key, (label, choices, values) in self._launch_choices.items():
+            dd = Gtk.DropDown.new_from_strings(choices)
+            dd.connect("notify::selected", self._on_launch_choice_changed, key)
+            add_row(label, dd, "Global follows the settings for all wallpapers")
+            self.launch_dropdowns[key] = dd
+
+    def _show_launch_profile(self, wp_id: str):
+        profile = self.prop_manager.get_launch_profile(wp_id)
+        self._launch_loading = True
+        try:
+            self.launch_fps_spin.set_value(int(profile.get("fps") or 0))
+            for key, dd in self.launch_dropdowns.items():
+                values = self._launch_choices[key][2]
+                value = profile.get(key)
+                dd.set_selected(values.index(value) if value in values else 0)
+        finally:
+            self._launch_loading = False
+        self.btn_launch_reset.set_sensitive(bool(profile))
+        self.launch_header.set_visible(True)
+        self.launch_box.set_visible(True)
+
+    def _on_launch_fps_changed(self, spin: Gtk.SpinButton):
+        fps = int(spin.get_value())
+        self._set_launch_value("fps", fps or None)
+
+    def _on_launch_choice_changed(self, dd: Gtk.DropDown, _pspec, key: str):
+        values = self._launch_choices[key][2]
+        self._set_launch_value(key, values[dd.get_selected()])
+
+    def _set_launch_value(self, key: str, value):
+        wp_id = self.selected_wp
+        if self._launch_loading or not wp_id:
+            return
+        self.prop_manager.set_launch_profile_value(wp_id, key, value)
+        self.btn_launch_reset.set_sensitive(bool(self.prop_manager.get_launch_profile(wp_id)))
+        self._schedule_property_restart(wp_id)
+
+    def _on_launch_profile_reset(self, _btn):
+        wp_id = self.selected_wp
+        if not wp_id:
+            return
+        self.prop_manager.reset_launch_profile(wp_id)
+        self._show_launch_profile(wp_id)
+        self._schedule_property_restart(wp_id)
+
+    def _schedule_property_restart(self, wp_id: str):
+        """Restart the engine once edits settle, if the wallpaper is running"""
+        active = self.controller.config.get("active_monitors", {}) or {}
+        if wp_id not in active.values():
+            return
+        if self._prop_restart_id:
+            GLib.source_remove(self._prop_restart_id)
+
+        def do_restart():
+            self._prop_restart_id = None
+            active = self.controller.config.get("active_monitors", {}) or {}
+            self.controller.schedule_restart([s for s, wid in active.items() if wid == wp_id])
+            return False
+
+        self._prop_restart_id = GLib.timeout_add(600, do_restart)
+
     def clear(self):
         self.selected_wp = None
         self.preview_image.set_image_from_path(None, None)
@@ -438,6 +710,11 @@ class Sidebar(Gtk.Box):
         self.lbl_index.set_label("")
         self.lbl_type.set_label("-")
         self.lbl_desc.set_label("No description.")
+        self._clear_properties()
+        self.props_header.set_visible(False)
+        self.props_box.set_visible(False)
+        self.launch_header.set_visible(False)
+        self.launch_box.set_visible(False)
         
         while True:
             child = self.tags_flow.get_first_child()
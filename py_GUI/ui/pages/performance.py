@@ -5,12 +5,17 @@ from gi.repository import Gtk, Gdk, GLib, Pango
 import time
 from typing import Dict, List
 from py_GUI.core.controller import WallpaperController
+from py_GUI.core.performance import is_backend, backend_screen
 from py_GUI.ui.components.sparkline import Sparkline
 
+# Slowest wallpapers listed in the Apply Latency panel
+APPLY_LATENCY_ROWS = 10
+
 class PerformancePage(Gtk.Box):
     def __init__(self, controller: WallpaperController):
         super().__init__(orientation=Gtk.Orientation.VERTICAL)
         self.controller = controller
+        self.controller.config.connect("active_monitors", self._on_active_monitors_changed)
         
         # Inject Custom CSS
         provider = Gtk.CssProvider()
@@ -67,6 +72,8 @@ class PerformancePage(Gtk.Box):
         self.create_overview_card("Total CPU", "cpu", 0, 0, unit="%")
         self.create_overview_card("Total Memory", "memory_mb", 0, 1, unit=" MB")
         self.create_overview_card("Active Threads", "threads", 0, 2)
+        self.create_overview_card("Engine Crashes", "crashes", 0, 3)
+        self.create_overview_card("CPU Saved (Suspended)", "saved_cpu_seconds", 0, 4, unit=" s")
         
         # Total Charts Row
         total_charts_row = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=20)
@@ -100,6 +107,7 @@ class PerformancePage(Gtk.Box):
         
         self.process_widgets = {}
         
+        self.build_apply_latency_panel()
         self.build_screenshot_history_panel()
 
     def create_overview_card(self, title, key, row, col, unit=""):
@@ -130,7 +138,9 @@ class PerformancePage(Gtk.Box):
         GLib.idle_add(lambda: self._update_ui(stats))
 
     def _update_ui(self, stats: Dict):
-        total = stats.get("total", {})
+        total = dict(stats.get("total", {}))
+        # Counted by the engine supervisor for this session, not sampled
+        total["crashes"] = self.controller.supervisor.total_crashes()
         for key, (lbl, unit) in self.total_labels.items():
             fmt_key = f"{key}_fmt"
             if fmt_key in total:
@@ -152,6 +162,9 @@ class PerformancePage(Gtk.Box):
                     lbl.add_css_class("error")
             elif key == "memory_mb":
                 lbl.add_css_class("memory-text")
+            elif key == "saved_cpu_seconds":
+                suspended = total.get("suspended_seconds", 0)
+                lbl.set_tooltip_text(f"Engines suspended for {suspended / 60:.1f} min this session")
         
         history = total.get("history", {})
         if "cpu" in history:
@@ -194,6 +207,13 @@ class PerformancePage(Gtk.Box):
             
             self._update_process_row(self.process_widgets[pid], category, data, thread_names.get(category, []))
         
+        latency = self.controller.perf_monitor.latency
+        latency_revision = latency.revision if latency else 0
+        if latency_revision != self._last_latency_revision:
+            self._last_latency_revision = latency_revision
+            self._refresh_apply_latency()
+            self._refresh_screenshot_history()
+
         history = self.controller.perf_monitor.get_screenshot_history()
         latest_ts = history[-1].get("timestamp", 0) if history else 0
         if latest_ts != self._last_screenshot_ts:
@@ -240,6 +260,7 @@ class PerformancePage(Gtk.Box):
     def _create_process_row(self, category: str, data: Dict) -> Gtk.Box:
         main_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=5)
         main_box.add_css_class("list-item")
+        main_box.category = category
         
         # Header Row (Icon + Info + Current Stats)
         header_row = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=20)
@@ -248,7 +269,7 @@ class PerformancePage(Gtk.Box):
         # Icon/Type
         icon_name = "application-x-executable-symbolic"
         if category == "frontend": icon_name = "preferences-desktop-wallpaper-symbolic"
-        elif category == "backend": icon_name = "video-display-symbolic"
+        elif is_backend(category): icon_name = "video-display-symbolic"
         elif category == "tray": icon_name = "system-run-symbolic"
         
         icon = Gtk.Image.new_from_icon_name(icon_name)
@@ -260,7 +281,9 @@ class PerformancePage(Gtk.Box):
         info_box.set_hexpand(True)
         header_row.append(info_box)
 
-        name_lbl = Gtk.Label(label=f"{category.title()} ({data['pid']})")
+        screen = backend_screen(category)
+        title = f"Backend {screen}" if screen else category.title()
+        name_lbl = Gtk.Label(label=f"{title} ({data['pid']})")
         name_lbl.add_css_class("list-title")
         name_lbl.set_halign(Gtk.Align.START)
         info_box.append(name_lbl)
@@ -271,6 +294,13 @@ class PerformancePage(Gtk.Box):
         cmd_lbl.set_ellipsize(Pango.EllipsizeMode.END)
         info_box.append(cmd_lbl)
 
+        if is_backend(category):
+            main_box.crash_lbl = Gtk.Label()
+            main_box.crash_lbl.add_css_class("warning")
+            main_box.crash_lbl.set_halign(Gtk.Align.START)
+            main_box.crash_lbl.set_visible(False)
+            info_box.append(main_box.crash_lbl)
+
         # Current Stats
         stats_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=15)
         header_row.append(stats_box)
@@ -333,7 +363,7 @@ class PerformancePage(Gtk.Box):
         charts_row.append(spacer)
 
         # Wallpaper Details Expander (Backend only)
-        if category == "backend":
+        if is_backend(category):
             main_box.details_expander = Gtk.Expander(label="Wallpaper Details")
             main_box.details_expander.add_css_class("boxed-expander")
             main_box.details_expander.set_margin_start(52)
@@ -345,7 +375,7 @@ class PerformancePage(Gtk.Box):
             main_box.details_expander.set_child(main_box.details_box)
             
             main_box.append(main_box.details_expander)
-            main_box.last_monitors_hash = None
+            self._rebuild_wallpaper_details(main_box)
 
         # Thread Details Expander (All processes)
         main_box.threads_expander = Gtk.Expander(label="Thread Details")
@@ -386,6 +416,13 @@ class PerformancePage(Gtk.Box):
             
         row.mem_lbl.set_label(data.get('memory_fmt', f"{data['memory_mb']} MB"))
         row.status_lbl.set_label(data['status'].upper())
+
+        if hasattr(row, 'crash_lbl'):
+            counts = self.controller.supervisor.get_counts(category)
+            if counts["crashes"]:
+                row.crash_lbl.set_label(
+                    f"Crashed {counts['crashes']}× this session, restarted {counts['restarts']}×")
+            row.crash_lbl.set_visible(counts["crashes"] > 0)
         
         history = data.get("history", {})
         if "cpu" in history:
@@ -417,89 +454,204 @@ class PerformancePage(Gtk.Box):
         else:
             row.threads_expander.set_label("Thread Details (0)")
 
-        # Update Wallpaper Details (Backend only)
-        if category == "backend" and hasattr(row, 'details_expander'):
-            try:
-                active_monitors = self.controller.config.get("active_monitors", {})
-                current_hash = str(active_monitors)
+    def _on_active_monitors_changed(self, key, old, new):
+        GLib.idle_add(self._refresh_wallpaper_details)
+
+    def _refresh_wallpaper_details(self):
+        for row in self.process_widgets.values():
+            if hasattr(row, 'details_expander'):
+                self._rebuild_wallpaper_details(row)
+        return False
+
+    def _rebuild_wallpaper_details(self, row):
+        """Rebuild the backend row's per-screen wallpaper list from active_monitors"""
+        try:
+            active_monitors = self.controller.config.get("active_monitors", {}) or {}
+            own_screen = backend_screen(row.category)
+            if own_screen is not None:
+                # Per-screen engine: only the output it renders
+                active_monitors = {s: w for s, w in active_monitors.items() if s == own_screen}
+
+            if active_monitors:
+                row.details_expander.set_visible(True)
                 
-                if current_hash != row.last_monitors_hash:
-                    row.last_monitors_hash = current_hash
+                while row.details_box.get_first_child():
+                    row.details_box.remove(row.details_box.get_first_child())
+                
+                for screen, wp_id in active_monitors.items():
+                    display_name = "Unknown"
+                    secondary_text = None
+                    preview_path = None
+                    clean_id = str(wp_id).strip()
                     
-                    if active_monitors:
-                        row.details_expander.set_visible(True)
-                        
-                        while row.details_box.get_first_child():
-                            row.details_box.remove(row.details_box.get_first_child())
-                        
-                        for screen, wp_id in active_monitors.items():
-                            display_name = "Unknown"
-                            secondary_text = None
-                            preview_path = None
-                            clean_id = str(wp_id).strip()
-                            
-                            if hasattr(self.controller, 'wp_manager'):
-                                wp = self.controller.wp_manager.get_wallpaper(clean_id)
-                                if wp:
-                                    if hasattr(self.controller, 'nickname_manager'):
-                                        display_name, secondary_text = self.controller.nickname_manager.get_display_name(wp)
-                                    else:
-                                        display_name = wp.get("title", "Untitled")
-                                    preview_path = wp.get("preview")
-                            
-                            s_row = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=12)
-                            s_row.set_margin_top(5)
-                            s_row.set_margin_bottom(5)
-                            row.details_box.append(s_row)
-                            
-                            if preview_path and hasattr(self.controller, 'wp_manager'):
-                                texture = self.controller.wp_manager.get_texture(preview_path, size=64)
-                                if texture:
-                                    thumb = Gtk.Picture.new_for_paintable(texture)
-                                    thumb.set_size_request(64, 36)
-                                    thumb.set_content_fit(Gtk.ContentFit.COVER)
-                                    thumb.add_css_class("thumbnail")
-                                    s_row.append(thumb)
-                                else:
-                                    placeholder = Gtk.Image.new_from_icon_name("image-missing-symbolic")
-                                    placeholder.set_pixel_size(36)
-                                    s_row.append(placeholder)
+                    if hasattr(self.controller, 'wp_manager'):
+                        wp = self.controller.wp_manager.get_wallpaper(clean_id)
+                        if wp:
+                            if hasattr(self.controller, 'nickname_manager'):
+                                display_name, secondary_text = self.controller.nickname_manager.get_display_name(wp)
                             else:
-                                placeholder = Gtk.Image.new_from_icon_name("video-display-symbolic")
-                                placeholder.set_pixel_size(36)
-                                s_row.append(placeholder)
-                            
-                            info_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=2)
-                            info_box.set_valign(Gtk.Align.CENTER)
-                            s_row.append(info_box)
-                            
-                            screen_lbl = Gtk.Label(label=screen)
-                            screen_lbl.set_halign(Gtk.Align.START)
-                            screen_lbl.add_css_class("heading")
-                            info_box.append(screen_lbl)
-                            
-                            title_lbl = Gtk.Label(label=display_name)
-                            title_lbl.set_halign(Gtk.Align.START)
-                            title_lbl.set_ellipsize(Pango.EllipsizeMode.END)
-                            title_lbl.set_max_width_chars(40)
-                            info_box.append(title_lbl)
-                            
-                            if secondary_text:
-                                subtitle_lbl = Gtk.Label(label=secondary_text)
-                                subtitle_lbl.add_css_class("text-muted")
-                                subtitle_lbl.set_halign(Gtk.Align.START)
-                                subtitle_lbl.set_ellipsize(Pango.EllipsizeMode.END)
-                                subtitle_lbl.set_max_width_chars(40)
-                                info_box.append(subtitle_lbl)
-                            
-                            id_lbl = Gtk.Label(label=f"ID: {wp_id}")
-                            id_lbl.add_css_class("text-muted")
-                            id_lbl.set_halign(Gtk.Align.START)
-                            info_box.append(id_lbl)
+                                display_name = wp.get("title", "Untitled")
+                            preview_path = wp.get("preview")
+                    
+                    s_row = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=12)
+                    s_row.set_margin_top(5)
+                    s_row.set_margin_bottom(5)
+                    row.details_box.append(s_row)
+                    
+                    if preview_path and hasattr(self.controller, 'wp_manager'):
+                        texture = self.controller.wp_manager.get_texture(preview_path, size=64)
+                        if texture:
+                            thumb = Gtk.Picture.new_for_paintable(texture)
+                            thumb.set_size_request(64, 36)
+                            thumb.set_content_fit(Gtk.ContentFit.COVER)
+                            thumb.add_css_class("thumbnail")
+                            s_row.append(thumb)
+                        else:
+                            placeholder = Gtk.Image.new_from_icon_name("image-missing-symbolic")
+                            placeholder.set_pixel_size(36)
+                            s_row.append(placeholder)
                     else:
-                        row.details_expander.set_visible(False)
-            except Exception as e:
-                print(f"[Performance] Backend details error: {e}")
+                        placeholder = Gtk.Image.new_from_icon_name("video-display-symbolic")
+                        placeholder.set_pixel_size(36)
+                        s_row.append(placeholder)
+                    
+                    info_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=2)
+                    info_box.set_valign(Gtk.Align.CENTER)
+                    s_row.append(info_box)
+                    
+                    screen_lbl = Gtk.Label(label=screen)
+                    screen_lbl.set_halign(Gtk.Align.START)
+                    screen_lbl.add_css_class("heading")
+                    info_box.append(screen_lbl)
+                    
+                    title_lbl = Gtk.Label(label=display_name)
+                    title_lbl.set_halign(Gtk.Align.START)
+                    title_lbl.set_ellipsize(Pango.EllipsizeMode.END)
+                    title_lbl.set_max_width_chars(40)
+                    info_box.append(title_lbl)
+                    
+                    if secondary_text:
+                        subtitle_lbl = Gtk.Label(label=secondary_text)
+                        subtitle_lbl.add_css_class("text-muted")
+                        subtitle_lbl.set_halign(Gtk.Align.START)
+                        subtitle_lbl.set_ellipsize(Pango.EllipsizeMode.END)
+                        subtitle_lbl.set_max_width_chars(40)
+                        info_box.append(subtitle_lbl)
+                    
+                    id_lbl = Gtk.Label(label=f"ID: {wp_id}")
+                    id_lbl.add_css_class("text-muted")
+                    id_lbl.set_halign(Gtk.Align.START)
+                    info_box.append(id_lbl)
+            else:
+                row.details_expander.set_visible(False)
+        except Exception as e:
+            print(f"[Performance] Backend details error: {e}")
+
+    def build_apply_latency_panel(self):
+        self.content_box.append(Gtk.Separator(orientation=Gtk.Orientation.HORIZONTAL))
+
+        header_row = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=10)
+        self.content_box.append(header_row)
+
+        header_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=2)
+        header_box.set_hexpand(True)
+        header_row.append(header_box)
+
+        header = Gtk.Label(label="Apply Latency")
+        header.add_css_class("settings-section-title")
+        header.set_halign(Gtk.Align.START)
+        header_box.append(header)
+
+        desc = Gtk.Label(label="Time from Apply until the engine is ready, slowest wallpapers first.")
+        desc.add_css_class("text-muted")
+        desc.set_halign(Gtk.Align.START)
+        header_box.append(desc)
+
+        clear_btn = Gtk.Button(label="Clear")
+        clear_btn.set_tooltip_text("Clear all apply latency samples")
+        clear_btn.connect("clicked", self._on_clear_latency_clicked)
+        clear_btn.set_valign(Gtk.Align.CENTER)
+        header_row.append(clear_btn)
+
+        self.apply_latency_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=0)
+        self.content_box.append(self.apply_latency_box)
+
+        self._last_latency_revision = 0
+        self._refresh_apply_latency()
+
+    def _refresh_apply_latency(self):
+        while self.apply_latency_box.get_first_child():
+            self.apply_latency_box.remove(self.apply_latency_box.get_first_child())
+
+        latency = self.controller.perf_monitor.latency
+        stats = latency.get_stats() if latency else {}
+
+        if not stats:
+            empty_label = Gtk.Label(label="No wallpapers applied yet.")
+            empty_label.add_css_class("text-muted")
+            empty_label.set_halign(Gtk.Align.START)
+            self.apply_latency_box.append(empty_label)
+            return
+
+        slowest = sorted(stats.items(), key=lambda item: item[1]["p95"], reverse=True)
+        for wp_id, stat in slowest[:APPLY_LATENCY_ROWS]:
+            self.apply_latency_box.append(self._create_apply_latency_row(wp_id, stat))
+
+    def _on_clear_latency_clicked(self, btn):
+        if self.controller.perf_monitor.latency:
+            self.controller.perf_monitor.latency.clear()
+            self._last_latency_revision = self.controller.perf_monitor.latency.revision
+        self._refresh_apply_latency()
+        self._refresh_screenshot_history()
+
+    def _create_apply_latency_row(self, wp_id: str, stat: Dict) -> Gtk.Box:
+        row = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=15)
+        row.add_css_class("list-item")
+        row.set_margin_top(5)
+        row.set_margin_bottom(5)
+
+        display_name = None
+        if hasattr(self.controller, 'wp_manager'):
+            wp = self.controller.wp_manager.get_wallpaper(str(wp_id))
+            if wp:
+                if hasattr(self.controller, 'nickname_manager'):
+                    display_name, _ = self.controller.nickname_manager.get_display_name(wp)
+                else:
+                    display_name = wp.get("title")
+
+        info_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=2)
+        info_box.set_hexpand(True)
+        row.append(info_box)
+
+        title_lbl = Gtk.Label(label=display_name or f"Wallpaper {wp_id}")
+        title_lbl.add_css_class("list-title")
+        title_lbl.set_halign(Gtk.Align.START)
+        title_lbl.set_ellipsize(Pango.EllipsizeMode.END)
+        title_lbl.set_max_width_chars(30)
+        info_box.append(title_lbl)
+
+        # Breakdown of the latest apply shows which phase is slow
+        breakdown = ", ".join(
+            f"{phase} {stat.get(phase, 0) * 1000:.0f} ms"
+            for phase in ("config", "history", "queued", "spawn", "ready")
+        )
+        last = "Last (timed out)" if stat.get("last_timed_out") else "Last"
+        breakdown_lbl = Gtk.Label(label=f"{last}: {breakdown}")
+        breakdown_lbl.add_css_class("text-muted")
+        breakdown_lbl.set_halign(Gtk.Align.START)
+        breakdown_lbl.set_ellipsize(Pango.EllipsizeMode.END)
+        info_box.append(breakdown_lbl)
+
+        stats_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=20)
+        row.append(stats_box)
+
+        self._add_stat_column(stats_box, f"{stat['p50']:.2f}s", "p50", 60)
+        self._add_stat_column(stats_box, f"{stat['p95']:.2f}s", "p95", 60)
+        self._add_stat_column(stats_box, f"{stat['max']:.2f}s", "Max", 60)
+        self._add_stat_column(stats_box, str(stat["count"]), "Applies", 60)
+        self._add_stat_column(stats_box, str(stat.get("timed_out", 0)), "Timed out", 60)
+
+        return row
 
     def build_screenshot_history_panel(self):
         self.content_box.append(Gtk.Separator(orientation=Gtk.Orientation.HORIZONTAL))
@@ -624,6 +776,11 @@ class PerformancePage(Gtk.Box):
         self._add_stat_column(stats_box, f"{duration:.1f}s", "Duration", 70)
         self._add_stat_column(stats_box, f"{max_cpu:.1f}%", "Max CPU", 70)
         self._add_stat_column(stats_box, f"{max_mem:.1f} MB", "Max Mem", 80)
+
+        latency = self.controller.perf_monitor.latency
+        apply_stat = latency.get_stat(str(wp_id)) if latency else None
+        apply_text = f"{apply_stat['p50']:.2f}s" if apply_stat else "—"
+        self._add_stat_column(stats_box, apply_text, "Apply p50", 70)
         
         actions_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=5)
         row.append(actions_box)
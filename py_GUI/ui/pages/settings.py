@@ -10,6 +10,8 @@ from py_GUI.core.config import ConfigManager
 from py_GUI.core.screen import ScreenManager
 from py_GUI.core.logger import LogManager
 from py_GUI.core.controller import WallpaperController
+from py_GUI.core.snapshot import SNAPSHOT_MODES
+from py_GUI.core.renderers import ENGINE
 from py_GUI.core.wallpaper import WallpaperManager
 from py_GUI.core.integrations import AppIntegrator
 
@@ -291,6 +293,66 @@ class SettingsPage(Gtk.Box):
         self.cycle_order_dd.set_selected(idx)
         r.append(self.cycle_order_dd)
 
+        # History retention
+        r = self.create_row("History Retention (Days)", "Forget wallpapers not played for this long. 0 keeps all history.")
+        box.append(r)
+        self.history_retention_spin = Gtk.SpinButton()
+        self.history_retention_spin.set_range(0, 3650)
+        self.history_retention_spin.set_increments(1, 30)
+        self.history_retention_spin.set_value(self.config.get("historyRetentionDays", 0))
+        r.append(self.history_retention_spin)
+
+        # Power
+        t = Gtk.Label(label="Power")
+        t.add_css_class("settings-section-title")
+        t.set_halign(Gtk.Align.START)
+        t.set_margin_top(10)
+        box.append(t)
+
+        power = self.controller.power
+        r = self.create_row("Power Profiles", f"Use lighter settings on battery. Now: {power.describe()}.")
+        box.append(r)
+        self.power_sw = Gtk.Switch()
+        self.power_sw.set_active(self.config.get("powerProfilesEnabled", False))
+        self.power_sw.set_valign(Gtk.Align.CENTER)
+        r.append(self.power_sw)
+
+        r = self.create_row("Suspend When Idle", "Freeze the engine while the session is idle or locked.")
+        box.append(r)
+        self.suspend_idle_sw = Gtk.Switch()
+        self.suspend_idle_sw.set_active(self.config.get("suspendWhenIdle", False))
+        self.suspend_idle_sw.set_valign(Gtk.Align.CENTER)
+        r.append(self.suspend_idle_sw)
+
+        r = self.create_row("Low Battery Threshold (%)", "Switch to the low battery profile at or below this charge.")
+        box.append(r)
+        self.low_battery_spin = Gtk.SpinButton()
+        self.low_battery_spin.set_range(5, 95)
+        self.low_battery_spin.set_increments(5, 10)
+        self.low_battery_spin.set_value(self.config.get("lowBatteryThreshold", 20))
+        r.append(self.low_battery_spin)
+
+        # On AC the settings above apply unchanged
+        self.power_profile_widgets = {}
+        self._build_power_profile_row(box, "battery", "On Battery", "FPS and effects while discharging.")
+        self._build_power_profile_row(box, "low_battery", "On Low Battery", "FPS and effects below the threshold.")
+
+        r = self.create_row("Static Snapshots", "Show a cached still frame instead of running the engine.")
+        box.append(r)
+        self.snapshot_mode_dd = Gtk.DropDown.new_from_strings(["Off", "On Battery", "On Low Battery", "Always"])
+        curr_snapshot = self.config.get("staticSnapshotMode", "off")
+        self.snapshot_mode_dd.set_selected(SNAPSHOT_MODES.index(curr_snapshot) if curr_snapshot in SNAPSHOT_MODES else 0)
+        r.append(self.snapshot_mode_dd)
+
+        r = self.create_row("Snapshot Above Load", "Also use snapshots while the load per CPU is above this (0 = off).")
+        box.append(r)
+        self.snapshot_load_spin = Gtk.SpinButton()
+        self.snapshot_load_spin.set_range(0, 8)
+        self.snapshot_load_spin.set_increments(0.1, 0.5)
+        self.snapshot_load_spin.set_digits(1)
+        self.snapshot_load_spin.set_value(float(self.config.get("staticSnapshotLoad", 0) or 0))
+        r.append(self.snapshot_load_spin)
+
         # Wayland Tweaks
         t = Gtk.Label(label="Wayland Tweaks")
         t.add_css_class("settings-section-title")
@@ -332,6 +394,54 @@ class SettingsPage(Gtk.Box):
         if not is_wayland: self.wl_ignore_entry.set_sensitive(False)
         r.append(self.wl_ignore_entry)
 
+    def _build_power_profile_row(self, box, profile: str, label: str, desc: str):
+        settings = (self.config.get("powerProfiles") or {}).get(profile) or {}
+        r = self.create_row(label, desc)
+        box.append(r)
+
+        controls = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=10)
+        controls.set_valign(Gtk.Align.CENTER)
+        r.append(controls)
+
+        fps_spin = Gtk.SpinButton()
+        fps_spin.set_range(1, 144)
+        fps_spin.set_increments(1, 10)
+        fps_spin.set_value(settings.get("fps", self.config.get("fps", 30)))
+        fps_spin.set_tooltip_text("FPS limit")
+        controls.append(fps_spin)
+
+        particles_chk = Gtk.CheckButton(label="No particles")
+        particles_chk.set_active(bool(settings.get("disableParticles", False)))
+        controls.append(particles_chk)
+
+        parallax_chk = Gtk.CheckButton(label="No parallax")
+        parallax_chk.set_active(bool(settings.get("disableParallax", False)))
+        controls.append(parallax_chk)
+
+        cycle_chk = Gtk.CheckButton(label="Pause cycling")
+        cycle_chk.set_active(settings.get("cycleInterval") == 0)
+        controls.append(cycle_chk)
+
+        self.power_profile_widgets[profile] = (fps_spin, particles_chk, parallax_chk, cycle_chk)
+
+    def _collect_power_profiles(self) -> dict:
+        """powerProfiles with the editable profiles replaced by the UI state"""
+        profiles = {k: dict(v or {}) for k, v in (self.config.get("powerProfiles") or {}).items()}
+        for profile, (fps_spin, particles_chk, parallax_chk, cycle_chk) in self.power_profile_widgets.items():
+            settings = profiles.setdefault(profile, {})
+            settings["fps"] = int(fps_spin.get_value())
+            # Unchecked flags fall back to the global setting
+            for key, chk in (("disableParticles", particles_chk), ("disableParallax", parallax_chk)):
+                if chk.get_active():
+                    settings[key] = True
+                else:
+                    settings.pop(key, None)
+            if cycle_chk.get_active():
+                settings["cycleInterval"] = 0
+            elif settings.get("cycleInterval") == 0:
+                del settings["cycleInterval"]
+        return profiles
+
     def build_audio(self):
         scroll = Gtk.ScrolledWindow()
         scroll.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
@@ -465,6 +575,93 @@ class SettingsPage(Gtk.Box):
         btn.connect("clicked", self.on_refresh_screens)
         box.append(btn)
 
+        # Engine processes
+        r = self.create_row("Engine Processes", "Per Screen runs one engine per monitor, so changing one monitor leaves the others running.")
+        box.append(r)
+        self.process_mode_dd = Gtk.DropDown.new_from_strings(["Shared", "Per Screen"])
+        self.process_mode_dd.set_valign(Gtk.Align.CENTER)
+        if self.config.get("processMode", "shared") == "per_screen":
+            self.process_mode_dd.set_selected(1)
+        r.append(self.process_mode_dd)
+
+        r = self.create_row("Video Wallpapers", "mpvpaper plays video wallpapers with far less CPU when it is installed.")
+        box.append(r)
+        self.video_renderer_dd = Gtk.DropDown.new_from_strings(["mpvpaper When Installed", "Wallpaper Engine"])
+        self.video_renderer_dd.set_valign(Gtk.Align.CENTER)
+        video_rule = self.controller.renderers.rules().get("video") or [ENGINE]
+        self.video_renderer_dd.set_selected(0 if video_rule[0] == "mpvpaper" else 1)
+        r.append(self.video_renderer_dd)
+
+        # Seamless switching
+        r = self.create_row("Seamless Switching", "Keep the current wallpaper on screen until the new one has loaded. Needs memory for two engines.")
+        box.append(r)
+        self.seamless_sw = Gtk.Switch()
+        self.seamless_sw.set_active(self.config.get("seamlessSwitch", False))
+        self.seamless_sw.set_valign(Gtk.Align.CENTER)
+        r.append(self.seamless_sw)
+
+        r = self.create_row("Switch Timeout (Seconds)", "Stop the old wallpaper after this long even if the new one has not reported ready.")
+        box.append(r)
+        self.switch_timeout_spin = Gtk.SpinButton()
+        self.switch_timeout_spin.set_range(1, 30)
+        self.switch_timeout_spin.set_increments(1, 5)
+        self.switch_timeout_spin.set_value(self.config.get("switchTimeout", 5))
+        r.append(self.switch_timeout_spin)
+
+        # Engine Resources
+        t = Gtk.Label(label="Engine Resources")
+        t.add_css_class("settings-section-title")
+        t.set_halign(Gtk.Align.START)
+        t.set_margin_top(10)
+        box.append(t)
+
+        r = self.create_row("Nice Level", "CPU scheduling priority of the engine. Higher yields to other programs (0 = default).")
+        box.append(r)
+        self.nice_spin = Gtk.SpinButton()
+        self.nice_spin.set_range(0, 19)
+        self.nice_spin.set_increments(1, 5)
+        self.nice_spin.set_value(self.config.get("engineNice", 0))
+        r.append(self.nice_spin)
+
+        r = self.create_row("I/O Priority", "ionice class of the engine. Idle only reads from disk when nothing else does.")
+        box.append(r)
+        self.ionice_dd = Gtk.DropDown.new_from_strings(["Default", "Best Effort", "Idle"])
+        ionice_opts = ["none", "best-effort", "idle"]
+        curr_ionice = self.config.get("engineIoniceClass", "none")
+        self.ionice_dd.set_selected(ionice_opts.index(curr_ionice) if curr_ionice in ionice_opts else 0)
+        r.append(self.ionice_dd)
+
+        r = self.create_row("CPU Affinity", "CPUs the engine may run on, e.g. 0-3,6. Leave empty for all.")
+        box.append(r)
+        self.affinity_entry = Gtk.Entry()
+        self.affinity_entry.set_text(self.config.get("engineCpuAffinity", "") or "")
+        self.affinity_entry.set_placeholder_text("all")
+        self.affinity_entry.set_valign(Gtk.Align.CENTER)
+        r.append(self.affinity_entry)
+
+        r = self.create_row("Run in systemd Scope", "Start the engine with systemd-run --user --scope so the limits below apply.")
+        box.append(r)
+        self.scope_sw = Gtk.Switch()
+        self.scope_sw.set_active(self.config.get("engineScope", False))
+        self.scope_sw.set_valign(Gtk.Align.CENTER)
+        r.append(self.scope_sw)
+
+        r = self.create_row("CPU Quota (%)", "Share of one core the engine may use; 200 means two cores (0 = unlimited).")
+        box.append(r)
+        self.cpu_quota_spin = Gtk.SpinButton()
+        self.cpu_quota_spin.set_range(0, 100 * (os.cpu_count() or 1))
+        self.cpu_quota_spin.set_increments(10, 50)
+        self.cpu_quota_spin.set_value(self.config.get("engineCpuQuota", 0))
+        r.append(self.cpu_quota_spin)
+
+        r = self.create_row("Memory Limit (MB)", "The engine is killed if it grows past this (0 = unlimited).")
+        box.append(r)
+        self.memory_max_spin = Gtk.SpinButton()
+        self.memory_max_spin.set_range(0, 65536)
+        self.memory_max_spin.set_increments(128, 1024)
+        self.memory_max_spin.set_value(self.config.get("engineMemoryMax", 0))
+        r.append(self.memory_max_spin)
+
         # System Integration
         t = Gtk.Label(label="System Integration")
         t.add_css_class("settings-section-title")
@@ -522,7 +719,7 @@ class SettingsPage(Gtk.Box):
 
         # Xvfb Status Check
         import shutil
-        has_xvfb = shutil.which("xvfb-run") is not None
+        has_xvfb = shutil.which("Xvfb") is not None or shutil.which("xvfb-run") is not None
         
         status_label = "✅ Xvfb Installed (Silent Mode)" if has_xvfb else "⚠️ Xvfb Not Found (Window Mode)"
         status_desc = "Silent capture using virtual framebuffer."
@@ -639,6 +836,7 @@ class SettingsPage(Gtk.Box):
         scroll.set_child(self.log_view)
 
         self.log_buffer = self.log_view.get_buffer()
+        self.log_end_mark = self.log_buffer.create_mark(None, self.log_buffer.get_end_iter(), False)
         self.setup_log_tags()
 
         # Buttons
@@ -727,10 +925,16 @@ class SettingsPage(Gtk.Box):
         self.log_buffer.insert_with_tags_by_name(end, f"[{src}] ", "source")
         self.log_buffer.insert_with_tags_by_name(end, f"{msg}\n", "message", "line")
 
-        self.log_view.scroll_to_mark(
-            self.log_buffer.create_mark("end", self.log_buffer.get_end_iter(), False),
-            0.0, False, 0.0, 0.0
-        )
+        # Keep the view as bounded as the log ring buffer under streamed engine output
+        excess = self.log_buffer.get_line_count() - self.log_manager.max_entries
+        if excess > 0:
+            cut = self.log_buffer.get_iter_at_line(excess)
+            if isinstance(cut, tuple):
+                cut = cut[1]
+            self.log_buffer.delete(self.log_buffer.get_start_iter(), cut)
+
+        self.log_buffer.move_mark(self.log_end_mark, self.log_buffer.get_end_iter())
+        self.log_view.scroll_to_mark(self.log_end_mark, 0.0, False, 0.0, 0.0)
 
     def refresh_logs(self):
         self.log_buffer.set_text("")
@@ -779,70 +983,101 @@ class SettingsPage(Gtk.Box):
 
     def on_save(self, btn):
         try:
-            # General
-            self.config.set("fps", int(self.fps_spin.get_value()))
+            with self.config.batch():
+                # General
+                self.config.set("fps", int(self.fps_spin.get_value()))
             
-            scaling_opts = ["default", "stretch", "fit", "fill"]
-            idx = self.scaling_dd.get_selected()
-            if 0 <= idx < len(scaling_opts):
-                self.config.set("scaling", scaling_opts[idx])
+                scaling_opts = ["default", "stretch", "fit", "fill"]
+                idx = self.scaling_dd.get_selected()
+                if 0 <= idx < len(scaling_opts):
+                    self.config.set("scaling", scaling_opts[idx])
                 
-            self.config.set("noFullscreenPause", self.pause_sw.get_active())
-            self.config.set("disableMouse", self.mouse_sw.get_active())
-            self.config.set("disableParallax", self.parallax_sw.get_active())
-            self.config.set("disableParticles", self.particles_sw.get_active())
+                self.config.set("noFullscreenPause", self.pause_sw.get_active())
+                self.config.set("disableMouse", self.mouse_sw.get_active())
+                self.config.set("disableParallax", self.parallax_sw.get_active())
+                self.config.set("disableParticles", self.particles_sw.get_active())
             
-            clamp_opts = ["clamp", "border", "repeat"]
-            idx = self.clamp_dd.get_selected()
-            if 0 <= idx < len(clamp_opts):
-                self.config.set("clamping", clamp_opts[idx])
-
-            # Automation
-            self.config.set("cycleEnabled", self.cycle_sw.get_active())
-            self.config.set("cycleInterval", int(self.cycle_spin.get_value()))
+                clamp_opts = ["clamp", "border", "repeat"]
+                idx = self.clamp_dd.get_selected()
+                if 0 <= idx < len(clamp_opts):
+                    self.config.set("clamping", clamp_opts[idx])
+
+                # Automation
+                self.config.set("cycleEnabled", self.cycle_sw.get_active())
+                self.config.set("cycleInterval", int(self.cycle_spin.get_value()))
             
-            cycle_opts = ["random", "title", "size", "size_desc", "type", "id"]
-            # Map UI index to config value
-            # UI: ["Random", "Title", "Size ↑", "Size ↓", "Type", "ID"]
-            sel_idx = self.cycle_order_dd.get_selected()
-            if 0 <= sel_idx < len(cycle_opts):
-                self.config.set("cycleOrder", cycle_opts[sel_idx])
+                cycle_opts = ["random", "title", "size", "size_desc", "type", "id"]
+                # Map UI index to config value
+                # UI: ["Random", "Title", "Size ↑", "Size ↓", "Type", "ID"]
+                sel_idx = self.cycle_order_dd.get_selected()
+                if 0 <= sel_idx < len(cycle_opts):
+                    self.config.set("cycleOrder", cycle_opts[sel_idx])
+                self.config.set("historyRetentionDays", int(self.history_retention_spin.get_value()))
+
+                self.config.set("suspendWhenIdle", self.suspend_idle_sw.get_active())
+                self.config.set("powerProfilesEnabled", self.power_sw.get_active())
+                self.config.set("lowBatteryThreshold", int(self.low_battery_spin.get_value()))
+                self.config.set("powerProfiles", self._collect_power_profiles())
+                idx = self.snapshot_mode_dd.get_selected()
+                if 0 <= idx < len(SNAPSHOT_MODES):
+                    self.config.set("staticSnapshotMode", SNAPSHOT_MODES[idx])
+                self.config.set("staticSnapshotLoad", round(self.snapshot_load_spin.get_value(), 1))
             
-            self.config.set("wayland_only_active", self.wl_active_sw.get_active())
-            self.config.set("wayland_ignore_appids", self.wl_ignore_entry.get_text())
+                self.config.set("wayland_only_active", self.wl_active_sw.get_active())
+                self.config.set("wayland_ignore_appids", self.wl_ignore_entry.get_text())
 
-            # Audio
-            self.config.set("silence", self.silence_sw.get_active())
-            self.config.set("volume", int(self.vol_spin.get_value()))
-            self.config.set("noautomute", self.noautomute_sw.get_active())
-            self.config.set("noAudioProcessing", self.noaudioproc_sw.get_active())
+                # Audio
+                self.config.set("silence", self.silence_sw.get_active())
+                self.config.set("volume", int(self.vol_spin.get_value()))
+                self.config.set("noautomute", self.noautomute_sw.get_active())
+                self.config.set("noAudioProcessing", self.noaudioproc_sw.get_active())
 
-            # Advanced
-            self.config.set("workshopPath", self.path_entry.get_text())
+                # Advanced
+                self.config.set("workshopPath", self.path_entry.get_text())
             
-            assets_path = self.assets_entry.get_text().strip()
-            self.config.set("assetsPath", assets_path if assets_path else None)
+                assets_path = self.assets_entry.get_text().strip()
+                self.config.set("assetsPath", assets_path if assets_path else None)
+
+                process_modes = ["shared", "per_screen"]
+                idx = self.process_mode_dd.get_selected()
+                if 0 <= idx < len(process_modes):
+                    self.config.set("processMode", process_modes[idx])
+                rules = dict(self.config.get("rendererRules") or {})
+                rules["video"] = ["mpvpaper", ENGINE] if self.video_renderer_dd.get_selected() == 0 else [ENGINE]
+                self.config.set("rendererRules", rules)
+                self.config.set("seamlessSwitch", self.seamless_sw.get_active())
+                self.config.set("switchTimeout", int(self.switch_timeout_spin.get_value()))
+
+                self.config.set("engineNice", int(self.nice_spin.get_value()))
+                ionice_opts = ["none", "best-effort", "idle"]
+                idx = self.ionice_dd.get_selected()
+                if 0 <= idx < len(ionice_opts):
+                    self.config.set("engineIoniceClass", ionice_opts[idx])
+                self.config.set("engineCpuAffinity", self.affinity_entry.get_text().strip())
+                self.config.set("engineScope", self.scope_sw.get_active())
+                self.config.set("engineCpuQuota", int(self.cpu_quota_spin.get_value()))
+                self.config.set("engineMemoryMax", int(self.memory_max_spin.get_value()))
             
-            # Screen Root
-            screens = self.screen_manager.get_screens()
-            sel_idx = self.screen_dd.get_selected()
-            # If screens list changed since build, this might be risky, but refresh updates model
-            # Re-fetch model from dropdown?
-            model = self.screen_dd.get_model()
-            if model and 0 <= sel_idx < model.get_n_items():
-                selected_screen = model.get_item(sel_idx).get_string()
-                self.config.set("lastScreen", selected_screen)
-
-            # Autostart
-            self.integrator.set_autostart(
-                self.autostart_sw.get_active(),
-                hidden=self.start_hidden_sw.get_active()
-            )
-
-            # Screenshot
-            self.config.set("screenshotDelay", int(self.screenshot_delay_spin.get_value()))
-            self.config.set("screenshotRes", self.screenshot_res_entry.get_text())
-            self.config.set("preferXvfb", self.xvfb_sw.get_active())
+                # Screen Root
+                screens = self.screen_manager.get_screens()
+                sel_idx = self.screen_dd.get_selected()
+                # If screens list changed since build, this might be risky, but refresh updates model
+                # Re-fetch model from dropdown?
+                model = self.screen_dd.get_model()
+                if model and 0 <= sel_idx < model.get_n_items():
+                    selected_screen = model.get_item(sel_idx).get_string()
+                    self.config.set("lastScreen", selected_screen)
+
+                # Autostart
+                self.integrator.set_autostart(
+                    self.autostart_sw.get_active(),
+                    hidden=self.start_hidden_sw.get_active()
+                )
+
+                # Screenshot
+                self.config.set("screenshotDelay", int(self.screenshot_delay_spin.get_value()))
+                self.config.set("screenshotRes", self.screenshot_res_entry.get_text())
+                self.config.set("preferXvfb", self.xvfb_sw.get_active())
 
             new_path = self.config.get("workshopPath")
             if new_path and new_path != self.wp_manager.workshop_path:
@@ -856,14 +1091,15 @@ class SettingsPage(Gtk.Box):
 
             self.show_toast("Settings saved successfully")
             
-            # Restart if active to apply immediate changes (like FPS/Scaling)
-            # Optional: Ask user? Or just do it.
-            # self.controller.restart_wallpapers() 
+            # Apply immediate changes (like FPS/Scaling); the engine is only
+            # restarted if the saved settings change its command line
+            if self.config.get("active_monitors"):
+                self.controller.schedule_restart()
             
         except Exception as e:
             self.show_toast(f"Error saving settings: {e}")
             print(f"Save error: {e}")
 
     def on_reload(self, btn):
-        self.controller.restart_wallpapers()
+        self.controller.restart_wallpapers(force=True)
         self.show_toast("Reloading wallpapers...")
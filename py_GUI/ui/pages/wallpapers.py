@@ -1,6 +1,5 @@
 import random
 import os
-import signal
 import time
 from typing import Dict, Optional, Callable
 import gi
@@ -27,6 +26,27 @@ from py_GUI.utils import markdown_to_pango, format_size
 from py_GUI.core.screen import ScreenManager
 
 
+# Sort dropdown entries: (label, sortMode, sortReverse)
+SORT_OPTIONS = [
+    ("Title", "title", False),
+    ("Size ↓", "size", True),
+    ("Size ↑", "size", False),
+    ("Type", "type", False),
+    ("ID", "id", False),
+    ("Most Played", "most_played", False),
+    ("Recently Played", "recent", False),
+    ("Never Played", "never_played", False),
+    ("Cost", "cost", True),
+    ("Benchmark", "benchmark", True),
+]
+
+# Wallpapers on each side of the selection whose properties are loaded ahead
+PREFETCH_NEIGHBORS = 2
+
+# Sort modes that depend on playback history
+HISTORY_SORT_MODES = ("most_played", "recent", "never_played")
+
+
 class WallpapersPage(Gtk.Box):
     def __init__(
         self,
@@ -68,10 +88,42 @@ class WallpapersPage(Gtk.Box):
         # Cache for filtered wallpapers
         self._filtered_wallpapers: Optional[Dict] = None
         self._filter_cache_key: Optional[tuple] = None
+        # (ledger revision, costs); benchmark results until reload or sort change
+        self._cost_cache: Optional[tuple] = None
+        self._benchmark_cache: Optional[Dict[str, Dict]] = None
 
         self.build_ui()
         self._setup_key_controller()
 
+        self.config.connect("lastScreen", self._on_last_screen_changed)
+        self.config.connect("apply_mode", self._on_apply_mode_changed)
+        self.config.connect("active_monitors", self._on_active_monitors_changed)
+
+    # Config handlers run on the thread that changed the value, so widget
+    # updates are handed to the main loop
+
+    def _on_last_screen_changed(self, key, old, new):
+        GLib.idle_add(self._select_screen, new)
+
+    def _select_screen(self, screen) -> bool:
+        if screen and screen != self.selected_screen:
+            self.selected_screen = screen
+            self.update_active_wallpaper_label()
+        return False
+
+    def _on_apply_mode_changed(self, key, old, new):
+        self.apply_mode = new or "diff"
+
+    def _on_active_monitors_changed(self, key, old, new):
+        GLib.idle_add(self._sync_active_wallpaper, old, new)
+
+    def _sync_active_wallpaper(self, old, new) -> bool:
+        old_wp = (old or {}).get(self.selected_screen)
+        new_wp = (new or {}).get(self.selected_screen)
+        if old_wp != new_wp:
+            self.update_active_wallpaper_label()
+        return False
+
     def build_ui(self):
         # Toolbar
         self.build_toolbar()
@@ -183,18 +235,13 @@ class WallpapersPage(Gtk.Box):
         icon_sort.add_css_class("status-label")
         sort_box.append(icon_sort)
 
-        sort_options = ["Title", "Size ↓", "Size ↑", "Type", "ID"]
-        self.sort_dd = Gtk.DropDown.new_from_strings(sort_options)
+        self.sort_dd = Gtk.DropDown.new_from_strings([opt[0] for opt in SORT_OPTIONS])
 
         initial_idx = 0
-        if self.sort_mode == "size" and self.sort_reverse:
-            initial_idx = 1
-        elif self.sort_mode == "size":
-            initial_idx = 2
-        elif self.sort_mode == "type":
-            initial_idx = 3
-        elif self.sort_mode == "id":
-            initial_idx = 4
+        for i, (_, mode, reverse) in enumerate(SORT_OPTIONS):
+            if mode == self.sort_mode and (mode != "size" or reverse == self.sort_reverse):
+                initial_idx = i
+                break
         self.sort_dd.set_selected(initial_idx)
 
         self.sort_dd.connect("notify::selected", self.on_sort_changed)
@@ -516,16 +563,14 @@ class WallpapersPage(Gtk.Box):
 
     def on_sort_changed(self, dd, pspec):
         idx = dd.get_selected()
-        sort_map = {
-            0: ("title", False),
-            1: ("size", True),
-            2: ("size", False),
-            3: ("type", False),
-            4: ("id", False),
-        }
-        self.sort_mode, self.sort_reverse = sort_map.get(idx, ("title", False))
-        self.config.set("sortMode", self.sort_mode)
-        self.config.set("sortReverse", self.sort_reverse)
+        if 0 <= idx < len(SORT_OPTIONS):
+            _, self.sort_mode, self.sort_reverse = SORT_OPTIONS[idx]
+        else:
+            self.sort_mode, self.sort_reverse = "title", False
+        self._benchmark_cache = None
+        with self.config.batch():
+            self.config.set("sortMode", self.sort_mode)
+            self.config.set("sortReverse", self.sort_reverse)
         self._invalidate_filter_cache()
         self.refresh_wallpaper_grid()
         self.update_sidebar_index()
@@ -537,6 +582,8 @@ class WallpapersPage(Gtk.Box):
 
     def on_reload_wallpapers(self, btn):
         self.wp_manager.clear_cache()
+        self.prop_manager.invalidate()
+        self._benchmark_cache = None
         self.wp_manager.workshop_path = self.config.get(
             "workshopPath", self.wp_manager.workshop_path
         )
@@ -601,172 +648,67 @@ class WallpapersPage(Gtk.Box):
         filename = f"Screenshot_{target_id}_{timestamp}.png"
         output_path = os.path.join(save_dir, filename)
 
-        try:
-            # Smart Delay Logic
-            wp = self.wp_manager._wallpapers.get(target_id)
-            wp_type = wp.get("type", "Unknown").lower() if wp else "unknown"
-
-            user_delay = self.config.get("screenshotDelay", 20)
-            user_delay = int(user_delay)
-
-            if wp_type == "video":
-                delay_frames = 5
-                self.log_manager.add_info(
-                    "Smart Delay: Video wallpaper detected, using fast capture (5 frames)",
-                    "GUI",
-                )
-            else:
-                delay_frames = user_delay
-                # Web wallpapers might need more time, user setting is respected
+        # Smart Delay Logic
+        wp = self.wp_manager._wallpapers.get(target_id)
+        wp_type = wp.get("type", "Unknown").lower() if wp else "unknown"
 
-            self.log_manager.add_info(f"Taking screenshot to {output_path}...", "GUI")
-            proc, tracker = self.controller.take_screenshot(
-                target_id, output_path, delay=delay_frames
+        if wp_type == "video":
+            delay_frames = 5
+            self.log_manager.add_info(
+                "Smart Delay: Video wallpaper detected, using fast capture (5 frames)",
+                "GUI",
             )
+        else:
+            # Web wallpapers might need more time, user setting is respected
+            delay_frames = int(self.config.get("screenshotDelay", 20))
 
-            start_time = time.time()
-
-            # Calculate max wait time (timeout)
-            # Xvfb software rendering is slow.
-            import shutil
-
-            has_xvfb_bin = shutil.which("xvfb-run") is not None
-            prefer_xvfb = self.config.get("preferXvfb", True)
-            is_xvfb = has_xvfb_bin and prefer_xvfb
+        def on_captured(result):
+            reset_ui()
+            if result["ok"]:
+                stats = result["stats"]
+                self.log_manager.add_info(f"Screenshot complete: {output_path}", "GUI")
+                self.controller.perf_monitor.add_screenshot_history(
+                    target_id, output_path, stats
+                )
+                stats_str = f"Duration: {stats['duration']:.2f}s | Max CPU: {stats['max_cpu']:.1f}% | Max Mem: {stats['max_mem']:.1f} MB"
 
-            # Massive timeout for Xvfb software rendering at 4K
-            fps_target = 1.0 if is_xvfb else 60.0
-            buffer_s = 20.0 if is_xvfb else 3.0
+                texture = None
+                if wp and wp.get("preview"):
+                    texture = self.wp_manager.get_texture(wp["preview"], size=120)
+                show_screenshot_success_dialog(
+                    self.window, output_path, stats_str, texture
+                )
+            elif result["error"] == "timeout":
+                show_error_dialog(
+                    self.window,
+                    "Screenshot Timeout",
+                    "Capture timed out. Try increasing the delay in Settings.",
+                )
+            else:
+                err_msg = result["output"] or "Unknown error"
+                self.log_manager.add_error(
+                    f"Screenshot process crashed: {err_msg}", "GUI"
+                )
+                show_error_dialog(
+                    self.window,
+                    "Screenshot Failed",
+                    f"The engine crashed or exited early.\n\nBackend Error:\n{err_msg[-500:]}",
+                )
 
-            kill_threshold_s = (delay_frames / fps_target) + buffer_s
-            self.log_manager.add_info(
-                f"Screenshot timeout: {kill_threshold_s:.1f}s (Xvfb={is_xvfb})", "GUI"
+        self.log_manager.add_info(f"Taking screenshot to {output_path}...", "GUI")
+        try:
+            tracker = self.controller.capture(
+                target_id, output_path, on_captured, delay=delay_frames
             )
-
-            last_size = -1
-            stable_ticks = 0
-
-            def check_capture_status():
-                nonlocal last_size, stable_ticks
-                elapsed = time.time() - start_time
-
-                # Debug logging every 1s
-                if int(elapsed * 10) % 10 == 0:
-                    fsize = (
-                        os.path.getsize(output_path)
-                        if os.path.exists(output_path)
-                        else -1
-                    )
-                    self.log_manager.add_debug(
-                        f"Capture status: T={elapsed:.1f}s, File={fsize} bytes", "GUI"
-                    )
-
-                # 1. Check if process is already dead (crashed or finished)
-                if proc.poll() is not None:
-                    # Process exited on its own. Check file.
-                    if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
-                        show_success()
-                    else:
-                        # Read error log
-                        err_msg = "Unknown error"
-                        try:
-                            with open("/tmp/wallpaper_screenshot_error.log", "r") as f:
-                                err_msg = f.read().strip()
-                        except Exception:
-                            pass
-
-                        self.log_manager.add_error(
-                            f"Screenshot process crashed: {err_msg}", "GUI"
-                        )
-                        reset_ui()
-                        show_error_dialog(
-                            self.window,
-                            "Screenshot Failed",
-                            f"The engine crashed or exited early.\n\nBackend Error:\n{err_msg[-500:]}",
-                        )
-                    return False
-
-                # 2. Check if file exists and is stable
-                if os.path.exists(output_path):
-                    try:
-                        curr_size = os.path.getsize(output_path)
-                        if curr_size > 0:
-                            if curr_size == last_size:
-                                stable_ticks += 1
-                            else:
-                                stable_ticks = 0
-                            last_size = curr_size
-
-                            # Stable for ~200ms -> Kill it
-                            if stable_ticks >= 2:
-                                kill_process()
-                                # Wait a tiny bit for cleanup then show success
-                                GLib.timeout_add(200, show_success)
-                                return False
-                    except OSError:
-                        pass  # File might be locked or busy
-
-                # 3. Timeout -> Force Kill (Trigger save-on-exit)
-                if elapsed > kill_threshold_s:
-                    kill_process()
-                    # Give it 1s to flush on exit
-                    GLib.timeout_add(1000, verify_after_kill)
-                    return False
-
-                return True  # Continue polling
-
-            def kill_process():
-                try:
-                    os.killpg(os.getpgid(proc.pid), signal.SIGINT)
-                except Exception:
-                    proc.terminate()
-
-            def show_success():
-                if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
-                    self.log_manager.add_info(
-                        f"Screenshot complete: {output_path}", "GUI"
-                    )
-
-                    stats = self.controller.perf_monitor.stop_task(tracker)
-                    self.controller.perf_monitor.add_screenshot_history(
-                        target_id, output_path, stats
-                    )
-                    stats_str = f"Duration: {stats['duration']:.2f}s | Max CPU: {stats['max_cpu']:.1f}% | Max Mem: {stats['max_mem']:.1f} MB"
-
-                    texture = None
-                    wp = self.wp_manager._wallpapers.get(target_id)
-                    if wp and wp.get("preview"):
-                        texture = self.wp_manager.get_texture(wp["preview"], size=120)
-
-                    reset_ui()
-                    show_screenshot_success_dialog(
-                        self.window, output_path, stats_str, texture
-                    )
-                else:
-                    # Rare race condition or save failed
-                    verify_after_kill()
-                return False
-
-            def verify_after_kill():
-                if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
-                    show_success()
-                else:
-                    reset_ui()
-                    show_error_dialog(
-                        self.window,
-                        "Screenshot Timeout",
-                        "Capture timed out. Try increasing the delay in Settings.",
-                    )
-                return False
-
-            # Start polling every 100ms
-            GLib.timeout_add(100, check_capture_status)
-
         except Exception as e:
             reset_ui()
             show_error_dialog(
                 self.window, "Screenshot Error", f"Failed to start process: {e}"
             )
+            return
+        self.log_manager.add_info(
+            f"Screenshot timeout: {tracker.timeout:.1f}s (Xvfb={self.controller.uses_xvfb()})", "GUI"
+        )
 
     def refresh_wallpaper_grid(self):
         prev_cache_key = getattr(self, "_filter_cache_key", None)
@@ -811,6 +753,12 @@ class WallpapersPage(Gtk.Box):
 
     def get_filtered_wallpapers(self) -> Dict[str, Dict]:
         cache_key = (self.search_query, self.sort_mode, self.sort_reverse)
+        history = self.controller.history_manager
+        if self.sort_mode in HISTORY_SORT_MODES and history:
+            cache_key += (history.revision,)
+        ledger = self.controller.perf_monitor.ledger
+        if self.sort_mode == "cost" and ledger:
+            cache_key += (ledger.revision,)
         if self._filter_cache_key != cache_key or self._filtered_wallpapers is None:
             self._filtered_wallpapers = self.filter_wallpapers()
             self._filter_cache_key = cache_key
@@ -864,6 +812,21 @@ class WallpapersPage(Gtk.Box):
                 key=lambda x: x[1].get("type", "").lower(),
                 reverse=self.sort_reverse,
             )
+        elif self.sort_mode in HISTORY_SORT_MODES and self.controller.history_manager:
+            sorted_items = self._sort_by_history(result)
+        elif self.sort_mode == "benchmark":
+            sorted_items = self._sort_by_benchmark(result)
+        elif self.sort_mode == "cost" and self.controller.perf_monitor.ledger:
+            costs = self._get_costs()
+            # Unmeasured wallpapers sort after measured ones either way
+            measured = [x for x in result.items() if x[0] in costs]
+            unmeasured = [x for x in result.items() if x[0] not in costs]
+            measured.sort(
+                key=lambda x: (costs[x[0]]["avg_cpu"], costs[x[0]]["avg_rss_mb"]),
+                reverse=self.sort_reverse,
+            )
+            unmeasured.sort(key=lambda x: x[1].get("title", "").lower())
+            sorted_items = measured + unmeasured
         else:
             sorted_items = sorted(
                 result.items(), key=lambda x: x[0], reverse=self.sort_reverse
@@ -871,6 +834,41 @@ class WallpapersPage(Gtk.Box):
 
         return dict(sorted_items)
 
+    def _sort_by_benchmark(self, result: Dict[str, Dict]):
+        benchmarks = self._get_benchmarks()
+        # Measured wallpapers by cost, then crashed/failed ones, then never benchmarked
+        measured = [x for x in result.items() if benchmarks.get(x[0], {}).get("status") == "ok"]
+        broken = [x for x in result.items()
+                  if x[0] in benchmarks and benchmarks[x[0]]["status"] != "ok"]
+        unmeasured = [x for x in result.items() if x[0] not in benchmarks]
+        measured.sort(
+            key=lambda x: (benchmarks[x[0]]["avg_cpu"], benchmarks[x[0]]["avg_rss_mb"]),
+            reverse=self.sort_reverse,
+        )
+        broken.sort(key=lambda x: x[1].get("title", "").lower())
+        unmeasured.sort(key=lambda x: x[1].get("title", "").lower())
+        return measured + broken + unmeasured
+
+    def _sort_by_history(self, result: Dict[str, Dict]):
+        history = self.controller.history_manager
+
+        def title_key(item):
+            return item[1].get("title", "").lower()
+
+        if self.sort_mode == "most_played":
+            key = lambda x: (
+                -history.get_play_count(x[0]),
+                -history.get_play_seconds(x[0]),
+                title_key(x),
+            )
+        elif self.sort_mode == "recent":
+            # Never played go last
+            key = lambda x: (-(history.get_last_played(x[0]) or -1), title_key(x))
+        else:
+            # Never played first, then least recently played
+            key = lambda x: (history.get_last_played(x[0]) or 0, title_key(x))
+        return sorted(result.items(), key=key, reverse=self.sort_reverse)
+
     def populate_grid(self):
         while True:
             child = self.flowbox.get_first_child()
@@ -979,6 +977,50 @@ class WallpapersPage(Gtk.Box):
 
         return btn
 
+    def _get_costs(self) -> Dict[str, Dict[str, float]]:
+        """Ledger costs, re-read only after the ledger flushes"""
+        ledger = self.controller.perf_monitor.ledger
+        if not ledger:
+            return {}
+        cached = self._cost_cache
+        if cached is None or cached[0] != ledger.revision:
+            cached = (ledger.revision, ledger.get_costs())
+            self._cost_cache = cached
+        return cached[1]
+
+    def _get_benchmarks(self) -> Dict[str, Dict]:
+        """Headless benchmark results (--benchmark-library), re-read on reload or sort change"""
+        if self._benchmark_cache is None:
+            store = self.controller.store
+            try:
+                self._benchmark_cache = store.get_benchmarks() if store else {}
+            except Exception as e:
+                self.log_manager.add_error(f"Failed to read benchmarks: {e}", "GUI")
+                self._benchmark_cache = {}
+        return self._benchmark_cache
+
+    def _format_benchmark(self, wp_id: str) -> str:
+        result = self._get_benchmarks().get(wp_id)
+        if not result:
+            return "not run"
+        if result["status"] != "ok":
+            return result["status"]
+        return (
+            f"{result['avg_cpu']:.1f}% CPU, {result['avg_rss_mb']:.0f} MB, "
+            f"{result['avg_threads']:.0f} threads"
+        )
+
+    def _format_cost(self, wp_id: str) -> str:
+        cost = self._get_costs().get(wp_id)
+        if not cost or not cost["runtime"]:
+            return "not measured"
+        hours = cost["runtime"] / 3600
+        runtime = f"{hours:.1f} h" if hours >= 1 else f"{int(cost['runtime'] // 60)} min"
+        return (
+            f"{cost['avg_cpu']:.1f}% CPU, {cost['avg_rss_mb']:.0f} MB avg / "
+            f"{cost['peak_rss_mb']:.0f} MB peak over {runtime}"
+        )
+
     def create_list_item(
         self, folder_id: str, wp: Dict, index: int, total: int
     ) -> Gtk.Widget:
@@ -1059,6 +1101,16 @@ class WallpapersPage(Gtk.Box):
         typ.set_halign(Gtk.Align.START)
         info.append(typ)
 
+        cost_lbl = Gtk.Label(label=f"Cost: {self._format_cost(folder_id)}")
+        cost_lbl.add_css_class("list-type")
+        cost_lbl.set_halign(Gtk.Align.START)
+        info.append(cost_lbl)
+
+        bench_lbl = Gtk.Label(label=f"Benchmark: {self._format_benchmark(folder_id)}")
+        bench_lbl.add_css_class("list-type")
+        bench_lbl.set_halign(Gtk.Align.START)
+        info.append(bench_lbl)
+
         tags = wp.get("tags", [])
         if isinstance(tags, str):
             tags = [tags]
@@ -1101,9 +1153,13 @@ class WallpapersPage(Gtk.Box):
         if filtered is None:
             filtered = self.get_filtered_wallpapers()
         if folder_id in filtered:
-            index = list(filtered.keys()).index(folder_id) + 1
+            ids = list(filtered.keys())
+            index = ids.index(folder_id) + 1
             total = len(filtered)
             self.sidebar.update(folder_id, index, total)
+            # Warm properties for the wallpapers keyboard navigation reaches next
+            lo = max(0, index - 1 - PREFETCH_NEIGHBORS)
+            self.prop_manager.prefetch(ids[lo:index + PREFETCH_NEIGHBORS])
         else:
             self.sidebar.update(folder_id)
 